@@ -1,3 +1,4 @@
+import importlib.util
 import json
 import os
 
@@ -5,7 +6,7 @@ import gi
 
 gi.require_version("Gtk", "3.0")
 from fabric.utils.helpers import get_relative_path
-from gi.repository import Gdk, GLib
+from gi.repository import Gdk, Gio, GLib
 
 APP_NAME = "hyprfabricated"
 APP_NAME_CAP = "hyprfabricated"
@@ -15,6 +16,7 @@ PANEL_POSITION_KEY = "panel_position"
 PANEL_POSITION_DEFAULT = "Center"
 NOTIF_POS_KEY = "notif_pos"
 NOTIF_POS_DEFAULT = "Top"
+UPDATER_URL_DEFAULT = "https://raw.githubusercontent.com/fram446742/hyprfabricated/refs/heads/main/utils/version.json"
 
 CACHE_DIR = str(GLib.get_user_cache_dir()) + f"/{APP_NAME}"
 
@@ -79,13 +81,20 @@ if os.path.exists(CONFIG_FILE):
     PANEL_THEME = config.get("panel_theme", "Pills")
     UPDATER = config.get("misc_updater", True)
     OTHERPLAYERS = config.get("misc_otherplayers", False)
+    UPDATER_URL = config.get("misc_updater_url", UPDATER_URL_DEFAULT)
     PANEL_POSITION = config.get(PANEL_POSITION_KEY, PANEL_POSITION_DEFAULT)
     NOTIF_POS = config.get(NOTIF_POS_KEY, NOTIF_POS_DEFAULT)
+    NOTIFICATION_COALESCE_MS = config.get("notification_coalesce_ms", 250)
+    NOTIFICATION_RATE_LIMIT = config.get("notification_rate_limit", 10)
+    NOTIFICATION_APP_RATE_LIMITS = config.get("notification_app_rate_limits", {})
 
     DESKTOP_WIDGETS = config.get("bar_desktop_widgets_visible", True)
+    CORNERS_VISIBLE = config.get("corners_visible", True)
     WEATHER_FORMAT = config.get("widgets_weather_format", "C")
     WEATHER_LOCATION = config.get("widgets_weather_location", "")
+    WEATHER_BASE_URL = config.get("widgets_weather_base_url", "https://wttr.in")
     QUOTE_TYPE = config.get("widgets_quotetype", "stoic")
+    CALENDAR_SOURCES = config.get("calendar_sources", ["~/.calendars"])
     BAR_WORKSPACE_SHOW_NUMBER = config.get(
         "bar_workspace_show_number", False
     )  # Load workspace number visibility
@@ -124,6 +133,9 @@ if os.path.exists(CONFIG_FILE):
     METRICS_SMALL_VISIBLE = config.get(
         "metrics_small_visible", {"cpu": True, "ram": True, "disk": True, "gpu": True}
     )
+    METRICS_SAMPLE_INTERVAL = config.get("metrics_sample_interval", 1000)
+    METRICS_DISK_INTERVAL = config.get("metrics_disk_interval", 30000)
+    METRICS_HISTORY = config.get("metrics_history", True)
 else:
     WALLPAPERS_DIR = WALLPAPERS_DIR_DEFAULT
     BAR_POSITION = "Top"
@@ -141,14 +153,21 @@ else:
     PANEL_THEME = "Notch"
     UPDATER = "misc_updater", True
     OTHERPLAYERS = "misc_otherplayers", False
+    UPDATER_URL = UPDATER_URL_DEFAULT
     PANEL_POSITION = PANEL_POSITION_DEFAULT
     DESKTOP_WIDGETS = True
     NOTIF_POS = NOTIF_POS_DEFAULT
+    NOTIFICATION_COALESCE_MS = 250
+    NOTIFICATION_RATE_LIMIT = 10
+    NOTIFICATION_APP_RATE_LIMITS = {}
 
     DESKTOP_WIDGETS = True
+    CORNERS_VISIBLE = True
     WEATHER_FORMAT = "C"
     WEATHER_LOCATION = ""
+    WEATHER_BASE_URL = "https://wttr.in"
     QUOTE_TYPE = "stoic"
+    CALENDAR_SOURCES = ["~/.calendars"]
 
     BAR_COMPONENTS_VISIBILITY = {
         "button_apps": True,
@@ -177,3 +196,88 @@ else:
     BAR_METRICS_DISKS = ["/"]
     METRICS_VISIBLE = {"cpu": True, "ram": True, "disk": True, "gpu": True}
     METRICS_SMALL_VISIBLE = {"cpu": True, "ram": True, "disk": True, "gpu": True}
+    METRICS_SAMPLE_INTERVAL = 1000
+    METRICS_DISK_INTERVAL = 30000
+    METRICS_HISTORY = True
+
+
+# Live configuration: the settings window runs in its own process and only
+# rewrites CONFIG_FILE. The shell watches it, re-reads the values above and
+# tells the modules that use them which ones changed, so they can update in
+# place instead of restarting. Modules must read `data.NAME` at call time
+# (not `from config.data import NAME`) for a reload to reach them.
+
+CONFIG_RELOAD_DELAY_MS = 200
+
+_subscribers = []
+_monitor = None
+_reload_id = None
+
+
+def subscribe(names, callback):
+    """Call `callback(changed)` with the subset of `names` a reload changed."""
+    _subscribers.append((frozenset(names), callback))
+
+
+def unsubscribe(callback):
+    _subscribers[:] = [entry for entry in _subscribers if entry[1] != callback]
+
+
+def reload_config():
+    """
+    Re-read CONFIG_FILE, update the values of this module that changed and
+    notify their subscribers. Returns the names that changed.
+    """
+    spec = importlib.util.spec_from_file_location(f"{__name__}._reload", __file__)
+    fresh = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(fresh)
+    except Exception as e:
+        # Most likely a half-written file; the next change event retries.
+        print(f"Error reloading config: {e}")
+        return set()
+
+    current = globals()
+    changed = {
+        name
+        for name, value in vars(fresh).items()
+        if name.isupper() and current.get(name) != value
+    }
+    for name in changed:
+        current[name] = getattr(fresh, name)
+
+    for names, callback in list(_subscribers):
+        if names & changed:
+            try:
+                callback(names & changed)
+            except Exception as e:
+                print(f"Error applying config change to {callback}: {e}")
+    return changed
+
+
+def watch_config():
+    """Reload the configuration whenever CONFIG_FILE is rewritten."""
+    global _monitor
+    if _monitor is not None:
+        return
+    _monitor = Gio.File.new_for_path(CONFIG_FILE).monitor_file(
+        Gio.FileMonitorFlags.WATCH_MOVES, None
+    )
+    _monitor.connect("changed", _on_config_file_changed)
+
+
+def _on_config_file_changed(monitor, file, other_file, event_type):
+    global _reload_id
+    if event_type == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+        return
+    # A write arrives as several events; reload once it settles.
+    if _reload_id is not None:
+        GLib.source_remove(_reload_id)
+    _reload_id = GLib.timeout_add(CONFIG_RELOAD_DELAY_MS, _reload_later)
+
+
+def _reload_later():
+    global _reload_id
+    _reload_id = None
+    reload_config()
+    return False
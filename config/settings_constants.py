@@ -5,6 +5,7 @@ from .data import (
     NOTIF_POS_KEY,
     PANEL_POSITION_DEFAULT,
     PANEL_POSITION_KEY,
+    UPDATER_URL_DEFAULT,
     WALLPAPERS_DIR_DEFAULT,
 )
 
@@ -13,6 +14,42 @@ SOURCE_STRING = f"""
 source = ~/.config/{APP_NAME_CAP}/config/hypr/{APP_NAME}.conf
 """
 
+# Settings the running shell applies in place when config.json changes; see
+# `config.data.subscribe`. Keybindings take effect through the regenerated
+# Hyprland config. Changing any other setting restarts the shell.
+LIVE_KEYS = frozenset(
+    {
+        "bar_button_apps_visible",
+        "bar_systray_visible",
+        "bar_control_visible",
+        "bar_network_visible",
+        "bar_button_tools_visible",
+        "bar_button_overview_visible",
+        "bar_ws_container_visible",
+        "bar_weather_visible",
+        "bar_battery_visible",
+        "bar_metrics_visible",
+        "bar_language_visible",
+        "bar_date_time_visible",
+        "bar_sysprofiles_visible",
+        "bar_button_power_visible",
+        "bar_workspace_show_number",
+        "bar_workspace_use_chinese_numerals",
+        "datetime_12h_format",
+        "corners_visible",
+        "dock_icon_size",
+        "dock_always_occluded",
+        "terminal_command",
+        "metrics_visible",
+        "metrics_small_visible",
+        "bar_metrics_disks",
+        "metrics_sample_interval",
+        "metrics_disk_interval",
+        "calendar_sources",
+    }
+)
+LIVE_KEY_PREFIXES = ("prefix_", "suffix_")
+
 DEFAULTS = {
     "prefix_restart": "SUPER ALT",
     "suffix_restart": "F",
@@ -69,6 +106,9 @@ DEFAULTS = {
     "panel_theme": "Notch",  # Default panel theme
     PANEL_POSITION_KEY: PANEL_POSITION_DEFAULT,  # Default panel position
     NOTIF_POS_KEY: NOTIF_POS_DEFAULT,  # Nueva entrada para la posición de notificaciones
+    "notification_coalesce_ms": 250,
+    "notification_rate_limit": 10,
+    "notification_app_rate_limits": {},
     'datetime_12h_format': False,  # Add this line
     "bar_button_apps_visible": True,
     "bar_systray_visible": True,
@@ -94,9 +134,12 @@ DEFAULTS = {
     "widgets_weatherwid_visible": True,
     "widgets_weather_format": "C",
     "widgets_weather_location": "",
+    "widgets_weather_base_url": "https://wttr.in",
+    "calendar_sources": ["~/.calendars"],
     "widgets_sysinfo_visible": True,
     "misc_updater": True,
     "misc_otherplayers": False,
+    "misc_updater_url": UPDATER_URL_DEFAULT,
     "widgets_qoutetype": "stoic",
     "bar_metrics_disks": ["/"],
     "metrics_visible": {
@@ -111,4 +154,7 @@ DEFAULTS = {
         "disk": True,
         "gpu": True,
     },
+    "metrics_sample_interval": 1000,
+    "metrics_disk_interval": 30000,
+    "metrics_history": True,
 }
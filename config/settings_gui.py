@@ -1156,6 +1156,17 @@ class HyprConfGUI(Window):
             nonlocal current_bind_vars_snapshot
 
             from . import settings_utils
+            from .settings_constants import LIVE_KEY_PREFIXES, LIVE_KEYS
+
+            # The running shell applies these itself when config.json changes
+            # (see config.data.watch_config); anything else needs a restart.
+            restart_keys = sorted(
+                key
+                for key, value in current_bind_vars_snapshot.items()
+                if settings_utils.bind_vars.get(key) != value
+                and key not in LIVE_KEYS
+                and not key.startswith(LIVE_KEY_PREFIXES)
+            )
 
             settings_utils.bind_vars.clear()
             settings_utils.bind_vars.update(current_bind_vars_snapshot)
@@ -1243,6 +1254,17 @@ class HyprConfGUI(Window):
             start_config()
             print(f"{time.time():.4f}: Finished start_config().")
 
+            if not restart_keys:
+                end_time = time.time()
+                print(
+                    f"{end_time:.4f}: Changes applied live, no restart needed "
+                    f"(Total: {end_time - start_time:.4f}s)."
+                )
+                return
+
+            print(
+                f"{time.time():.4f}: Restart needed for: {', '.join(restart_keys)}"
+            )
             print(
                 f"{time.time():.4f}: Initiating Hyprfabricated restart using Popen..."
             )
@@ -30,7 +30,6 @@ PACKAGES=(
     playerctl
     python-fabric-git
     python-gobject
-    python-ijson
     python-numpy
     python-pillow
     python-psutil
@@ -38,7 +37,6 @@ PACKAGES=(
     python-requests
     python-setproctitle
     python-toml
-    python-watchdog
     python-numpy
     python-numpy
     swappy
@@ -65,13 +63,11 @@ PACKAGES=(
 )
 
 PYTHON_PACKAGES=(
-    ijson 
     pillow 
     psutil
     requests 
     setproctitle 
     toml 
-    watchdog
     numpy
 )
 
@@ -5,7 +5,7 @@ from fabric.utils import exec_shell_command_async, get_relative_path
 import gi
 
 gi.require_version("GLib", "2.0")
-from gi.repository import GLib
+import config.data as data
 from config.data import (
     APP_NAME,
     APP_NAME_CAP,
@@ -13,7 +13,6 @@ from config.data import (
     CONFIG_FILE,
     HOME_DIR,
     UPDATER,
-    DESKTOP_WIDGETS,
 )
 
 
@@ -23,7 +22,8 @@ from modules.dock import Dock
 from modules.notch import Notch
 from modules.deskwidgets import Deskwidgets
 from modules.notifications import NotificationPopup
-from modules.updater import run_updater
+from modules.updater import UpdateChecker
+from utils.stylesheets import Stylesheets
 
 fonts_updated_file = f"{CACHE_DIR}/fonts_updated"
 hyprconf = get_relative_path("config.json")
@@ -43,15 +43,10 @@ if __name__ == "__main__":
         )
         os.symlink(example_wallpaper, current_wallpaper)
 
-    # Load configuration
-    from config.data import load_config
-
-    config = load_config()
-
     if UPDATER:
-        GLib.idle_add(run_updater)
-        # Every hour
-        GLib.timeout_add(3600000, run_updater)
+        # Checks hourly on the main loop, honouring snooze and connectivity
+        update_checker = UpdateChecker()
+        update_checker.start()
 
     corners = Corners()
     bar = Bar()
@@ -61,25 +56,30 @@ if __name__ == "__main__":
     notch.bar = bar
     notification = NotificationPopup(widgets=notch.dashboard.widgets)
     widgets = Deskwidgets()
-    # Set corners visibility based on config
+    # Which desktop widget windows exist is decided when deskwidgets is
+    # imported, so DESKTOP_WIDGETS needs a restart.
+    widgets.set_visible(data.DESKTOP_WIDGETS)
 
-    widgetsvisible = DESKTOP_WIDGETS
-    widgets.set_visible(widgetsvisible)
+    def apply_corners_visibility(*_):
+        corners.set_visible(data.CORNERS_VISIBLE)
 
-    # Set corners visibility based on config
-    corners_visible = config.get("corners_visible", True)
-    corners.set_visible(corners_visible)
+    apply_corners_visibility()
+    data.subscribe(("CORNERS_VISIBLE",), apply_corners_visibility)
+    # Settings changes reach the modules through config.json.
+    data.watch_config()
 
     app = Application(
         f"{APP_NAME}", bar, notch, dock, notification, corners, widgets
     )  # Make sure corners is added to the app
 
-    def set_css():
-        app.set_stylesheet_from_file(
-            get_relative_path("main.css"),
-        )
-
-    app.set_css = set_css
+    # Also run by the matugen post-hook on every wallpaper change, where
+    # only the colors provider is swapped.
+    stylesheets = Stylesheets(
+        get_relative_path("main.css"),
+        get_relative_path("styles/colors.css"),
+        get_relative_path("assets/colors.css"),
+    )
+    app.set_css = stylesheets.reload
 
     app.set_css()
 
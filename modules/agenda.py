@@ -0,0 +1,162 @@
+from datetime import date, datetime, timedelta
+
+from fabric.widgets.box import Box
+from fabric.widgets.button import Button
+from fabric.widgets.centerbox import CenterBox
+from fabric.widgets.label import Label
+from fabric.widgets.scrolledwindow import ScrolledWindow
+
+import config.data as data
+import modules.icons as icons
+from services.calendar_events import CalendarEvents, Occurrence
+
+AGENDA_DAYS = 14
+MAX_EVENTS = 100
+
+
+class AgendaRow(Box):
+    def __init__(self, **kwargs):
+        super().__init__(name="agenda-row", spacing=8, **kwargs)
+        self.time_label = Label(name="agenda-time", h_align="start")
+        self.summary_label = Label(
+            name="agenda-summary", h_expand=True, h_align="start", ellipsization="end"
+        )
+        self.add(self.time_label)
+        self.add(self.summary_label)
+
+    def bind_day(self, text: str):
+        self.add_style_class("day")
+        self.time_label.set_label(text)
+        self.summary_label.set_visible(False)
+        self.set_tooltip_text(None)
+        self.set_visible(True)
+
+    def bind_event(self, time_text: str, summary: str, tooltip: str):
+        self.remove_style_class("day")
+        self.time_label.set_label(time_text)
+        self.summary_label.set_label(summary)
+        self.summary_label.set_visible(True)
+        self.set_tooltip_text(tooltip)
+        self.set_visible(True)
+
+
+class Agenda(Box):
+    """
+    Events of the next two weeks from the calendar event index, grouped by
+    day. Only a mapped agenda queries the index; rows are created as needed
+    and rebound on every update.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            name="agenda",
+            orientation="vertical",
+            spacing=4,
+            **kwargs,
+        )
+        self.widgets = kwargs.get("widgets")
+        self.calendar_events = CalendarEvents.get_initial()
+        # None follows the current day.
+        self.start_day = None
+        self.query_range = None
+
+        self.back_button = Button(
+            name="agenda-back",
+            child=Label(name="agenda-back-label", markup=icons.chevron_left),
+            on_clicked=lambda *_: self.widgets.show_notif(),
+        )
+        self.title_label = Label(name="agenda-title", label="Agenda")
+        header_box = CenterBox(
+            name="agenda-header",
+            start_children=[self.back_button],
+            center_children=[self.title_label],
+        )
+
+        self.rows = []
+        self.rows_box = Box(name="agenda-list", orientation="v", spacing=2)
+        self.empty_label = Label(
+            name="agenda-empty", label="No upcoming events", v_expand=True
+        )
+        self.empty_label.set_no_show_all(True)
+
+        self.add(header_box)
+        self.add(
+            ScrolledWindow(
+                min_content_size=(-1, -1),
+                child=self.rows_box,
+                v_expand=True,
+                propagate_width=False,
+                propagate_height=False,
+            )
+        )
+        self.add(self.empty_label)
+
+        self.calendar_events.connect("changed", lambda *_: self.refresh_if_mapped())
+        self.connect("map", lambda *_: self.refresh())
+
+    def show_from(self, day: date | None = None):
+        self.start_day = None if day == date.today() else day
+        self.refresh_if_mapped()
+
+    def refresh_if_mapped(self):
+        if self.get_mapped():
+            self.refresh()
+
+    def refresh(self):
+        start = self.start_day or date.today()
+        self.query_range = (start, start + timedelta(days=AGENDA_DAYS))
+        self.title_label.set_label(
+            "Agenda" if self.start_day is None else start.strftime("From %a %-d %b")
+        )
+        query_range = self.query_range
+        self.calendar_events.query(
+            *query_range,
+            lambda occurrences: self.show_events(query_range, occurrences),
+        )
+
+    def show_events(self, query_range, occurrences: list[Occurrence]):
+        if query_range != self.query_range:
+            return
+        first = query_range[0]
+        today = date.today()
+
+        entries = []
+        current_day = None
+        for occurrence in occurrences[:MAX_EVENTS]:
+            # Events that began earlier are listed under the first day shown.
+            day = max(date.fromtimestamp(occurrence.start), first)
+            if day != current_day:
+                current_day = day
+                entries.append((self.format_day(day, today), None))
+            entries.append((self.format_time(occurrence, day), occurrence))
+
+        while len(self.rows) < len(entries):
+            row = AgendaRow()
+            self.rows.append(row)
+            self.rows_box.add(row)
+        for row, (text, occurrence) in zip(self.rows, entries):
+            if occurrence is None:
+                row.bind_day(text)
+            else:
+                tooltip = "\n".join(
+                    filter(None, [occurrence.summary, occurrence.location, occurrence.calendar])
+                )
+                row.bind_event(text, occurrence.summary, tooltip)
+        for row in self.rows[len(entries) :]:
+            row.set_visible(False)
+        self.empty_label.set_visible(not entries)
+
+    @staticmethod
+    def format_day(day: date, today: date) -> str:
+        if day == today:
+            return "Today"
+        if day == today + timedelta(days=1):
+            return "Tomorrow"
+        return day.strftime("%A %-d %B")
+
+    @staticmethod
+    def format_time(occurrence: Occurrence, day: date) -> str:
+        start = datetime.fromtimestamp(occurrence.start)
+        if occurrence.all_day or start.date() < day:
+            return "All day"
+        return start.strftime("%I:%M %p" if data.DATETIME_12H_FORMAT else "%H:%M")
@@ -121,30 +121,7 @@ class Bar(Window):
             ],
         )
 
-        self.workspaces_num = Workspaces(
-            name="workspaces-num",
-            invert_scroll=True,
-            empty_scroll=True,
-            v_align="fill",
-            orientation="h" if not data.VERTICAL else "v",
-            spacing=0 if not data.BAR_WORKSPACE_USE_CHINESE_NUMERALS else 4,
-            buttons=[
-                WorkspaceButton(
-                    h_expand=False,
-                    v_expand=False,
-                    h_align="center",
-                    v_align="center",
-                    id=i,
-                    label=(
-                        CHINESE_NUMERALS[i - 1]
-                        if data.BAR_WORKSPACE_USE_CHINESE_NUMERALS
-                        and 1 <= i <= len(CHINESE_NUMERALS)
-                        else str(i)
-                    ),
-                )
-                for i in range(1, 11)
-            ],
-        )
+        self.workspaces_num = self.make_workspaces_num()
 
         self.ws_container = Box(
             name="workspaces-container",
@@ -178,17 +155,9 @@ class Bar(Window):
         self.on_language_switch()
         self.connection.connect("event::activelayout", self.on_language_switch)
 
-        # Determine date-time format based on the new setting
-        if data.DATETIME_12H_FORMAT:
-            time_format_horizontal = "%I:%M %p"
-            time_format_vertical = "%I\n%M\n%p"
-        else:
-            time_format_horizontal = "%H:%M"
-            time_format_vertical = "%H\n%M"
-
         self.date_time = DateTime(
             name="date-time",
-            formatters=[time_format_horizontal] if not data.VERTICAL else [time_format_vertical],
+            formatters=self.time_formatters(),
             h_align="center" if not data.VERTICAL else "fill",
             v_align="center",
             h_expand=True,
@@ -224,7 +193,9 @@ class Bar(Window):
         self.button_overview.connect("leave_notify_event", self.on_button_leave)
 
         self.control = ControlSmall()
-        self.metrics = MetricsSmall()
+        self.metrics = MetricsSmall(on_clicked=lambda *_: self.processes())
+        self.metrics.connect("enter_notify_event", self.on_button_enter)
+        self.metrics.connect("leave_notify_event", self.on_button_leave)
         self.battery = Battery()
 
         self.apply_component_props()
@@ -474,6 +445,69 @@ class Bar(Window):
         self.systray._update_visibility()
         self.chinese_numbers()
 
+        data.subscribe(
+            (
+                "BAR_COMPONENTS_VISIBILITY",
+                "DATETIME_12H_FORMAT",
+                "BAR_WORKSPACE_SHOW_NUMBER",
+                "BAR_WORKSPACE_USE_CHINESE_NUMERALS",
+            ),
+            self.on_config_changed,
+        )
+
+    def make_workspaces_num(self):
+        return Workspaces(
+            name="workspaces-num",
+            invert_scroll=True,
+            empty_scroll=True,
+            v_align="fill",
+            orientation="h" if not data.VERTICAL else "v",
+            spacing=0 if not data.BAR_WORKSPACE_USE_CHINESE_NUMERALS else 4,
+            buttons=[
+                WorkspaceButton(
+                    h_expand=False,
+                    v_expand=False,
+                    h_align="center",
+                    v_align="center",
+                    id=i,
+                    label=(
+                        CHINESE_NUMERALS[i - 1]
+                        if data.BAR_WORKSPACE_USE_CHINESE_NUMERALS
+                        and 1 <= i <= len(CHINESE_NUMERALS)
+                        else str(i)
+                    ),
+                )
+                for i in range(1, 11)
+            ],
+        )
+
+    def time_formatters(self):
+        if data.DATETIME_12H_FORMAT:
+            return ["%I:%M %p"] if not data.VERTICAL else ["%I\n%M\n%p"]
+        return ["%H:%M"] if not data.VERTICAL else ["%H\n%M"]
+
+    def on_config_changed(self, changed):
+        if "BAR_COMPONENTS_VISIBILITY" in changed:
+            self.component_visibility = data.BAR_COMPONENTS_VISIBILITY
+            self.apply_component_props()
+
+        if "DATETIME_12H_FORMAT" in changed:
+            self.date_time.formatters = self.time_formatters()
+            self.date_time.do_update_label()
+
+        if "BAR_WORKSPACE_USE_CHINESE_NUMERALS" in changed:
+            self.workspaces_num.destroy()
+            self.workspaces_num = self.make_workspaces_num()
+            self.chinese_numbers()
+
+        if changed & {"BAR_WORKSPACE_SHOW_NUMBER", "BAR_WORKSPACE_USE_CHINESE_NUMERALS"}:
+            self.ws_container.children = (
+                self.workspaces
+                if not data.BAR_WORKSPACE_SHOW_NUMBER
+                else self.workspaces_num
+            )
+            self.ws_container.show_all()
+
     def apply_component_props(self):
         components = {
             "button_apps": self.button_apps,
@@ -574,6 +608,10 @@ class Bar(Window):
         if self.notch:
             self.notch.open_notch("tools")
 
+    def processes(self):
+        if self.notch:
+            self.notch.open_notch("processes")
+
     def on_language_switch(self, _=None, event: HyprlandEvent = None):
         lang_data = (
             event.data[1]
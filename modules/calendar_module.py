@@ -1,34 +1,60 @@
 import calendar
-import subprocess
-from datetime import datetime, timedelta
+import ctypes
+import functools
+from datetime import date, datetime, timedelta
 
 import gi
 from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.label import Label
 
 import modules.icons as icons
+from services.calendar_events import CalendarEvents
 
 gi.require_version("Gtk", "3.0")
 from gi.repository import GLib, Gtk
 
+# Elementos LC_TIME de glibc (langinfo.h) que `locale week-1stday` y
+# `locale first_weekday` consultan; no están expuestos en el módulo locale.
+_NL_TIME_WEEK_1STDAY = 0x20066
+_NL_TIME_FIRST_WEEKDAY = 0x20068
+# Resúmenes de eventos que se muestran como máximo en el tooltip de un día.
+MAX_TOOLTIP_EVENTS = 5
+
+
+@functools.cache
+def locale_first_weekday() -> int:
+    """Primer día de la semana según LC_TIME (Lunes=0, ..., Domingo=6)."""
+    try:
+        libc = ctypes.CDLL("libc.so.6")
+        libc.nl_langinfo.argtypes = [ctypes.c_int]
+        libc.nl_langinfo.restype = ctypes.c_void_p
+        # week-1stday es una fecha AAAAMMDD guardada en los 32 bits bajos del
+        # propio puntero, igual que la lee `locale`.
+        origin = libc.nl_langinfo(_NL_TIME_WEEK_1STDAY) & 0xFFFFFFFF
+        first_weekday = ctypes.cast(libc.nl_langinfo(_NL_TIME_FIRST_WEEKDAY), ctypes.c_char_p).value
+        origin_date = date(origin // 10000, origin // 100 % 100, origin % 100)
+        # Misma combinación que antes hacíamos con la salida de `locale`.
+        return (origin_date + timedelta(days=first_weekday[0] - 1)).weekday()
+    except Exception as e:
+        print(f"Error getting locale first weekday: {e}")
+        return 0  # Por defecto Lunes
+
+
+@functools.lru_cache(maxsize=24)
+def month_layout(first_weekday, year, month):
+    """Los 42 números de día (0 = vacío) de la cuadrícula de 6 filas de un mes."""
+    days = [day for week in calendar.Calendar(firstweekday=first_weekday).monthdayscalendar(year, month) for day in week]
+    return tuple(days + [0] * (42 - len(days)))
+
 
 class Calendar(Gtk.Box):
-    def __init__(self, view_mode="month"):
+    def __init__(self, view_mode="month", widgets=None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=8, name="calendar")
         self.view_mode = view_mode
+        self.widgets = widgets
+        self.calendar_events = CalendarEvents.get_initial()
 
-        try:
-            origin_date_str = subprocess.check_output(["locale", "week-1stday"], text=True).strip()
-            first_weekday_val = int(subprocess.check_output(["locale", "first_weekday"], text=True).strip())
-            
-            origin_date = datetime.fromisoformat(origin_date_str)
-            # Esta lógica calcula el día de la semana (0-6, Lunes=0) que es considerado el primero
-            # según la configuración regional combinada de week-1stday y first_weekday.
-            date_of_first_day_of_week_config = origin_date + timedelta(days=first_weekday_val - 1)
-            self.first_weekday = date_of_first_day_of_week_config.weekday() # Lunes=0, ..., Domingo=6
-        except Exception as e:
-            print(f"Error getting locale first weekday: {e}")
-            self.first_weekday = 0  # Por defecto Lunes
+        self.first_weekday = locale_first_weekday()
 
         self.set_halign(Gtk.Align.CENTER)
         self.set_hexpand(False)
@@ -39,7 +65,7 @@ class Calendar(Gtk.Box):
             self.current_shown_date = self.current_day_date.replace(day=1)
             self.current_year = self.current_shown_date.year
             self.current_month = self.current_shown_date.month
-            self.current_day = self.current_day_date.day # Solo para resaltar en create_month_view
+            self.current_day = self.current_day_date.day
             self.previous_key = (self.current_year, self.current_month)
         elif self.view_mode == "week":
             # current_shown_date es el primer día (según locale) de la semana actual
@@ -54,9 +80,6 @@ class Calendar(Gtk.Box):
             self.set_valign(Gtk.Align.CENTER)
             self.set_vexpand(False)
         
-        self.cache_threshold = 3 # Umbral para mantener vistas en caché
-
-        self.month_views = {} # Reutilizado para vistas de semana también
 
         self.prev_button = Gtk.Button( # Nombre genérico del botón
             name="prev-month-button", 
@@ -89,10 +112,23 @@ class Calendar(Gtk.Box):
         self.stack.set_transition_duration(250)
         self.pack_start(self.stack, True, True, 0)
 
+        # Dos cuadrículas fijas que se reasignan a nuevas fechas: la visible y
+        # la que entra deslizándose en la siguiente navegación.
+        rows = 6 if self.view_mode == "month" else 1
+        grid_name = "calendar-grid" if self.view_mode == "month" else "calendar-grid-week-view"
+        self.grids = [self.create_grid(grid_name, rows) for _ in range(2)]
+        for i, grid in enumerate(self.grids):
+            self.stack.add_named(grid, f"view-{i}")
+        self.stack.show_all()
+        self.shown_grid = None
+
         self.update_header() # Llamar antes de update_calendar para que el primer header sea correcto
         self.update_calendar()
         self.schedule_midnight_update()
 
+        # Los eventos llegan en segundo plano; se vuelven a pedir si cambian.
+        self.calendar_events.connect("changed", lambda *_: self.load_events(self.shown_grid))
+
     def schedule_midnight_update(self):
         now = datetime.now()
         midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
@@ -104,30 +140,19 @@ class Calendar(Gtk.Box):
         now = datetime.now()
         self.current_day_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        key_to_remove_for_today_highlight = None
         if self.view_mode == "month":
             # Actualizar la fecha base para la vista de mes si es necesario (aunque usualmente no cambia a medianoche)
             self.current_shown_date = self.current_day_date.replace(day=1)
             self.current_year = self.current_shown_date.year
             self.current_month = self.current_shown_date.month
             self.current_day = self.current_day_date.day # Actualizar el día actual
-            key_to_remove_for_today_highlight = (self.current_year, self.current_month)
         elif self.view_mode == "week":
             days_to_subtract = (self.current_day_date.weekday() - self.first_weekday + 7) % 7
             self.current_shown_date = self.current_day_date - timedelta(days=days_to_subtract)
             self.current_year = self.current_shown_date.year # Para el header
             self.current_month = self.current_shown_date.month # Para el header
-            iso_year, iso_week, _ = self.current_shown_date.isocalendar()
-            key_to_remove_for_today_highlight = (iso_year, iso_week)
 
-        # Eliminar la vista actual de la caché para forzar la regeneración con el nuevo "hoy" resaltado
-        if key_to_remove_for_today_highlight and key_to_remove_for_today_highlight in self.month_views:
-            widget = self.month_views.pop(key_to_remove_for_today_highlight)
-            self.stack.remove(widget)
-            # Si la vista eliminada era la actual, previous_key podría quedar desactualizado
-            # pero update_calendar lo corregirá al establecer la nueva vista.
-
-        self.update_calendar() # Esto regenerará la vista si fue eliminada y actualizará el resaltado
+        self.update_calendar(force=True) # Reasigna la vista actual para mover el resaltado de hoy
         self.schedule_midnight_update()
         return False # Importante para que el timeout no se repita automáticamente
 
@@ -138,148 +163,158 @@ class Calendar(Gtk.Box):
             self.current_shown_date.strftime("%B %Y").capitalize()
         )
 
-        for child in self.weekday_row.get_children():
-            self.weekday_row.remove(child)
-        
+        # Las iniciales no cambian al navegar; se crean una sola vez
+        if self.weekday_row.get_children():
+            return
+
         day_initials = self.get_weekday_initials()
         for day_initial in day_initials:
             label = Gtk.Label(label=day_initial.upper(), name="weekday-label")
             self.weekday_row.pack_start(label, True, True, 0)
         self.weekday_row.show_all()
 
-    def update_calendar(self):
-        new_key = None
-        child_name = "" # Renombrado de child_name_prefix
-        view_widget = None
-
+    def update_calendar(self, force=False):
         if self.view_mode == "month":
             new_key = (self.current_year, self.current_month)
-            child_name = f"{self.current_year}_{self.current_month}"
-            if new_key not in self.month_views:
-                view_widget = self.create_month_view(self.current_year, self.current_month)
-        elif self.view_mode == "week":
+        else:
             iso_year, iso_week, _ = self.current_shown_date.isocalendar()
             new_key = (iso_year, iso_week)
-            child_name = f"{iso_year}_w{iso_week}"
-            if new_key not in self.month_views:
-                # Pasar self.current_shown_date directamente a create_week_view
-                view_widget = self.create_week_view(self.current_shown_date)
-        
-        if new_key is None: return
 
-        if new_key > self.previous_key:
+        if self.shown_grid is not None and new_key == self.previous_key:
+            # Misma vista (p. ej. medianoche): se reasigna en el sitio, sin transición.
+            if force:
+                self.bind_grid(self.shown_grid)
+            return
+
+        if self.shown_grid is None or new_key == self.previous_key:
+            self.stack.set_transition_type(Gtk.StackTransitionType.NONE)
+        elif new_key > self.previous_key:
             self.stack.set_transition_type(Gtk.StackTransitionType.SLIDE_LEFT)
-        elif new_key < self.previous_key:
+        else:
             self.stack.set_transition_type(Gtk.StackTransitionType.SLIDE_RIGHT)
-        # else: no transition if key is the same (e.g. on_midnight for same month/week)
 
         self.previous_key = new_key
 
-        if view_widget: # Si se creó una nueva vista
-            self.month_views[new_key] = view_widget
-            self.stack.add_titled(view_widget, child_name, child_name)
-        
-        self.stack.set_visible_child_name(child_name)
-        # El encabezado se actualiza ANTES de llamar a update_calendar en __init__ y on_clicked,
-        # y también en on_midnight si es necesario.
-        # Pero si la vista cambia (ej. de Enero a Febrero), el encabezado debe reflejarlo.
+        grid = self.grids[1] if self.shown_grid is self.grids[0] else self.grids[0]
+        self.bind_grid(grid)
+        self.stack.set_visible_child(grid)
+        self.shown_grid = grid
         self.update_header() # Asegurar que el header está sincronizado con la vista actual
-        self.stack.show_all()
 
-        self.prune_cache()
-
-    def prune_cache(self):
-        def get_key_index(key_tuple):
-            year, num = key_tuple # num es month o week_number
-            if self.view_mode == "month": # Asumiendo que la clave es (año, mes)
-                return year * 12 + (num - 1)
-            else: # Asumiendo que la clave es (año_iso, semana_iso)
-                return year * 53 + num # Usar 53 para cubrir años con 53 semanas ISO
-
-        current_index = get_key_index(self.previous_key) # previous_key es la clave de la vista actual
-        keys_to_remove = []
-        for key_iter in self.month_views:
-            if abs(get_key_index(key_iter) - current_index) > self.cache_threshold:
-                keys_to_remove.append(key_iter)
-        for key_to_remove in keys_to_remove:
-            widget = self.month_views.pop(key_to_remove)
-            self.stack.remove(widget)
-
-    def create_month_view(self, year, month):
-        grid = Gtk.Grid(column_homogeneous=True, row_homogeneous=False, name="calendar-grid")
-        cal = calendar.Calendar(firstweekday=self.first_weekday)
-        month_days = cal.monthdayscalendar(year, month)
-
-        while len(month_days) < 6: # Asegurar 6 filas para consistencia visual
-            month_days.append([0] * 7) # [0] representa un día vacío
-
-        for row, week in enumerate(month_days):
-            for col, day_num in enumerate(week):
+    def create_grid(self, name, rows):
+        grid = Gtk.Grid(column_homogeneous=True, row_homogeneous=False, name=name)
+        grid.cells = []
+        for row in range(rows):
+            for col in range(7):
                 day_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, name="day-box")
                 top_spacer = Gtk.Box(hexpand=True, vexpand=True)
                 middle_box = Gtk.Box(hexpand=True, vexpand=True)
                 bottom_spacer = Gtk.Box(hexpand=True, vexpand=True)
 
-                if day_num == 0:
-                    label = Label(name="day-empty", markup=icons.dot)
-                else:
-                    label = Gtk.Label(label=str(day_num), name="day-label")
-                    day_date_obj = datetime(year, month, day_num)
-                    if day_date_obj == self.current_day_date:
-                        label.get_style_context().add_class("current-day")
-                
+                # Ambas etiquetas existen siempre; bind_grid decide cuál se ve.
+                day_box.day_label = Gtk.Label(name="day-label")
+                day_box.empty_label = Label(name="day-empty", markup=icons.dot)
+                for label in (day_box.day_label, day_box.empty_label):
+                    label.set_no_show_all(True)
+                # El punto de eventos siempre ocupa su sitio; solo cambia de color.
+                day_box.event_dot = Label(name="day-event-dot", markup=icons.dot)
+                day_box.day_date = None
+                bottom_spacer.set_center_widget(day_box.event_dot)
+
                 middle_box.pack_start(Gtk.Box(hexpand=True, vexpand=True), True, True, 0)
-                middle_box.pack_start(label, False, False, 0)
+                middle_box.pack_start(day_box.day_label, False, False, 0)
+                middle_box.pack_start(day_box.empty_label, False, False, 0)
                 middle_box.pack_start(Gtk.Box(hexpand=True, vexpand=True), True, True, 0)
 
                 day_box.pack_start(top_spacer, True, True, 0)
                 day_box.pack_start(middle_box, True, True, 0)
                 day_box.pack_start(bottom_spacer, True, True, 0)
-                grid.attach(day_box, col, row, 1, 1)
-        grid.show_all()
+
+                cell = Gtk.EventBox()
+                cell.add(day_box)
+                cell.connect("button-press-event", self.on_day_clicked, day_box)
+                grid.attach(cell, col, row, 1, 1)
+                grid.cells.append(day_box)
+        grid.dates = []
+        grid.events_range = None
         return grid
 
-    def create_week_view(self, first_day_of_week_to_display):
-        grid = Gtk.Grid(column_homogeneous=True, row_homogeneous=False, name="calendar-grid-week-view") # Podría tener estilo diferente
-        
-        # El mes de referencia para atenuar es el mes de first_day_of_week_to_display
-        # que es self.current_shown_date, y su mes es self.current_month (actualizado en nav)
-        reference_month_for_dimming = first_day_of_week_to_display.month
-
-        for col in range(7):
-            current_day_in_loop = first_day_of_week_to_display + timedelta(days=col)
-            
-            day_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, name="day-box") # Reusar estilo de day-box
-            top_spacer = Gtk.Box(hexpand=True, vexpand=True)
-            middle_box = Gtk.Box(hexpand=True, vexpand=True)
-            bottom_spacer = Gtk.Box(hexpand=True, vexpand=True)
-
-            label = Gtk.Label(label=str(current_day_in_loop.day), name="day-label")
-
-            if current_day_in_loop == self.current_day_date:
-                label.get_style_context().add_class("current-day")
-            
-            if current_day_in_loop.month != reference_month_for_dimming:
-                 label.get_style_context().add_class("dim-label") # Necesita CSS: .dim-label { opacity: 0.5; } o similar
-
-            middle_box.pack_start(Gtk.Box(hexpand=True, vexpand=True), True, True, 0)
-            middle_box.pack_start(label, False, False, 0)
-            middle_box.pack_start(Gtk.Box(hexpand=True, vexpand=True), True, True, 0)
-
-            day_box.pack_start(top_spacer, True, True, 0)
-            day_box.pack_start(middle_box, True, True, 0)
-            day_box.pack_start(bottom_spacer, True, True, 0)
-            
-            grid.attach(day_box, col, 0, 1, 1) # Todos los días en la fila 0
-        
-        # Para mantener una altura similar a la vista mensual, se podrían añadir filas vacías.
-        # Esto es opcional y depende del diseño deseado.
-        # for r_idx in range(1, 6): # Añadir 5 filas vacías
-        #     empty_row_placeholder = Gtk.Box(name="day-empty-placeholder", hexpand=True, vexpand=True, height_request=20) # Ajustar altura
-        #     grid.attach(empty_row_placeholder, 0, r_idx, 7, 1) # Abarca las 7 columnas
+    def bind_grid(self, grid):
+        if self.view_mode == "month":
+            days = month_layout(self.first_weekday, self.current_year, self.current_month)
+            dates = [date(self.current_year, self.current_month, day) if day else None for day in days]
+        else:
+            dates = [(self.current_shown_date + timedelta(days=col)).date() for col in range(7)]
+
+        today = self.current_day_date.date()
+        # En la vista semanal se atenúan los días fuera del mes de referencia
+        reference_month_for_dimming = self.current_shown_date.month
+        for day_box, day_date in zip(grid.cells, dates):
+            self.bind_day(day_box, day_date, today, reference_month_for_dimming)
+        grid.dates = dates
+        self.load_events(grid)
+
+    def bind_day(self, day_box, day_date, today, reference_month):
+        label = day_box.day_label
+        day_box.day_date = day_date
+        # Los puntos se restauran cuando responde la consulta de eventos.
+        day_box.event_dot.get_style_context().remove_class("active")
+        day_box.set_tooltip_text(None)
+        day_box.empty_label.set_visible(day_date is None)
+        label.set_visible(day_date is not None)
+        if day_date is None:
+            return
+
+        label.set_text(str(day_date.day))
+        style = label.get_style_context()
+        if day_date == today:
+            style.add_class("current-day")
+        else:
+            style.remove_class("current-day")
+        if self.view_mode == "week" and day_date.month != reference_month:
+            style.add_class("dim-label")
+        else:
+            style.remove_class("dim-label")
+
+    def load_events(self, grid):
+        days = [day_date for day_date in grid.dates if day_date is not None]
+        if not days:
+            return
+        events_range = (days[0], days[-1] + timedelta(days=1))
+        grid.events_range = events_range
+        self.calendar_events.query(
+            *events_range,
+            lambda occurrences: self.show_events(grid, events_range, occurrences),
+        )
 
-        grid.show_all()
-        return grid
+    def show_events(self, grid, events_range, occurrences):
+        # La cuadrícula pudo reasignarse a otras fechas mientras tanto.
+        if grid.events_range != events_range:
+            return
+        first, end = events_range
+        summaries = {}
+        for occurrence in occurrences:
+            day = max(date.fromtimestamp(occurrence.start), first)
+            last = date.fromtimestamp(max(occurrence.start, occurrence.end - 1))
+            while day <= last and day < end:
+                summaries.setdefault(day, []).append(occurrence.summary)
+                day += timedelta(days=1)
+
+        for day_box in grid.cells:
+            day_summaries = summaries.get(day_box.day_date)
+            style = day_box.event_dot.get_style_context()
+            if day_summaries:
+                style.add_class("active")
+                extra = len(day_summaries) - MAX_TOOLTIP_EVENTS
+                lines = day_summaries[:MAX_TOOLTIP_EVENTS] + ([f"+{extra}"] if extra > 0 else [])
+                day_box.set_tooltip_text("\n".join(lines))
+            else:
+                style.remove_class("active")
+                day_box.set_tooltip_text(None)
+
+    def on_day_clicked(self, cell, event, day_box):
+        if day_box.day_date is not None and self.widgets is not None:
+            self.widgets.show_agenda(day_box.day_date)
 
     def get_weekday_initials(self):
         # Genera las iniciales de los días de la semana comenzando por self.first_weekday
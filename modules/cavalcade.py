@@ -1,8 +1,6 @@
 import configparser
-import ctypes
 import os
 import re
-import signal
 import struct
 import subprocess
 from math import pi
@@ -12,6 +10,8 @@ from fabric.widgets.overlay import Overlay
 from gi.repository import Gdk, GLib, Gtk
 from loguru import logger
 
+from utils.functions import set_death_signal
+
 
 
 def get_bars(file_path):
@@ -25,16 +25,6 @@ CAVA_CONFIG = get_relative_path("../config/cavalcade/cava.ini")
 bars = get_bars(CAVA_CONFIG)
 
 
-def set_death_signal():
-    """
-    Set the death signal of the child process to SIGTERM so that if the parent
-    process is killed, the child (cava) is automatically terminated.
-    """
-    libc = ctypes.CDLL("libc.so.6")
-    PR_SET_PDEATHSIG = 1
-    libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
-
-
 class Cava:
     """
     CAVA wrapper.
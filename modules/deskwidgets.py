@@ -1,19 +1,18 @@
-import psutil
 from fabric.widgets.box import Box
 from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 from fabric.widgets.datetime import DateTime
 from fabric.widgets.circularprogressbar import CircularProgressBar
 from widgets.wayland import WaylandWindow as Window
-from fabric.utils import invoke_repeater
 import requests
-import urllib.parse
 import datetime
 from gi.repository import GLib
 from concurrent.futures import ThreadPoolExecutor
 import time
 import config.data as data
 from config.data import load_config
+from services.metrics import MetricsService
+from services.weather import WeatherService, weather_emoji
 import subprocess
 
 executor = ThreadPoolExecutor(max_workers=4)
@@ -30,90 +29,17 @@ def margin():
     )
 
 
-def get_location():
-    """Fetch location from config file or IP API asynchronously."""
-    if data.WEATHER_LOCATION:
-        return data.WEATHER_LOCATION.replace(" ", "")
-    for attempt in range(5):
-        try:
-            response = requests.get("https://ipinfo.io/json", timeout=3)
-            if response.status_code == 200:
-                return response.json().get("city", "").replace(" ", "")
-        except requests.RequestException as e:
-            print(f"Error getting location: {e}")
-            if attempt < 4:
-                time.sleep(10)
-            else:
-                return ""
-
-
-def get_location_async(callback):
-    """Fetch location asynchronously to prevent UI freeze."""
-    executor.submit(lambda: GLib.idle_add(callback, get_location()))
-
-
-def get_weather(callback):
-    """Fetch weather data asynchronously and update UI."""
-
-    def fetch_weather():
-        location = get_location()
-        if not location:
-            return GLib.idle_add(callback, None)
-
-        encoded_location = urllib.parse.quote(location)
-        url = f"https://wttr.in/{encoded_location}?format=j1"
-        urlemoji = f"https://wttr.in/{encoded_location}?format=%c"
-
-        for attempt in range(5):
-            try:
-                response = requests.get(urlemoji, timeout=3)
-                responseinfo = requests.get(url, timeout=3).json()
-
-                if response.status_code == 200:
-                    temp_unit = data.WEATHER_FORMAT
-                    temp = (
-                        responseinfo["current_condition"][0][f"temp_{temp_unit}"] + "°"
-                    )
-                    feels_like = (
-                        responseinfo["current_condition"][0][f"FeelsLike{temp_unit}"]
-                        + "°"
-                    )
-                    condition = responseinfo["current_condition"][0]["weatherDesc"][0][
-                        "value"
-                    ]
-                    location = responseinfo["nearest_area"][0]["areaName"][0]["value"]
-                    emoji = response.text.strip()
-                    update_time = datetime.datetime.now().strftime("%I:%M:%S %p")
-
-                    GLib.idle_add(
-                        callback,
-                        [emoji, temp, condition, feels_like, location, update_time],
-                    )
-                    return
-            except requests.RequestException as e:
-                print(f"Error fetching weather (attempt {attempt + 1}): {e}")
-                if attempt < 4:
-                    time.sleep(10)
-                else:
-                    GLib.idle_add(callback, None)
-                    return
-
-    executor.submit(fetch_weather)
-
-
-def update_weather(widget):
-    def fetch_and_update():
-        get_weather(lambda weather_info: update_widget(widget, weather_info))
-        return True
-
-    GLib.timeout_add_seconds(600, fetch_and_update)
-    fetch_and_update()
-
-
-def update_widget(widget, weather_info):
-    if weather_info:
-        widget.weatherinfo = weather_info
-        widget.update_labels(weather_info)
+def weather_info(payload, fetched_at):
+    """Turn a wttr.in j1 payload into the values shown by `WeatherWidget`."""
+    current = payload["current_condition"][0]
+    temp_unit = data.WEATHER_FORMAT
+    temp = current[f"temp_{temp_unit}"] + "°"
+    feels_like = current[f"FeelsLike{temp_unit}"] + "°"
+    condition = current["weatherDesc"][0]["value"]
+    location = payload["nearest_area"][0]["areaName"][0]["value"]
+    emoji = weather_emoji(current)
+    update_time = datetime.datetime.fromtimestamp(fetched_at).strftime("%I:%M:%S %p")
+    return [emoji, temp, condition, feels_like, location, update_time]
 
 
 class Sysinfo(Box):
@@ -196,8 +122,10 @@ class Sysinfo(Box):
             ],
         )
 
-        self.update_status()
-        invoke_repeater(1000, self.update_status)
+        self.metrics_service = MetricsService.get_initial()
+        sampled_id = self.metrics_service.connect("sampled", self.update_status)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        self.metrics_service.subscribe(self, ["cpu", "mem", "battery"])
 
         self.add(
             Box(
@@ -209,25 +137,23 @@ class Sysinfo(Box):
         )
         self.show_all()
 
-    def update_status(self):
-        """Update system info asynchronously to prevent UI lag."""
-
-        def update():
-            cpu = psutil.cpu_percent()
-            ram = psutil.virtual_memory().percent
-            battery = (
-                psutil.sensors_battery().percent if psutil.sensors_battery() else 80
-            )
-            GLib.idle_add(self.cpu_progress.set_value, cpu)
-            GLib.idle_add(self.ram_progress.set_value, ram)
-            GLib.idle_add(self.bat_circular.set_value, battery)
-
-            GLib.idle_add(self.cpu_progress.set_tooltip_text, f"{str(round(cpu))}%")
-            GLib.idle_add(self.ram_progress.set_tooltip_text, f"{str(round(ram))}%")
-            GLib.idle_add(self.bat_circular.set_tooltip_text, f"{str(round(battery))}%")
-
-        executor.submit(update)
-        return True
+    def update_status(self, _, sample):
+        """Update the progress bars from a batch of the shared metrics sampler."""
+        if not self.get_mapped():
+            return
+        if "cpu" in sample:
+            cpu = sample["cpu"]
+            self.cpu_progress.set_value(cpu)
+            self.cpu_progress.set_tooltip_text(f"{str(round(cpu))}%")
+        if "mem" in sample:
+            ram = sample["mem"]
+            self.ram_progress.set_value(ram)
+            self.ram_progress.set_tooltip_text(f"{str(round(ram))}%")
+        if "battery" in sample:
+            percent, charging, _ = sample["battery"]
+            battery = percent if charging is not None else 80
+            self.bat_circular.set_value(battery)
+            self.bat_circular.set_tooltip_text(f"{str(round(battery))}%")
 
 
 class WeatherWidget(Box):
@@ -295,7 +221,17 @@ class WeatherWidget(Box):
             ),
         )
         self.set_visible(False)
-        update_weather(self)
+
+        self.weather_service = WeatherService.get_initial()
+        self.weather_service.connect("changed", self.on_weather_changed)
+
+    def on_weather_changed(self, service, payload):
+        try:
+            self.weatherinfo = weather_info(payload, service.fetched_at)
+        except (KeyError, IndexError) as e:
+            print(f"Error reading weather data: {e}")
+            return
+        self.update_labels(self.weatherinfo)
 
     def update_labels(self, weather_info):
         if not self.weatherinfo:
@@ -471,8 +407,9 @@ if data.DESKTOP_WIDGETS:
                     all_visible=False,
                     **kwargs,
                 )
+                self.sys_widget = None
                 if config.get("widgets_sysinfo_visible", True):
-                    sys_widget = Window(
+                    self.sys_widget = Window(
                         layer="bottom",
                         anchor="bottom center",
                         margin=f"0 0 {margin()}px 0",
@@ -484,8 +421,11 @@ if data.DESKTOP_WIDGETS:
                         ),
                         all_visible=False,
                     )
-                else:
-                    sys_widget = None
+                    # The margin keeps sysinfo clear of the dock.
+                    data.subscribe(
+                        ("DOCK_ICON_SIZE", "DOCK_ALWAYS_OCCLUDED"),
+                        self.on_dock_changed,
+                    )
                 if config.get("widgets_activation_visible", True):
                     activationnag = Window(
                         name="activation",
@@ -508,6 +448,9 @@ if data.DESKTOP_WIDGETS:
                 else:
                     activationnag = None
 
+            def on_dock_changed(self, changed):
+                self.sys_widget.margin = f"0 0 {margin()}px 0"
+
     else:
 
         class Deskwidgets(Window):
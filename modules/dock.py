@@ -282,6 +282,8 @@ class Dock(Window):
             self.conn.connect("event::workspace", self.check_hide)
         
         GLib.timeout_add_seconds(1, self.check_config_change)
+        if not self.integrated_mode:
+            data.subscribe(("DOCK_ICON_SIZE", "DOCK_ALWAYS_OCCLUDED"), self.on_config_changed)
             
     def _build_app_identifiers_map(self):
         identifiers = {}
@@ -741,12 +743,6 @@ class Dock(Window):
         GLib.idle_add(process_drag_end)
     def check_config_change(self):
         new_config = read_config()
-        if not self.integrated_mode:
-            new_always_occluded = data.DOCK_ALWAYS_OCCLUDED 
-            if self.always_occluded != new_always_occluded:
-                self.always_occluded = new_always_occluded
-                self.check_occlusion_state() 
-
         if new_config.get("pinned_apps", []) != self.config.get("pinned_apps", []):
             self.config = new_config
             self.pinned = self.config.get("pinned_apps", [])
@@ -786,6 +782,17 @@ class Dock(Window):
         if file_updated and not skip_update:
             self.update_dock()
 
+    def on_config_changed(self, changed):
+        # Settings come from the config bus; pins in dock.json are still
+        # polled by check_config_change.
+        if "DOCK_ALWAYS_OCCLUDED" in changed:
+            self.always_occluded = data.DOCK_ALWAYS_OCCLUDED
+            self.check_occlusion_state()
+        if "DOCK_ICON_SIZE" in changed:
+            self.icon_size = data.DOCK_ICON_SIZE
+            self.effective_occlusion_size = 36 + self.icon_size
+            self.update_dock()
+
     @staticmethod
     def notify_config_change():
         for dock_instance in Dock._instances: 
@@ -794,13 +801,6 @@ class Dock(Window):
     def check_config_change_immediate(self): 
         new_config = read_config()
         
-        if not self.integrated_mode:
-            previous_always_occluded = self.always_occluded
-            self.always_occluded = data.DOCK_ALWAYS_OCCLUDED 
-            
-            if previous_always_occluded != self.always_occluded:
-                self.check_occlusion_state() 
-        
         if new_config.get("pinned_apps", []) != self.config.get("pinned_apps", []):
             self.config = new_config
             self.pinned = self.config.get("pinned_apps", [])
@@ -1,7 +1,6 @@
 import os
 import subprocess
 
-import ijson
 from fabric.utils import remove_handler
 from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
@@ -9,10 +8,11 @@ from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.label import Label
 from fabric.widgets.stack import Stack
-from gi.repository import Gdk
+from gi.repository import Gdk, Gtk
 
 import config.data as data
 import modules.icons as icons
+from utils.emoji_index import EmojiIndex, EmojiUsage, rank, recent_ids
 
 vertical_mode = data.PANEL_THEME == "Panel" and (data.BAR_POSITION in ["Left", "Right"] or data.PANEL_POSITION in ["Start", "End"])
 
@@ -32,11 +32,14 @@ class EmojiPicker(Box):
         self.selected_index = -1
         self.emojis_per_page = emoji_columns * emoji_rows
         self.current_page_index = 0
-        self.filtered_emojis = []
+        # Emoji ids per page; with an empty query the first page holds the recents.
+        self.pages = []
         self.total_pages = 0
 
         self._arranger_handler: int = 0
-        self._all_emojis = self._load_emoji_data()
+        # Loaded on first open so startup does not pay for it.
+        self.index = None
+        self.usage = EmojiUsage()
 
         self.stack = Stack(
             name="viewport",
@@ -45,6 +48,11 @@ class EmojiPicker(Box):
             transition_type="slide-up-down",
             transition_duration=200,
         )
+        # Two pooled grids: page flips rebind the hidden one and slide to it,
+        # so no widgets are created after startup.
+        self.grids = [self.bake_emoji_grid(), self.bake_emoji_grid()]
+        for i, grid in enumerate(self.grids):
+            self.stack.add_named(grid, f"grid-{i}")
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Emojis...",
@@ -85,24 +93,20 @@ class EmojiPicker(Box):
         self.add(self.picker_box)
         self.show_all()
 
-    def _load_emoji_data(self):
-        emoji_data = {}
+    def _load_emoji_index(self):
         emoji_file_path = get_relative_path("../assets/emoji.json")
         if not os.path.exists(emoji_file_path):
             print(f"Emoji JSON file not found at: {emoji_file_path}")
-            return {}
-
-        with open(emoji_file_path, 'r') as f:
-            for emoji_char, emoji_info in ijson.kvitems(f, ''):
-                emoji_data[emoji_char] = emoji_info
-        return emoji_data
+            return EmojiIndex.empty()
+        return EmojiIndex.load(emoji_file_path)
 
     def close_picker(self):
-        self.stack.children = []
-        self.selected_index = -1
+        self.update_selection(-1)
         self.notch.close_notch()
 
     def open_picker(self):
+        if self.index is None:
+            self.index = self._load_emoji_index()
         self.search_entry.set_text("")
         self.current_page_index = 0
         self.arrange_viewport()
@@ -110,18 +114,19 @@ class EmojiPicker(Box):
 
     def arrange_viewport(self, query: str = ""):
         remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.stack.children = []
-        self.selected_index = -1
+        self.update_selection(-1)
         self.current_page_index = 0
 
-        self.filtered_emojis = [
-            (emoji_char, emoji_info)
-            for emoji_char, emoji_info in self._all_emojis.items()
-            if query.casefold() in (emoji_info.get("name", "") + " " + emoji_info.get("group", "")).casefold()
-        ]
-        self.total_pages = (len(self.filtered_emojis) + self.emojis_per_page - 1) // self.emojis_per_page if self.filtered_emojis else 0
+        if self.index is None:
+            self.index = self._load_emoji_index()
+        per_page = self.emojis_per_page
+        recent = recent_ids(self.index, self.usage, per_page) if not query.strip() else []
+        emoji_ids = rank(self.index, self.usage, query, per_page)
+        rest = emoji_ids[len(recent):]
+        self.pages = ([recent] if recent else []) + [rest[i:i + per_page] for i in range(0, len(rest), per_page)]
+        self.total_pages = len(self.pages)
 
-        self.load_page(self.current_page_index)
+        self.load_page(self.current_page_index, animate=False)
 
         should_resize = not query
 
@@ -130,27 +135,19 @@ class EmojiPicker(Box):
         if query.strip() != "" and self.get_all_emoji_buttons():
             self.update_selection(0)
 
-    def load_page(self, page_index):
-        self.update_selection(-1)
-        page_box = Box(name=f"page-box-{page_index}", orientation="v", spacing=4)
-        start_index = page_index * self.emojis_per_page
-        end_index = min((page_index + 1) * self.emojis_per_page, len(self.filtered_emojis))
-        page_emojis = self.filtered_emojis[start_index:end_index]
-
-        grid_box = Box(name="emoji-grid-box", orientation="v", spacing=2)
-
-        row_box = None
-        for i, (emoji_char, emoji_info) in enumerate(page_emojis):
-            if i % emoji_columns == 0:
-                row_box = Box(name="emoji-row-box", orientation="h", spacing=2)
-                grid_box.add(row_box)
-            if row_box is not None:
-                row_box.add(self.bake_emoji_slot(emoji_char, emoji_info))
-        page_box.add(grid_box)
-        self.stack.add_named(page_box, f"page-{page_index}")
-        self.stack.set_visible_child_name(f"page-{page_index}")
-        page_box.show_all()
-
+    def load_page(self, page_index, animate=True):
+        page_emojis = self.pages[page_index] if page_index < self.total_pages else []
+
+        visible = self.stack.get_visible_child()
+        grid = visible
+        if animate:
+            grid = self.grids[1] if visible is self.grids[0] else self.grids[0]
+        for i, button in enumerate(grid.slot_buttons):
+            self.bind_emoji_slot(button, page_emojis[i] if i < len(page_emojis) else None)
+        self.stack.set_visible_child_full(
+            f"grid-{self.grids.index(grid)}",
+            self.stack.get_transition_type() if animate else Gtk.StackTransitionType.NONE,
+        )
 
         buttons = self.get_all_emoji_buttons()
         if buttons and self.selected_index != -1:
@@ -164,7 +161,26 @@ class EmojiPicker(Box):
     def resize_viewport(self):
         return False
 
-    def bake_emoji_slot(self, emoji_char: str, emoji_info: dict, **kwargs) -> Button:
+    def bake_emoji_grid(self) -> Box:
+        grid_box = Box(name="emoji-grid-box", orientation="v", spacing=2)
+        grid_box.slot_buttons = []
+        for _ in range(emoji_rows):
+            row_box = Box(name="emoji-row-box", orientation="h", spacing=2)
+            for _ in range(emoji_columns):
+                button = self.bake_emoji_slot()
+                row_box.add(button)
+                grid_box.slot_buttons.append(button)
+            grid_box.add(row_box)
+        return grid_box
+
+    def bake_emoji_slot(self, **kwargs) -> Button:
+        label = Label(
+            name="emoji-char-label",
+            use_markup=True,
+            v_align="center",
+            h_align="center",
+            css_name="emoji-char-label"
+        )
         button = Button(
             name="emoji-slot-button",
             child=Box(
@@ -172,23 +188,34 @@ class EmojiPicker(Box):
                 orientation="horizontal",
                 halign="center",
                 valign="center",
-                children=[
-                    Label(
-                        name="emoji-char-label",
-                        label=emoji_char,
-                        use_markup=True,
-                        v_align="center",
-                        h_align="center",
-                        css_name="emoji-char-label"
-                    ),
-                ],
+                children=[label],
             ),
-            tooltip_text=emoji_info.get("name", "Unknown"),
-            on_clicked=lambda *_: (self.copy_emoji_to_clipboard(emoji_char), self.close_picker()),
+            on_clicked=self.on_emoji_slot_clicked,
             **kwargs,
         )
+        button.get_child().show_all()
+        # Visibility follows the binding, not show_all() on the picker.
+        button.set_no_show_all(True)
+        button.emoji_label = label
+        button.emoji_char = None
         return button
 
+    def bind_emoji_slot(self, button: Button, emoji_id):
+        button.get_style_context().remove_class("selected")
+        if emoji_id is None:
+            button.emoji_char = None
+            button.set_visible(False)
+            return
+        button.emoji_char = self.index.chars[emoji_id]
+        button.emoji_label.set_label(button.emoji_char)
+        button.set_tooltip_text(self.index.names[emoji_id] or "Unknown")
+        button.set_visible(True)
+
+    def on_emoji_slot_clicked(self, button):
+        if button.emoji_char is not None:
+            self.copy_emoji_to_clipboard(button.emoji_char)
+            self.close_picker()
+
     def update_selection(self, new_index: int):
         buttons = self.get_all_emoji_buttons()
         if not buttons:
@@ -210,13 +237,10 @@ class EmojiPicker(Box):
 
 
     def get_all_emoji_buttons(self):
-        buttons = []
         current_page = self.stack.get_visible_child()
-        if current_page and current_page.get_children():
-            if current_page.get_children()[0].get_children():
-                for row_box in current_page.get_children()[0].get_children():
-                    buttons.extend(row_box.get_children())
-        return buttons
+        if current_page is None:
+            return []
+        return [button for button in current_page.slot_buttons if button.emoji_char is not None]
 
 
     def on_search_entry_activate(self, text):
@@ -315,6 +339,7 @@ class EmojiPicker(Box):
         self.update_selection(new_index)
 
     def copy_emoji_to_clipboard(self, emoji_char: str):
+        self.usage.record(emoji_char)
         try:
             subprocess.run(["wl-copy"], input=emoji_char.encode('utf-8'), check=True)
         except subprocess.CalledProcessError as e:
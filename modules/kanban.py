@@ -1,7 +1,3 @@
-import json
-import os
-from pathlib import Path
-
 import cairo
 import gi
 from fabric.widgets.box import Box
@@ -11,6 +7,7 @@ from fabric.widgets.scrolledwindow import ScrolledWindow
 
 import config.data as data
 import modules.icons as icons
+from services.kanban import DEFAULT_BOARD, KanbanStore
 
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gdk, GLib, GObject, Gtk
@@ -98,13 +95,10 @@ class InlineEditor(Gtk.Box):
         return False
 
 class KanbanNote(Gtk.EventBox):
-    __gsignals__ = {
-        'changed': (GObject.SignalFlags.RUN_LAST, None, ()),
-    }
-
-    def __init__(self, text):
+    def __init__(self, board, card):
         super().__init__()
-        self.text = text
+        self.board = board
+        self.card = card
 
         self.setup_ui()
         self.setup_dnd()
@@ -112,7 +106,7 @@ class KanbanNote(Gtk.EventBox):
 
     def setup_ui(self):
         self.box = Gtk.Box(name="kanban-note", spacing=4)
-        self.label = Gtk.Label(label=self.text)
+        self.label = Gtk.Label(label=self.card.text)
         self.label.set_line_wrap(True)
 
         self.label.set_line_wrap_mode(Gtk.WrapMode.WORD)
@@ -134,7 +128,6 @@ class KanbanNote(Gtk.EventBox):
             Gdk.DragAction.MOVE
         )
         self.connect("drag-data-get", self.on_drag_data_get)
-        self.connect("drag-data-delete", self.on_drag_data_delete)
 
         self.connect("drag-begin", self.on_drag_begin)
 
@@ -149,30 +142,30 @@ class KanbanNote(Gtk.EventBox):
         Gtk.drag_set_icon_surface(context, surface)
 
     def on_drag_data_get(self, widget, drag_context, data, info, time):
-        data.set_text(self.label.get_text(), -1)
-
-    def on_drag_data_delete(self, widget, drag_context):
-        self.get_parent().destroy()
+        # The drop target moves the card in the board, so only its id travels.
+        data.set_text(str(self.card.id), -1)
 
     def on_delete_clicked(self, button):
-        self.get_parent().destroy()
+        self.board.delete_card(self.card.id)
 
+    def update(self):
+        self.label.set_text(self.card.text)
 
     def start_edit(self):
         row = self.get_parent()
-        editor = InlineEditor(self.label.get_text())
+        editor = InlineEditor(self.card.text)
         
-        def on_confirmed(editor, text):
-            self.label.set_text(text)
+        def restore():
             row.remove(editor)
             row.add(self)
             row.show_all()
-            self.emit('changed')
+
+        def on_confirmed(editor, text):
+            restore()
+            self.board.edit_card(self.card.id, text)
 
         def on_canceled(editor):
-            row.remove(editor)
-            row.add(self)
-            row.show_all()
+            restore()
 
         editor.connect('confirmed', on_confirmed)
         editor.connect('canceled', on_canceled)
@@ -184,13 +177,13 @@ class KanbanNote(Gtk.EventBox):
         GLib.timeout_add(50, lambda: (editor.text_view.grab_focus(), False))
 
 class KanbanColumn(Gtk.Frame):
-    __gsignals__ = {
-        'changed': (GObject.SignalFlags.RUN_LAST, None, ()),
-    }
-
-    def __init__(self, title):
+    def __init__(self, board, column_index):
         super().__init__(name="kanban-column")
-        self.title = title
+        self.board = board
+        self.column_index = column_index
+        self.title = board.titles[column_index]
+        # Rows by card id, so board changes patch the list in place.
+        self.rows = {}
         self.setup_ui()
         self.setup_dnd()
         self.set_hexpand(True)
@@ -237,12 +230,8 @@ class KanbanColumn(Gtk.Frame):
         editor.text_view.grab_focus()
 
         def on_confirmed(editor, text):
-            note = KanbanNote(text)
-            note.connect('changed', lambda x: self.emit('changed'))
-            row.remove(editor)
-            row.add(note)
-            self.listbox.show_all()
-            self.emit('changed')
+            row.destroy()
+            self.board.add_card(self.column_index, text)
 
         def on_canceled(editor):
             row.destroy()
@@ -256,48 +245,51 @@ class KanbanColumn(Gtk.Frame):
 
         GLib.idle_add(scroll_to_bottom) # ensure this is called after row is loaded
 
-    def add_note(self, text, suppress_signal=False):
-        note = KanbanNote(text)
-        note.connect('changed', lambda x: self.emit('changed'))
+    def insert_card(self, index, card):
         row = Gtk.ListBoxRow(name="kanban-row")
-        row.add(note)
-        row.connect('destroy', lambda x: self.emit('changed'))
-        self.listbox.add(row)
-        self.listbox.show_all()
-        if not suppress_signal:
-            self.emit('changed')
+        # Kept on the row since an inline editor may take its place.
+        row.note = KanbanNote(self.board, card)
+        row.add(row.note)
+        self.insert_row(index, card, row)
+
+    def insert_row(self, index, card, row):
+        self.rows[card.id] = row
+        self.listbox.insert(row, index)
+        row.show_all()
 
-    def get_notes(self):
-        return [
-            row.get_children()[0].label.get_text()
-            for row in self.listbox.get_children()
-            if isinstance(row.get_children()[0], KanbanNote)
-        ]
+    def take_row(self, card):
+        """Detach a card's row without destroying it, e.g. to move it."""
+        row = self.rows.pop(card.id)
+        self.listbox.remove(row)
+        return row
 
-    def clear_notes(self, suppress_signal=False):
+    def remove_card(self, card):
+        self.rows.pop(card.id).destroy()
+
+    def update_card(self, card):
+        self.rows[card.id].note.update()
+
+    def set_cards(self, cards):
         for row in self.listbox.get_children():
             row.destroy()
-        if not suppress_signal:
-            self.emit('changed')
+        self.rows = {}
+        for index, card in enumerate(cards):
+            self.insert_card(index, card)
+
+    def get_notes(self):
+        return [card.text for card in self.board.columns[self.column_index]]
 
     def on_drag_data_received(self, widget, drag_context, x, y, data, info, time):
         text = data.get_text()
-        if text:
-            row = self.listbox.get_row_at_y(y)
-            new_note = KanbanNote(text)
-            new_note.connect('changed', lambda x: self.emit('changed'))
-            new_row = Gtk.ListBoxRow(name="kanban-row")
-            new_row.add(new_note)
-            new_row.connect('destroy', lambda x: self.emit('changed'))
-            
-            if row:
-                self.listbox.insert(new_row, row.get_index())
-            else:
-                self.listbox.add(new_row)
-            
-            self.listbox.show_all()
-            drag_context.finish(True, False, time)
-            self.emit('changed')
+        card = self.board.card(int(text)) if text and text.isdigit() else None
+        if card is None:
+            drag_context.finish(False, False, time)
+            return
+
+        row = self.listbox.get_row_at_y(y)
+        index = row.get_index() if row else None
+        self.board.move_card(card.id, self.column_index, index)
+        drag_context.finish(True, False, time)
 
     def on_drag_motion(self, widget, drag_context, x, y, time):
         Gdk.drag_status(drag_context, Gdk.DragAction.MOVE, time)
@@ -307,20 +299,34 @@ class KanbanColumn(Gtk.Frame):
         widget.get_parent().get_parent().drag_unhighlight()
 
 class Kanban(Gtk.Box):
-    STATE_FILE = Path(os.path.expanduser("~/.kanban.json"))
-
-    def __init__(self):
+    def __init__(self, board_name=DEFAULT_BOARD):
         super().__init__(name="kanban")
         
         self.grid = Gtk.Grid(column_spacing=4, column_homogeneous=True, row_spacing=4, row_homogeneous=True)
         self.grid.set_vexpand(True)
         self.add(self.grid)
-        
-        self.columns = [
-            KanbanColumn("To Do"),
-            KanbanColumn("In Progress"),
-            KanbanColumn("Done")
-        ]
+
+        self.board_name = board_name
+        self.board = None
+        self.columns = []
+
+        # The board is read the first time the kanban is shown.
+        self._map_handler = self.connect("map", self.on_first_map)
+        self.connect("key-press-event", self.on_key_press)
+        self.show_all()
+
+    def on_first_map(self, *_):
+        self.disconnect(self._map_handler)
+        self.set_board(KanbanStore.get_initial().board(self.board_name))
+
+    def set_board(self, board):
+        if self.board is not None:
+            self.board.disconnect(self._board_handler)
+        for column in self.columns:
+            column.destroy()
+
+        self.board = board
+        self.columns = [KanbanColumn(board, i) for i in range(len(board.titles))]
 
         vertical_mode = True if data.PANEL_THEME == "Panel" and (data.BAR_POSITION in ["Left", "Right"] or data.PANEL_POSITION in ["Start", "End"]) else False
         
@@ -329,36 +335,38 @@ class Kanban(Gtk.Box):
                 self.grid.attach(column, i, 0, 1, 1)
             else:
                 self.grid.attach(column, 0, i, 1, 1)
-            column.connect('changed', lambda x: self.save_state())
-        
-        self.load_state()
-        self.show_all()
+            column.set_cards(board.columns[i])
+
+        self._board_handler = board.connect("changed", self.on_board_changed)
+        self.grid.show_all()
+
+    def on_board_changed(self, board, change):
+        kind = change[0]
+        if kind == "insert":
+            _, column, index, card = change
+            self.columns[column].insert_card(index, card)
+        elif kind == "delete":
+            _, column, _, card = change
+            self.columns[column].remove_card(card)
+        elif kind == "move":
+            card, from_column, _, to_column, to_index = change[1:]
+            row = self.columns[from_column].take_row(card)
+            self.columns[to_column].insert_row(to_index, card, row)
+        elif kind == "edit":
+            card = change[1]
+            for column in self.columns:
+                if card.id in column.rows:
+                    column.update_card(card)
+        elif kind == "reset":
+            self.set_board(board)
 
-    def save_state(self):
-        state = {
-            "columns": [
-                {"title": col.title, "notes": col.get_notes()}
-                for col in self.columns
-            ]
-        }
-        try:
-            with open(self.STATE_FILE, "w") as f:
-                json.dump(state, f, indent=2)
-        except Exception as e:
-            print(f"Error saving state: {e}")
-
-    def load_state(self):
-        try:
-            with open(self.STATE_FILE, "r") as f:
-                state = json.load(f)
-                for col_data in state["columns"]:
-                    for column in self.columns:
-                        if column.title == col_data["title"]:
-                            column.clear_notes(suppress_signal=True)
-                            for note_text in col_data["notes"]:
-                                column.add_note(note_text, suppress_signal=True)
-                            break
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"Error loading state: {e}")
+    def on_key_press(self, widget, event):
+        if self.board is None or not event.get_state() & Gdk.ModifierType.CONTROL_MASK:
+            return False
+        keyval = Gdk.keyval_to_lower(event.keyval)
+        shift = event.get_state() & Gdk.ModifierType.SHIFT_MASK
+        if keyval == Gdk.KEY_z and not shift:
+            return self.board.undo()
+        if keyval == Gdk.KEY_y or (keyval == Gdk.KEY_z and shift):
+            return self.board.redo()
+        return False
@@ -1,12 +1,10 @@
 import json
-import math
 import operator
 import os
-import re
 import subprocess
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
-import numpy as np
 from fabric.utils import (DesktopApp, exec_shell_command_async,
                           get_desktop_applications, idle_add, remove_handler)
 from fabric.utils.helpers import get_relative_path
@@ -22,11 +20,15 @@ import config.data as data
 import modules.icons as icons
 from modules.dock import Dock
 from modules.updater import run_updater
+from utils.calculator import Calculator
 from utils.conversion import Conversion
 
 tooltip_settings = f"<b>Open {data.APP_NAME_CAP} Settings</b>"
 tooltip_close = "<b>Close</b>"
 
+# Pause in typing before a calculator or conversion preview is computed.
+PREVIEW_DELAY_MS = 150
+
 class AppLauncher(Box):
     def __init__(self, **kwargs):
         super().__init__(
@@ -44,6 +46,15 @@ class AppLauncher(Box):
 
 
         self.converter = Conversion()
+        self.calculator = Calculator()
+        # Calculations and conversions (which may fetch currency rates) run
+        # on workers; the generation discards previews for stale text.
+        # Results committed with Enter have their own worker so they never
+        # wait behind a preview and are always added to the history.
+        self._expression_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="launcher-expression")
+        self._commit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="launcher-commit")
+        self._expression_generation = 0
+        self._preview_id = 0
         self.calc_history_path = f"{data.CACHE_DIR}/calc.json"
         if os.path.exists(self.calc_history_path):
             with open(self.calc_history_path, "r") as f:
@@ -69,6 +80,12 @@ class AppLauncher(Box):
             on_key_press_event=self.on_search_entry_key_press,
         )
         self.search_entry.props.xalign = 0.5
+        self.preview_label = Label(
+            name="launcher-preview",
+            ellipsization="end",
+            h_align="center",
+        )
+        self.preview_label.set_no_show_all(True)
         self.scrolled_window = ScrolledWindow(
             name="scrolled-window",
             spacing=10,
@@ -110,6 +127,7 @@ class AppLauncher(Box):
             orientation="v",
             children=[
                 self.header_box,
+                self.preview_label,
                 self.scrolled_window,
             ],
         )
@@ -122,6 +140,7 @@ class AppLauncher(Box):
     def close_launcher(self):
         self.viewport.children = []
         self.selected_index = -1
+        self.cancel_preview()
         self.notch.close_notch()
 
     def open_launcher(self):
@@ -401,6 +420,11 @@ class AppLauncher(Box):
         else:
             self.arrange_viewport(text)
 
+        if text.startswith(("=", ";")):
+            self.schedule_preview(text)
+        else:
+            self.cancel_preview()
+
     def add_selected_app_to_dock(self):
         """Adds the currently selected application to the dock.json file with comprehensive metadata."""
         children = self.viewport.get_children()
@@ -474,100 +498,101 @@ class AppLauncher(Box):
             json.dump(self.conversion_history, f)
 
     def evaluate_calculator_expression(self, text: str):
-
         print(f"Evaluating calculator expression: {text}")
-        
-
-        expr = text.lstrip("=").strip()
-        if not expr:
+        if not text.lstrip("=").strip():
             return
-            
 
-        replacements = {
-            "^": "**",
-            "×": "*",
-            "÷": "/",
-            "π": "np.pi",
-            "pi": "np.pi",
-            "e": "np.e",
-            "sin(": "np.sin(",
-            "cos(": "np.cos(",
-            "tan(": "np.tan(",
-            "log(": "np.log10(",
-            "ln(": "np.log(",
-            "sqrt(": "np.sqrt(",
-            "abs(": "np.abs(",
-            "exp(": "np.exp("
-        }
-        
+        def add_to_history(result_str, error):
+            if error is not None:
+                result_str = f"Error: {error}"
+            self.calc_history.insert(0, f"{text} => {result_str}")
+            self.save_calc_history()
+            if self.search_entry.get_text().startswith("="):
+                self.update_calculator_viewport()
 
-        for old, new in replacements.items():
-            expr = expr.replace(old, new)
-            
+        self.cancel_preview()
+        self.run_expression(text, add_to_history, preview=False)
 
-        expr = re.sub(r'(\d+)!', r'np.factorial(\1)', expr)
-        
+    def evaluate_conversion_expression(self, text: str):
+        print(f"Evaluating conversion expression: {text}")
+        if not text.lstrip(";").strip():
+            return
 
-        for old, new in [("[", "("), ("]", ")"), ("{", "("), ("}", ")")]:
-            expr = expr.replace(old, new)
-            
+        def add_to_history(result_str, error):
+            if error is not None:
+                result_str = "Error: Invalid conversion expression"
+            self.conversion_history.insert(0, f"{text} => {result_str}")
+            self.save_conversion_history()
+            if self.search_entry.get_text().startswith(";"):
+                self.update_conversion_viewport()
 
-        safe_dict = {
-            'np': np,
-            'math': math,
-            'arange': np.arange,
-            'linspace': np.linspace,
-            'array': np.array
-        }
-        
-        try:
+        self.cancel_preview()
+        self.run_expression(text, add_to_history, preview=False)
 
-            result = eval(expr, {"__builtins__": None}, safe_dict)
-            
+    def compute_expression(self, text: str) -> str:
+        """Result of a '=' or ';' query. Blocking; runs on the expression worker."""
+        expr = text[1:].strip()
+        if text.startswith("="):
+            return self.calculator.evaluate(expr)
+        result_value, result_type = self.converter.parse_input_and_convert(expr)
+        if result_type is None:
+            return f"{result_value:.2f}"
+        return f"{result_value:.2f} {result_type}"
+
+    def run_expression(self, text: str, callback, preview: bool = True):
+        """
+        Evaluate `text` on a worker thread and call `callback(result_str, error)`
+        on the main loop. Previews are dropped if newer text has been typed
+        meanwhile; committed expressions always call back.
+        """
+        if preview:
+            self._expression_generation += 1
+        generation = self._expression_generation
+
+        def work():
+            try:
+                result_str, error = self.compute_expression(text), None
+            except Exception as e:
+                result_str, error = None, e
+            GLib.idle_add(deliver, result_str, error)
+
+        def deliver(result_str, error):
+            if not preview or generation == self._expression_generation:
+                callback(result_str, error)
+            return False
 
-            if isinstance(result, np.ndarray):
-                if result.size > 10:
-                    result_str = f"Array of shape {result.shape}"
-                else:
-                    result_str = str(result)
-            elif isinstance(result, (int, float, np.number)):
+        executor = self._expression_executor if preview else self._commit_executor
+        executor.submit(work)
+
+    def schedule_preview(self, text: str):
+        if self._preview_id:
+            GLib.source_remove(self._preview_id)
+        self._preview_id = GLib.timeout_add(PREVIEW_DELAY_MS, self._update_preview, text)
+
+    def cancel_preview(self):
+        if self._preview_id:
+            GLib.source_remove(self._preview_id)
+            self._preview_id = 0
+        self._expression_generation += 1
+        self.preview_label.set_visible(False)
+
+    def _update_preview(self, text: str):
+        self._preview_id = 0
+        if not text[1:].strip():
+            self.preview_label.set_visible(False)
+            return False
 
-                if isinstance(result, (int, np.integer)) or result.is_integer():
-                    result_str = str(int(result))
-                else:
-                    result_str = f"{float(result):.10g}"
+        def show(result_str, error):
+            # Half-typed expressions simply have no preview yet.
+            if error is not None:
+                self.preview_label.set_visible(False)
             else:
-                result_str = str(result)
-                
-        except Exception as e:
-            result_str = f"Error: {str(e)}"
-            
-
-        self.calc_history.insert(0, f"{text} => {result_str}")
-        self.save_calc_history()
-        self.update_calculator_viewport()
+                self.preview_label.set_label(f"= {result_str}")
+                self.preview_label.set_visible(True)
 
-    def evaluate_conversion_expression(self, text: str):
-        print(f"Evaluating conversion expression: {text}")
-        expr = text.lstrip(";").strip()
-        if not expr:
-            return
+        self.run_expression(text, show)
+        return False
 
-        try:
-            result_value, result_type = self.converter.parse_input_and_convert(expr)
-            if result_type is None:
-                result_str = f"{result_value:.2f}"
-            else:
-                result_str = f"{result_value:.2f} {result_type}"
-        except:
-            result_str = "Error: Invalid conversion expression"
-        
-        # Format the result based on its type
-        
-        self.conversion_history.insert(0, f"{text} => {result_str}")
-        self.save_conversion_history()
-        self.update_conversion_viewport()
-        
     def update_calculator_viewport(self):
         self.viewport.children = []
         for item in self.calc_history:
@@ -1,11 +1,3 @@
-import json
-import logging
-import subprocess
-import time
-
-import psutil
-from fabric.core.fabricator import Fabricator
-from fabric.utils.helpers import invoke_repeater
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.circularprogressbar import CircularProgressBar
@@ -17,151 +9,10 @@ from fabric.widgets.scale import Scale
 from gi.repository import GLib
 
 import config.data as data
-from modules.upower.upower import UPowerManager
 import modules.icons as icons
+from services.metrics import MetricsService
 from services.network import NetworkClient
-
-logger = logging.getLogger(__name__)
-
-
-class MetricsProvider:
-    """
-    Class responsible for obtaining centralized CPU, memory, disk usage, and battery metrics.
-    It updates periodically so that all widgets querying it display the same values.
-    """
-
-    def __init__(self):
-        self.gpu = []
-        self.cpu = 0.0
-        self.mem = 0.0
-        self.disk = []
-
-        self.upower = UPowerManager()
-        self.display_device = self.upower.get_display_device()
-        self.bat_percent = 0.0
-        self.bat_charging = None
-        self.bat_time = 0
-
-        self._gpu_update_running = False
-
-        GLib.timeout_add_seconds(1, self._update)
-
-    def _update(self):
-        self.cpu = psutil.cpu_percent(interval=0)
-        self.mem = psutil.virtual_memory().percent
-        self.disk = [psutil.disk_usage(path).percent for path in data.BAR_METRICS_DISKS]
-        self.gpubig = data.METRICS_VISIBLE["gpu"]
-        self.gpusmall = data.METRICS_SMALL_VISIBLE["gpu"]
-
-        if (self.gpubig or self.gpusmall) and not self._gpu_update_running:
-            self._start_gpu_update_async()
-
-        battery = self.upower.get_full_device_information(self.display_device)
-        if battery is None:
-            self.bat_percent = 0.0
-            self.bat_charging = None
-            self.bat_time = 0
-        else:
-            self.bat_percent = battery["Percentage"]
-            self.bat_charging = battery["State"] == 1
-            self.bat_time = (
-                battery["TimeToFull"] if self.bat_charging else battery["TimeToEmpty"]
-            )
-
-        return True
-
-    def _start_gpu_update_async(self):
-        """Starts a new GLib thread to run nvtop in the background."""
-        self._gpu_update_running = True
-
-        GLib.Thread.new("nvtop-thread", lambda _: self._run_nvtop_in_thread(), None)
-
-    def _run_nvtop_in_thread(self):
-        """Runs nvtop via subprocess in a separate GLib thread."""
-        output = None
-        error_message = None
-        try:
-            result = subprocess.check_output(["nvtop", "-s"], text=True, timeout=10)
-            output = result
-        except FileNotFoundError:
-            error_message = "nvtop command not found."
-            logger.warning(error_message)
-        except subprocess.CalledProcessError as e:
-            error_message = (
-                f"nvtop failed with exit code {e.returncode}: {e.stderr.strip()}"
-            )
-            logger.error(error_message)
-        except subprocess.TimeoutExpired:
-            error_message = "nvtop command timed out."
-            logger.error(error_message)
-        except Exception as e:
-            error_message = f"Unexpected error running nvtop: {e}"
-            logger.error(error_message)
-
-        GLib.idle_add(self._process_gpu_output, output, error_message)
-        self._gpu_update_running = False
-
-    def _process_gpu_output(self, output, error_message):
-        """Process nvtop JSON output on the main loop."""
-        try:
-            if error_message:
-                logger.error(f"GPU update failed: {error_message}")
-                self.gpu = []
-            elif output:
-                info = json.loads(output)
-                try:
-                    self.gpu = [
-                        (
-                            int(v["gpu_util"].strip("%"))
-                            if v["gpu_util"] is not None
-                            else 0
-                        )
-                        for v in info
-                    ]
-
-                except (KeyError, ValueError, TypeError) as e:
-                    logger.error(f"Failed parsing nvtop JSON: {e}")
-                    self.gpu = []
-            else:
-                logger.warning("nvtop returned no output.")
-                self.gpu = []
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            self.gpu = []
-        except Exception as e:
-            logger.error(f"Error processing nvtop output: {e}")
-            self.gpu = []
-
-        return False
-
-    def get_metrics(self):
-        return (self.cpu, self.mem, self.disk, self.gpu)
-
-    def get_battery(self):
-        return (self.bat_percent, self.bat_charging, self.bat_time)
-
-    def get_gpu_info(self):
-        try:
-            result = subprocess.check_output(["nvtop", "-s"], text=True, timeout=5)
-            return json.loads(result)
-        except FileNotFoundError:
-            logger.warning("nvtop not found; GPU info unavailable.")
-            return []
-        except subprocess.CalledProcessError as e:
-            logger.error(f"nvtop init sync failed: {e}")
-            return []
-        except subprocess.TimeoutExpired:
-            logger.error("nvtop init call timed out.")
-            return []
-        except json.JSONDecodeError as e:
-            logger.error(f"Init JSON parse error: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error during GPU init: {e}")
-            return []
-
-
-shared_provider = MetricsProvider()
+from widgets.sparkline import Sparkline
 
 
 class SingularMetric:
@@ -204,6 +55,21 @@ class Metrics(Box):
             all_visible=True,
         )
 
+        self.metrics_service = MetricsService.get_initial()
+        self.build()
+
+        sampled_id = self.metrics_service.connect("sampled", self.update_status)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        data.subscribe(("METRICS_VISIBLE", "BAR_METRICS_DISKS"), self.on_config_changed)
+        self.connect("destroy", lambda *_: data.unsubscribe(self.on_config_changed))
+
+    def on_config_changed(self, changed):
+        for child in self.get_children():
+            child.destroy()
+        self.build()
+        self.show_all()
+
+    def build(self):
         visible = getattr(
             data,
             "METRICS_VISIBLE",
@@ -222,7 +88,7 @@ class Metrics(Box):
             else []
         )
 
-        gpu_info = shared_provider.get_gpu_info()
+        gpu_info = self.metrics_service.get_gpu_info()
         gpus = (
             [
                 SingularMetric(
@@ -271,15 +137,30 @@ class Metrics(Box):
         for x in self.scales:
             self.add(x)
 
-        GLib.timeout_add_seconds(1, self.update_status)
-
-    def update_status(self):
-        cpu, mem, disks, gpus = shared_provider.get_metrics()
+        self.metrics_service.subscribe(self, self._metric_keys())
 
+    def _metric_keys(self):
+        keys = []
         if self.cpu:
-            self.cpu.usage.value = cpu / 100.0
+            keys.append("cpu")
         if self.ram:
-            self.ram.usage.value = mem / 100.0
+            keys.append("mem")
+        if self.disk:
+            keys.append("disk")
+        if self.gpu:
+            keys.append("gpu")
+        return keys
+
+    def update_status(self, _, sample):
+        if not self.get_mapped():
+            return
+        disks = sample.get("disk", [])
+        gpus = sample.get("gpu", [])
+
+        if self.cpu and "cpu" in sample:
+            self.cpu.usage.value = sample["cpu"] / 100.0
+        if self.ram and "mem" in sample:
+            self.ram.usage.value = sample["mem"] / 100.0
         for i, disk in enumerate(self.disk):
 
             if i < len(disks):
@@ -288,11 +169,10 @@ class Metrics(Box):
 
             if i < len(gpus):
                 gpu.usage.value = gpus[i] / 100.0
-        return True
 
 
 class SingularMetricSmall:
-    def __init__(self, id, name, icon):
+    def __init__(self, id, name, icon, history=None):
         self.name_markup = name
         self.icon_markup = icon
 
@@ -309,11 +189,26 @@ class SingularMetricSmall:
         )
 
         self.level = Label(name="metrics-level", style_classes=id, label="0%")
+        self.sparkline = (
+            Sparkline(
+                history=history,
+                name="metrics-sparkline",
+                style_classes=id,
+                v_align="center",
+                size=(48, 18),
+            )
+            if history is not None
+            else None
+        )
         self.revealer = Revealer(
             name=f"metrics-{id}-revealer",
             transition_duration=250,
             transition_type="slide-left",
-            child=self.level,
+            child=(
+                Box(children=[self.level, self.sparkline])
+                if self.sparkline
+                else self.level
+            ),
             child_revealed=False,
         )
 
@@ -336,52 +231,81 @@ class MetricsSmall(Button):
     def __init__(self, **kwargs):
         super().__init__(name="metrics-small", **kwargs)
 
-        main_box = Box(
+        self.main_box = Box(
             spacing=0,
             orientation="h" if not data.VERTICAL else "v",
             visible=True,
             all_visible=True,
         )
+        self.metrics_service = MetricsService.get_initial()
+        self.build()
+        self.add(self.main_box)
+
+        self.connect("enter-notify-event", self.on_mouse_enter)
+        self.connect("leave-notify-event", self.on_mouse_leave)
+
+        self.hide_timer = None
+        self.hover_counter = 0
+
+        sampled_id = self.metrics_service.connect("sampled", self.update_metrics)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        data.subscribe(
+            ("METRICS_SMALL_VISIBLE", "BAR_METRICS_DISKS"), self.on_config_changed
+        )
+        self.connect("destroy", lambda *_: data.unsubscribe(self.on_config_changed))
 
+    def on_config_changed(self, changed):
+        for child in self.main_box.get_children():
+            child.destroy()
+        self.build()
+        self.main_box.show_all()
+
+    def build(self):
+        main_box = self.main_box
         visible = getattr(
             data,
             "METRICS_SMALL_VISIBLE",
             {"cpu": True, "ram": True, "disk": True, "gpu": True},
         )
+
         disks = (
             [
                 SingularMetricSmall(
                     "disk",
                     f"DISK ({path})" if len(data.BAR_METRICS_DISKS) != 1 else "DISK",
                     icons.disk,
+                    history=self._history(f"disk{i}"),
                 )
-                for path in data.BAR_METRICS_DISKS
+                for i, path in enumerate(data.BAR_METRICS_DISKS)
             ]
             if visible.get("disk", True)
             else []
         )
 
-        gpu_info = shared_provider.get_gpu_info()
+        gpu_info = self.metrics_service.get_gpu_info()
         gpus = (
             [
                 SingularMetricSmall(
                     "gpu",
                     f"GPU ({v['device_name']})" if len(gpu_info) != 1 else "GPU",
                     icons.gpu,
+                    history=self._history(f"gpu{i}"),
                 )
-                for v in gpu_info
+                for i, v in enumerate(gpu_info)
             ]
             if visible.get("gpu", True)
             else []
         )
 
         self.cpu = (
-            SingularMetricSmall("cpu", "CPU", icons.cpu)
+            SingularMetricSmall("cpu", "CPU", icons.cpu, history=self._history("cpu"))
             if visible.get("cpu", True)
             else None
         )
         self.ram = (
-            SingularMetricSmall("ram", "RAM", icons.memory)
+            SingularMetricSmall(
+                "ram", "RAM", icons.memory, history=self._history("mem")
+            )
             if visible.get("ram", True)
             else None
         )
@@ -400,15 +324,25 @@ class MetricsSmall(Button):
             main_box.add(Box(name="metrics-sep"))
             main_box.add(gpu.box)
 
-        self.add(main_box)
+        self.metrics_service.subscribe(self, self._metric_keys())
 
-        self.connect("enter-notify-event", self.on_mouse_enter)
-        self.connect("leave-notify-event", self.on_mouse_leave)
+    def _history(self, name):
+        # Sparklines are hidden in the vertical bar, which has no revealers.
+        if not data.METRICS_HISTORY or data.VERTICAL:
+            return None
+        return self.metrics_service.history_for(name)
 
-        GLib.timeout_add_seconds(1, self.update_metrics)
-
-        self.hide_timer = None
-        self.hover_counter = 0
+    def _metric_keys(self):
+        keys = []
+        if self.cpu:
+            keys.append("cpu")
+        if self.ram:
+            keys.append("mem")
+        if self.disk:
+            keys.append("disk")
+        if self.gpu:
+            keys.append("gpu")
+        return keys
 
     def _format_percentage(self, value: int) -> str:
         """Formato natural del porcentaje sin forzar ancho fijo."""
@@ -454,13 +388,18 @@ class MetricsSmall(Button):
             self.hide_timer = None
             return False
 
-    def update_metrics(self):
-        cpu, mem, disks, gpus = shared_provider.get_metrics()
+    def update_metrics(self, _, sample):
+        if not self.get_mapped():
+            return
+        disks = sample.get("disk", [])
+        gpus = sample.get("gpu", [])
 
-        if self.cpu:
+        if self.cpu and "cpu" in sample:
+            cpu = sample["cpu"]
             self.cpu.circle.set_value(cpu / 100.0)
             self.cpu.level.set_label(self._format_percentage(int(cpu)))
-        if self.ram:
+        if self.ram and "mem" in sample:
+            mem = sample["mem"]
             self.ram.circle.set_value(mem / 100.0)
             self.ram.level.set_label(self._format_percentage(int(mem)))
         for i, disk in enumerate(self.disk):
@@ -483,14 +422,16 @@ class MetricsSmall(Button):
             tooltip_metrics.append(self.cpu)
         if self.gpu:
             tooltip_metrics.extend(self.gpu)
+
+        for metric in tooltip_metrics:
+            if metric.sparkline and metric.revealer.get_child_revealed():
+                metric.sparkline.queue_draw()
         self.set_tooltip_markup(
             (" - " if not data.VERTICAL else "\n").join(
                 [v.markup() for v in tooltip_metrics]
             )
         )
 
-        return True
-
 
 class Battery(Button):
     def __init__(self, **kwargs):
@@ -536,19 +477,20 @@ class Battery(Button):
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-        self.batt_fabricator = Fabricator(
-            poll_from=lambda v: shared_provider.get_battery(),
-            on_changed=lambda f, v: self.update_battery,
-            interval=1000,
-            stream=False,
-            default_value=0,
-        )
-        self.batt_fabricator.changed.connect(self.update_battery)
-        GLib.idle_add(self.update_battery, None, shared_provider.get_battery())
-
         self.hide_timer = None
         self.hover_counter = 0
 
+        # The widget hides itself when no battery is present, so it has to keep
+        # receiving samples while unmapped.
+        self.metrics_service = MetricsService.get_initial()
+        sampled_id = self.metrics_service.connect("sampled", self.on_sampled)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        self.metrics_service.subscribe(self, ["battery"], only_mapped=False)
+
+    def on_sampled(self, _, sample):
+        if "battery" in sample:
+            self.update_battery(None, sample["battery"])
+
     def _format_percentage(self, value: int) -> str:
         """Formato natural del porcentaje sin forzar ancho fijo."""
         return f"{value}%"
@@ -690,23 +632,18 @@ class NetworkApplet(Button):
             self.upload_icon.set_margin_top(4)
             self.download_icon.set_margin_bottom(4)
 
-        self.last_counters = psutil.net_io_counters()
-        self.last_time = time.time()
-        invoke_repeater(1000, self.update_network)
-
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-    def update_network(self):
-        current_time = time.time()
-        elapsed = current_time - self.last_time
-        current_counters = psutil.net_io_counters()
-        download_speed = (
-            current_counters.bytes_recv - self.last_counters.bytes_recv
-        ) / elapsed
-        upload_speed = (
-            current_counters.bytes_sent - self.last_counters.bytes_sent
-        ) / elapsed
+        self.metrics_service = MetricsService.get_initial()
+        sampled_id = self.metrics_service.connect("sampled", self.update_network)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        self.metrics_service.subscribe(self, ["net"])
+
+    def update_network(self, _, sample):
+        if "net" not in sample or not self.get_mapped():
+            return
+        download_speed, upload_speed = sample["net"]
         download_str = self.format_speed(download_speed)
         upload_str = self.format_speed(upload_speed)
         self.download_label.set_markup(download_str)
@@ -781,10 +718,6 @@ class NetworkApplet(Button):
         else:
             self.set_tooltip_text(tooltip_base)
 
-        self.last_counters = current_counters
-        self.last_time = current_time
-        return True
-
     def format_speed(self, speed):
         if speed < 1024:
             return f"{speed:.0f} B/s"
@@ -152,9 +152,13 @@ class Notch(Window):
         self.applet_stack = self.dashboard.widgets.applet_stack
         self.btdevices = self.dashboard.widgets.bluetooth
         self.nwconnections = self.dashboard.widgets.network_connections
+        self.processes = self.dashboard.widgets.processes
+        self.agenda = self.dashboard.widgets.agenda
 
         self.btdevices.set_visible(False)
         self.nwconnections.set_visible(False)
+        self.processes.set_visible(False)
+        self.agenda.set_visible(False)
 
         self.launcher = AppLauncher(notch=self)
         self.overview = Overview()
@@ -513,6 +517,21 @@ class Notch(Window):
                 self.applet_stack.set_visible_child(self.nwconnections)
                 return
 
+        elif widget_name == "processes":
+            if is_dashboard_currently_visible:
+
+                if (
+                    self.dashboard.stack.get_visible_child() == self.dashboard.widgets
+                    and self.applet_stack.get_visible_child() == self.processes
+                ):
+                    self.close_notch()
+                    return
+
+                self.set_keyboard_mode("exclusive")
+                self.dashboard.go_to_section("widgets")
+                self.applet_stack.set_visible_child(self.processes)
+                return
+
         elif widget_name == "bluetooth":
             if is_dashboard_currently_visible:
 
@@ -621,6 +640,9 @@ class Notch(Window):
             elif widget_name == "network_applet":
                 self.dashboard.go_to_section("widgets")
                 self.applet_stack.set_visible_child(self.nwconnections)
+            elif widget_name == "processes":
+                self.dashboard.go_to_section("widgets")
+                self.applet_stack.set_visible_child(self.processes)
             elif widget_name in dashboard_sections_map:
                 self.dashboard.go_to_section(widget_name)
             elif widget_name == "dashboard":
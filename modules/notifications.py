@@ -1,7 +1,9 @@
 import json
 import locale
 import os
+import time
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
 
 from fabric.notifications.service import Notification, NotificationAction, Notifications
@@ -18,41 +20,27 @@ from fabric.utils.helpers import get_relative_path
 
 import config.data as data
 import modules.icons as icons
+from utils.notification_images import NotificationImageStore
 from widgets.rounded_image import CustomImage
 from widgets.wayland import WaylandWindow as Window
 
 PERSISTENT_DIR = f"/tmp/{data.APP_NAME}/notifications"
 PERSISTENT_HISTORY_FILE = os.path.join(PERSISTENT_DIR, "notification_history.json")
+HISTORY_LIMIT = 50
+HISTORY_PAGE_SIZE = 10
+# Rate limits count the cards shown per app within this many seconds.
+RATE_LIMIT_WINDOW = 60
 
 
-def cache_notification_pixbuf(notification_box):
-    """
-    Saves a scaled pixbuf (48x48) in the cache directory and returns the cache file path.
-    """
-    notification = notification_box.notification
+# Thumbnails are content-addressed and shared between notifications.
+image_store = NotificationImageStore(PERSISTENT_DIR)
+
+
+def store_notification_image(notification):
+    """Cache the image of `notification` and return its path, or None."""
     if notification.image_pixbuf:
-        os.makedirs(PERSISTENT_DIR, exist_ok=True)
-        cache_file = os.path.join(
-            PERSISTENT_DIR, f"notification_{notification_box.uuid}.png"
-        )
-        logger.debug(
-            f"Caching image for notification {notification.id} to: {cache_file}"
-        )
-        try:
-            scaled = notification.image_pixbuf.scale_simple(
-                40, 40, GdkPixbuf.InterpType.BILINEAR
-            )
-            scaled.savev(cache_file, "png", [], [])
-            logger.info(
-                f"Successfully cached image for notification {notification.id} to: {cache_file}"
-            )
-            return cache_file
-        except Exception as e:
-            logger.error(f"Error caching image for notification {notification.id}: {e}")
-            return None
-    else:
-        logger.debug(f"Notification {notification.id} has no image_pixbuf to cache.")
-        return get_relative_path("../assets/icons/notification.png")
+        return image_store.store(notification.image_pixbuf)
+    return None
 
 
 def load_scaled_pixbuf(notification_box, width, height):
@@ -66,32 +54,15 @@ def load_scaled_pixbuf(notification_box, width, height):
         )
         return None
 
-    pixbuf = None
-    if (
-        hasattr(notification_box, "cached_image_path")
-        and notification_box.cached_image_path
-        and os.path.exists(notification_box.cached_image_path)
-    ):
-        try:
-            logger.debug(
-                f"Attempting to load cached image from: {notification_box.cached_image_path} for notification {notification.id}"
-            )
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file(notification_box.cached_image_path)
-            if pixbuf:
-                pixbuf = pixbuf.scale_simple(
-                    width, height, GdkPixbuf.InterpType.BILINEAR
-                )
-                logger.info(
-                    f"Successfully loaded cached image from: {notification_box.cached_image_path} for notification {notification.id}"
-                )
+    if getattr(notification_box, "cached_image_path", None):
+        pixbuf = image_store.thumbnail(
+            notification_box.cached_image_path, width, height
+        )
+        if pixbuf:
             return pixbuf
-        except Exception as e:
-            logger.error(
-                f"Error loading cached image from {notification_box.cached_image_path} for notification {notification.id}: {e}"
-            )
-            logger.warning(
-                f"Falling back to notification.image_pixbuf for notification {notification.id}"
-            )
+        logger.warning(
+            f"Falling back to notification.image_pixbuf for notification {notification.id}"
+        )
 
     if notification.image_pixbuf:
         logger.debug(
@@ -185,12 +156,14 @@ class NotificationBox(Box):
         self._timeout_id = None
         self._container = None
         self.cached_image_path = None
+        # Older (notification, cached_image_path) pairs folded into this card.
+        self.stacked = []
 
         if self.timeout_ms > 0:
             self.start_timeout()
 
         if self.notification.image_pixbuf:
-            cache_path = cache_notification_pixbuf(self)
+            cache_path = image_store.store(self.notification.image_pixbuf)
             if cache_path:
                 self.cached_image_path = cache_path
                 logger.debug(
@@ -204,10 +177,10 @@ class NotificationBox(Box):
             logger.debug(f"NotificationBox {self.uuid}: No image to cache.")
 
         content = self.create_content()
-        action_buttons = self.create_action_buttons()
+        self.action_buttons = self.create_action_buttons()
         self.add(content)
-        if action_buttons:
-            self.add(action_buttons)
+        if self.action_buttons:
+            self.add(self.action_buttons)
 
         self.connect("enter-notify-event", self.on_hover_enter)
         self.connect("leave-notify-event", self.on_hover_leave)
@@ -264,10 +237,11 @@ class NotificationBox(Box):
     def create_content(self):
         notification = self.notification
         pixbuf = load_scaled_pixbuf(self, 40, 40)  # Pass self to load_scaled_pixbuf
+        self.notification_image = CustomImage(pixbuf=pixbuf)
         self.notification_image_box = Box(
             name="notification-image",
             orientation="v",
-            children=[CustomImage(pixbuf=pixbuf), Box(v_expand=True)],
+            children=[self.notification_image, Box(v_expand=True)],
         )
         self.notification_summary_label = Label(
             name="notification-summary",
@@ -283,21 +257,19 @@ class NotificationBox(Box):
             max_chars_width=16,
             ellipsization="end",
         )
-        self.notification_body_label = (
-            Label(
-                markup=notification.body,
-                h_align="start",
-                max_chars_width=34,
-                ellipsization="end",
-            )
-            if notification.body
-            else Box()
+        self.notification_body_label = Label(
+            markup=notification.body,
+            h_align="start",
+            max_chars_width=34,
+            ellipsization="end",
+            visible=bool(notification.body),
         )
-        (
-            self.notification_body_label.set_single_line_mode(True)
-            if notification.body
-            else None
+        self.notification_body_label.set_single_line_mode(True)
+        self.notification_body_label.set_no_show_all(True)
+        self.notification_count_label = Label(
+            name="notification-count", h_align="start", visible=False
         )
+        self.notification_count_label.set_no_show_all(True)
         self.notification_text_box = Box(
             name="notification-text",
             orientation="v",
@@ -318,6 +290,7 @@ class NotificationBox(Box):
                             v_align="center",
                         ),
                         self.notification_app_name_label_content,
+                        self.notification_count_label,
                     ],
                 ),
                 self.notification_body_label,
@@ -358,7 +331,7 @@ class NotificationBox(Box):
         self.close_button = Button(
             name="notif-close-button",
             child=Label(name="notif-close-label", markup=icons.cancel),
-            on_clicked=lambda *_: self.notification.close("dismissed-by-user"),
+            on_clicked=lambda *_: self.dismiss(),
         )
         self.close_button.connect(
             "enter-notify-event", lambda *_: self.hover_button(self.close_button)
@@ -368,6 +341,78 @@ class NotificationBox(Box):
         )
         return self.close_button
 
+    def dismiss(self):
+        """Close this card and every notification stacked under it."""
+        for notification, _ in self.stacked[:]:
+            notification.close("dismissed-by-user")
+        self.notification.close("dismissed-by-user")
+
+    def update(self, notification: Notification):
+        """Show `notification` in this card, patching the widgets in place."""
+        old_image_path = self.cached_image_path
+        self.notification = notification
+        self.cached_image_path = store_notification_image(notification)
+        if old_image_path:
+            image_store.release(old_image_path)
+
+        self.notification_image.set_from_pixbuf(load_scaled_pixbuf(self, 40, 40))
+        self.notification_summary_label.set_markup(notification.summary)
+        self.notification_app_name_label_content.set_markup(notification.app_name)
+        self.notification_body_label.set_markup(notification.body)
+        self.notification_body_label.set_visible(bool(notification.body))
+
+        if self.action_buttons:
+            self.remove(self.action_buttons)
+            self.action_buttons.destroy()
+        self.action_buttons = self.create_action_buttons()
+        if self.action_buttons:
+            self.add(self.action_buttons)
+            self.action_buttons.show_all()
+
+        if self.timeout_ms > 0:
+            self.start_timeout()
+
+    def stack(self, notification: Notification):
+        """Fold the shown notification under `notification`, which replaces it."""
+        self.stacked.append((self.notification, self.cached_image_path))
+        self.cached_image_path = None
+        self.update(notification)
+        self._update_count()
+
+    def replace(self, notification: Notification) -> Notification | None:
+        """
+        Patch the shown or stacked notification with the same id as
+        `notification`. Returns the notification that was replaced, if any.
+        """
+        if self.notification.id == notification.id:
+            previous = self.notification
+            self.update(notification)
+            return previous
+        for index, (stacked, image_path) in enumerate(self.stacked):
+            if stacked.id == notification.id:
+                if image_path:
+                    image_store.release(image_path)
+                self.stacked[index] = (
+                    notification,
+                    store_notification_image(notification),
+                )
+                return stacked
+        return None
+
+    def unstack(self, notification_id) -> tuple | None:
+        """Remove a stacked notification and return its entry, if present."""
+        for entry in self.stacked:
+            if entry[0].id == notification_id:
+                self.stacked.remove(entry)
+                self._update_count()
+                return entry
+        return None
+
+    def _update_count(self):
+        count = len(self.stacked)
+        self.notification_count_label.set_label(f"+{count}")
+        self.notification_count_label.set_visible(count > 0)
+
     def on_hover_enter(self, *args):
         if self._container:
             self._container.pause_and_reset_all_timeouts()
@@ -403,25 +448,22 @@ class NotificationBox(Box):
         logger.debug(
             f"NotificationBox destroy called for notification: {self.notification.id}, from_history_delete: {from_history_delete}, is_history: {self._is_history}"
         )
-        if (
-            hasattr(self, "cached_image_path")
-            and self.cached_image_path
-            and os.path.exists(self.cached_image_path)
-            and (not self._is_history or from_history_delete)
-        ):  # Modified condition here
-            default_image = get_relative_path("../assets/icons/notification.png")
-            if self.cached_image_path != default_image:
-                try:
-                    os.remove(self.cached_image_path)
-                    logger.info(f"Deleted cached image: {self.cached_image_path}")
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image {self.cached_image_path}: {e}"
-                    )
+        if not self._is_history or from_history_delete:
+            self.release_image()
+            for _, image_path in self.stacked:
+                if image_path:
+                    image_store.release(image_path)
+            self.stacked = []
         self._destroyed = True
         self.stop_timeout()
         super().destroy()
 
+    def release_image(self):
+        """Drop this notification's reference to its cached image, once."""
+        if self.cached_image_path:
+            image_store.release(self.cached_image_path)
+            self.cached_image_path = None
+
     def hover_button(self, button):
         if self._container:
             self._container.pause_and_reset_all_timeouts()
@@ -431,28 +473,20 @@ class NotificationBox(Box):
             self._container.resume_all_timeouts()
 
 
-class HistoricalNotification(object):
-    def __init__(
-        self, id, app_icon, summary, body, app_name, timestamp, cached_image_path=None
-    ):
-        self.id = id
-        self.app_icon = app_icon
-        self.summary = summary
-        self.body = body
-        self.app_name = app_name
-        self.timestamp = timestamp
-        self.cached_image_path = cached_image_path
-        self.image_pixbuf = None
-        self.actions = []
-        self.timeout = None
-        self.cached_scaled_pixbuf = None
+class NotificationHistory(Box):
+    """
+    Notification history panel.
 
+    `persistent_notifications` (newest first) is the model. Only the first
+    `HISTORY_PAGE_SIZE` notes are turned into rows up front; further pages
+    are rendered as the list is scrolled towards its end and dropped again
+    when the panel is hidden. Date separators are derived from the note
+    timestamps.
+    """
 
-class NotificationHistory(Box):
     def __init__(self, **kwargs):
         super().__init__(name="notification-history", orientation="v", **kwargs)
 
-        self.containers = []
         self.header_label = Label(
             name="nhh",
             label="Notifications",
@@ -521,8 +555,19 @@ class NotificationHistory(Box):
         )
         self.scrolled_window.add_with_viewport(self.scrolled_window_viewport_box)
         self.persistent_notifications = []
+        # Rendered rows by note id and how many notes the list currently shows.
+        self._rows = {}
+        self._visible_count = HISTORY_PAGE_SIZE
+        self._rebuild_pending = False
+        self._page_pending = False
         self.add(self.history_header)
         self.add(self.scrolled_window)
+
+        adjustment = self.scrolled_window.get_vadjustment()
+        adjustment.connect("value-changed", self._on_scroll)
+        adjustment.connect("changed", self._on_scroll)
+        self.connect("unmap", lambda *_: self._trim_to_first_page())
+
         self._load_persistent_history()
         self._cleanup_orphan_cached_images()
         self.schedule_midnight_update()
@@ -587,35 +632,85 @@ class NotificationHistory(Box):
             ],
         )
 
+    @staticmethod
+    def _note_arrival(note):
+        try:
+            return datetime.fromisoformat(note.get("timestamp"))
+        except (TypeError, ValueError):
+            return datetime.now()
+
+    def _add_rows(self, notes, previous_date=None):
+        """Append rows for `notes`, inserting a separator whenever the day changes."""
+        headers = {}
+        for note in notes:
+            arrival = self._note_arrival(note)
+            date = arrival.date()
+            if date != previous_date:
+                if date not in headers:
+                    headers[date] = self.get_date_header(arrival)
+                self.notifications_list.add(self.create_date_separator(headers[date]))
+                previous_date = date
+            row = self._rows.get(note.get("id"))
+            if row is None:
+                row = self._create_history_row(note, arrival)
+                self._rows[note.get("id")] = row
+            self.notifications_list.add(row)
+        self.notifications_list.show_all()
+
     def rebuild_with_separators(self):
-        GLib.idle_add(self._do_rebuild_with_separators)
+        if not self._rebuild_pending:
+            self._rebuild_pending = True
+            GLib.idle_add(self._do_rebuild_with_separators)
 
     def _do_rebuild_with_separators(self):
-        children = list(self.notifications_list.get_children())
-        for child in children:
+        self._rebuild_pending = False
+        for child in self.notifications_list.get_children():
             self.notifications_list.remove(child)
+            if child.get_name() == "notif-date-sep":
+                child.destroy()
 
-        current_date_header = None
-        last_date_header = None
-        for container in sorted(
-            self.containers, key=lambda x: x.arrival_time, reverse=True
-        ):
-            arrival_time = container.arrival_time
-            date_header = self.get_date_header(arrival_time)
-            if date_header != current_date_header:
-                sep = self.create_date_separator(date_header)
-                self.notifications_list.add(sep)
-                current_date_header = date_header
-                last_date_header = date_header
-            self.notifications_list.add(container)
-
-        if not self.containers and last_date_header:
-            for child in list(self.notifications_list.get_children()):
-                if child.get_name() == "notif-date-sep":
-                    self.notifications_list.remove(child)
+        visible = self.persistent_notifications[: self._visible_count]
+        visible_ids = {note.get("id") for note in visible}
+        for note_id in list(self._rows):
+            if note_id not in visible_ids:
+                self._rows.pop(note_id).destroy()
 
-        self.notifications_list.show_all()
+        self._add_rows(visible)
         self.update_no_notifications_label_visibility()
+        return False
+
+    def _on_scroll(self, adjustment):
+        if (
+            self._page_pending
+            or not self.get_mapped()
+            or self._visible_count >= len(self.persistent_notifications)
+        ):
+            return
+        # Load the next page before the end of the list comes into view.
+        remaining = adjustment.get_upper() - (
+            adjustment.get_value() + adjustment.get_page_size()
+        )
+        if remaining <= adjustment.get_page_size() / 2:
+            self._page_pending = True
+            GLib.idle_add(self._load_next_page)
+
+    def _load_next_page(self):
+        self._page_pending = False
+        start = self._visible_count
+        notes = self.persistent_notifications[start : start + HISTORY_PAGE_SIZE]
+        if not notes or self._rebuild_pending:
+            return False
+        self._visible_count = start + len(notes)
+        previous_date = self._note_arrival(
+            self.persistent_notifications[start - 1]
+        ).date()
+        self._add_rows(notes, previous_date)
+        return False
+
+    def _trim_to_first_page(self):
+        if self._visible_count > HISTORY_PAGE_SIZE:
+            self._visible_count = HISTORY_PAGE_SIZE
+            self.rebuild_with_separators()
 
     def on_do_not_disturb_changed(self, switch, pspec):
         self.do_not_disturb_enabled = switch.get_active()
@@ -623,18 +718,13 @@ class NotificationHistory(Box):
             f"Do Not Disturb mode {'enabled' if self.do_not_disturb_enabled else 'disabled'}"
         )
 
+    def _release_note_image(self, note):
+        if note.get("cached_image_path"):
+            image_store.release(note["cached_image_path"])
+
     def clear_history(self, *args):
-        for child in self.notifications_list.get_children()[:]:
-            container = child
-            notif_box = (
-                container.notification_box
-                if hasattr(container, "notification_box")
-                else None
-            )
-            if notif_box:
-                notif_box.destroy(from_history_delete=True)
-            self.notifications_list.remove(child)
-            child.destroy()
+        for note in self.persistent_notifications:
+            self._release_note_image(note)
 
         if os.path.exists(PERSISTENT_HISTORY_FILE):
             try:
@@ -643,7 +733,7 @@ class NotificationHistory(Box):
             except Exception as e:
                 logger.error(f"Error deleting persistent history file: {e}")
         self.persistent_notifications = []
-        self.containers = []
+        self._visible_count = HISTORY_PAGE_SIZE
         self.rebuild_with_separators()
 
     def _load_persistent_history(self):
@@ -653,11 +743,12 @@ class NotificationHistory(Box):
             try:
                 with open(PERSISTENT_HISTORY_FILE, "r") as f:
                     self.persistent_notifications = json.load(f)
-                for note in reversed(self.persistent_notifications):
-                    self._add_historical_notification(note)
+                for note in self.persistent_notifications:
+                    if note.get("cached_image_path"):
+                        image_store.acquire(note["cached_image_path"])
             except Exception as e:
                 logger.error(f"Error loading persistent history: {e}")
-        GLib.idle_add(self.update_no_notifications_label_visibility)
+        self.rebuild_with_separators()
 
     def _save_persistent_history(self):
         try:
@@ -666,11 +757,7 @@ class NotificationHistory(Box):
         except Exception as e:
             logger.error(f"Error saving persistent history: {e}")
 
-    def delete_historical_notification(self, note_id, container):
-        if hasattr(container, "notification_box"):
-            notif_box = container.notification_box
-            notif_box.destroy(from_history_delete=True)
-
+    def delete_historical_notification(self, note_id):
         target_note_id_str = str(note_id)
 
         new_persistent_notifications = []
@@ -679,7 +766,7 @@ class NotificationHistory(Box):
             current_note_id_str = str(note_in_list.get("id"))
             if current_note_id_str == target_note_id_str:
                 removed_from_list = True
-
+                self._release_note_image(note_in_list)
                 continue
             new_persistent_notifications.append(note_in_list)
 
@@ -694,98 +781,64 @@ class NotificationHistory(Box):
             )
 
         self._save_persistent_history()
-        container.destroy()
-        self.containers = [c for c in self.containers if c != container]
         self.rebuild_with_separators()
 
-    def _add_historical_notification(self, note):
-        hist_notif = HistoricalNotification(
-            id=note.get("id"),
-            app_icon=note.get("app_icon"),
-            summary=note.get("summary"),
-            body=note.get("body"),
-            app_name=note.get("app_name"),
-            timestamp=note.get("timestamp"),
-            cached_image_path=note.get("cached_image_path"),
-        )
-
-        hist_box = NotificationBox(hist_notif, timeout_ms=0)
-        hist_box.uuid = hist_notif.id
-        hist_box.cached_image_path = hist_notif.cached_image_path
-        hist_box.set_is_history(True)
-        for child in hist_box.get_children():
-            if child.get_name() == "notification-action-buttons":
-                hist_box.remove(child)
+    def _create_history_row(self, note, arrival_time):
         container = Box(
             name="notification-container",
             orientation="v",
             h_align="fill",
             h_expand=True,
         )
-        container.notification_box = hist_box
-        try:
-            arrival = datetime.fromisoformat(hist_notif.timestamp)
-        except Exception:
-            arrival = datetime.now()
-        container.arrival_time = arrival
+        container.arrival_time = arrival_time
 
-        def compute_time_label(arrival_time):
-            return arrival_time.strftime("%H:%M")
+        if note.get("cached_image_path"):
+            pixbuf = image_store.thumbnail(note["cached_image_path"], 40, 40)
+        else:
+            pixbuf = None
+        if pixbuf is None:
+            pixbuf = get_app_icon_pixbuf(note.get("app_icon"), 40, 40)
 
-        self.hist_time_label = Label(
+        time_label = Label(
             name="notification-timestamp",
-            markup=compute_time_label(container.arrival_time),
+            markup=arrival_time.strftime("%H:%M"),
             h_align="start",
             ellipsization="end",
         )
-        self.hist_notif_image_box = Box(
+        image_box = Box(
             name="notification-image",
             orientation="v",
-            children=[
-                CustomImage(
-                    pixbuf=load_scaled_pixbuf(
-                        hist_box, 40, 40
-                    )  # Pass hist_box to load_scaled_pixbuf
-                ),
-                Box(v_expand=True),
-            ],
+            children=[CustomImage(pixbuf=pixbuf), Box(v_expand=True)],
         )
-        self.hist_notif_summary_label = Label(
+        summary_label = Label(
             name="notification-summary",
-            markup=hist_notif.summary,
+            markup=note.get("summary"),
             h_align="start",
             ellipsization="end",
         )
-
-        self.hist_notif_app_name_label = Label(
+        app_name_label = Label(
             name="notification-app-name",
-            markup=f"{hist_notif.app_name}",
+            markup=f"{note.get('app_name')}",
             h_align="start",
             ellipsization="end",
         )
-
-        self.hist_notif_body_label = (
-            Label(
+        if note.get("body"):
+            body_label = Label(
                 name="notification-body",
-                markup=hist_notif.body,
+                markup=note["body"],
                 h_align="start",
                 ellipsization="end",
                 line_wrap="word-char",
             )
-            if hist_notif.body
-            else Box()
-        )
-        (
-            self.hist_notif_body_label.set_single_line_mode(True)
-            if hist_notif.body
-            else None
-        )
+            body_label.set_single_line_mode(True)
+        else:
+            body_label = Box()
 
-        self.hist_notif_summary_box = Box(
+        summary_box = Box(
             name="notification-summary-box",
             orientation="h",
             children=[
-                self.hist_notif_summary_label,
+                summary_label,
                 Box(
                     name="notif-sep",
                     h_expand=False,
@@ -793,7 +846,7 @@ class NotificationHistory(Box):
                     h_align="center",
                     v_align="center",
                 ),
-                self.hist_notif_app_name_label,
+                app_name_label,
                 Box(
                     name="notif-sep",
                     h_expand=False,
@@ -801,223 +854,87 @@ class NotificationHistory(Box):
                     h_align="center",
                     v_align="center",
                 ),
-                self.hist_time_label,
+                time_label,
             ],
         )
-        self.hist_notif_text_box = Box(
+        text_box = Box(
             name="notification-text",
             orientation="v",
             v_align="center",
             h_expand=True,
-            children=[
-                self.hist_notif_summary_box,
-                self.hist_notif_body_label,
-            ],
+            children=[summary_box, body_label],
         )
-        self.hist_notif_close_button = Button(
+        note_id = note.get("id")
+        close_button = Button(
             name="notif-close-button",
             child=Label(name="notif-close-label", markup=icons.cancel),
-            on_clicked=lambda *_: self.delete_historical_notification(
-                hist_notif.id, container
-            ),
+            on_clicked=lambda *_: self.delete_historical_notification(note_id),
         )
-        self.hist_notif_close_button_box = Box(
+        close_button_box = Box(
             orientation="v",
-            children=[
-                self.hist_notif_close_button,
-                Box(v_expand=True),
-            ],
+            children=[close_button, Box(v_expand=True)],
         )
         content_box = Box(
             name="notification-box-hist",
             spacing=8,
-            children=[
-                self.hist_notif_image_box,
-                self.hist_notif_text_box,
-                self.hist_notif_close_button_box,
-            ],
+            children=[image_box, text_box, close_button_box],
         )
         container.add(content_box)
-        self.containers.insert(0, container)
-        self.rebuild_with_separators()
-        self.update_no_notifications_label_visibility()
+        return container
 
     def add_notification(self, notification_box):
-        app_name = notification_box.notification.app_name
-        if app_name in self.LIMITED_APPS_HISTORY:
+        """Move a card, and everything stacked under it, into the history."""
+        entries = notification_box.stacked + [
+            (notification_box.notification, notification_box.cached_image_path)
+        ]
+        notification_box.stacked = []
+        # The history now owns the references to the cached images.
+        notification_box.cached_image_path = None
+        self.add_notification_entries(entries, last_id=notification_box.uuid)
+
+    def add_notification_entries(self, entries, last_id=None):
+        """
+        Add `(notification, cached_image_path)` pairs, oldest first, with a
+        single save and relayout. The history takes over the image references.
+        """
+        newest_limited = {}
+        for index, (notification, _) in enumerate(entries):
+            if notification.app_name in self.LIMITED_APPS_HISTORY:
+                newest_limited[notification.app_name] = index
+        for app_name in newest_limited:
             self.clear_history_for_app(app_name)
 
-        if len(self.containers) >= 50:
-            oldest_container = self.containers.pop()
-            if (
-                hasattr(oldest_container, "notification_box")
-                and hasattr(oldest_container.notification_box, "cached_image_path")
-                and oldest_container.notification_box.cached_image_path
-                and os.path.exists(oldest_container.notification_box.cached_image_path)
-            ):
-                try:
-                    os.remove(oldest_container.notification_box.cached_image_path)
-                    logger.info(
-                        f"Deleted cached image of oldest notification due to history limit: {oldest_container.notification_box.cached_image_path}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image of oldest notification: {e}"
-                    )
-            oldest_container.destroy()
-
-        def on_container_destroy(container):
-            if (
-                hasattr(container, "_timestamp_timer_id")
-                and container._timestamp_timer_id
-            ):
-                GLib.source_remove(container._timestamp_timer_id)
-            if hasattr(container, "notification_box"):
-                notif_box = container.notification_box
-            container.destroy()
-            self.containers.remove(container)
-            self.rebuild_with_separators()
-            self.update_no_notifications_label_visibility()
-
-        container = Box(
-            name="notification-container",
-            orientation="v",
-            h_align="fill",
-            h_expand=True,
-        )
-        container.arrival_time = datetime.now()
-
-        def compute_time_label(arrival_time):
-            return arrival_time.strftime("%H:%M")
-
-        self.current_time_label = Label(
-            name="notification-timestamp",
-            markup=compute_time_label(container.arrival_time),
-        )
-        self.current_notif_image_box = Box(
-            name="notification-image",
-            orientation="v",
-            children=[
-                CustomImage(
-                    pixbuf=load_scaled_pixbuf(
-                        notification_box, 40, 40
-                    )  # Pass notification_box to load_scaled_pixbuf
-                ),
-                Box(v_expand=True, v_align="fill"),
-            ],
-        )
-        self.current_notif_summary_label = Label(
-            name="notification-summary",
-            markup=notification_box.notification.summary,
-            h_align="start",
-            ellipsization="end",
-        )
-        self.current_notif_app_name_label = Label(
-            name="notification-app-name",
-            markup=f"{notification_box.notification.app_name}",
-            h_align="start",
-            ellipsization="end",
-        )
-        self.current_notif_body_label = (
-            Label(
-                name="notification-body",
-                markup=notification_box.notification.body,
-                h_align="start",
-                ellipsization="end",
-                line_wrap="word-char",
+        arrival_time = datetime.now()
+        for index, (notification, image_path) in enumerate(entries):
+            if newest_limited.get(notification.app_name, index) != index:
+                if image_path:
+                    image_store.release(image_path)
+                continue
+            note_id = (
+                last_id if last_id and index == len(entries) - 1 else str(uuid.uuid4())
             )
-            if notification_box.notification.body
-            else Box()
-        )
-        (
-            self.current_notif_body_label.set_single_line_mode(True)
-            if notification_box.notification.body
-            else None
-        )
-        self.current_notif_summary_box = Box(
-            name="notification-summary-box",
-            orientation="h",
-            children=[
-                self.current_notif_summary_label,
-                Box(
-                    name="notif-sep",
-                    h_expand=False,
-                    v_expand=False,
-                    h_align="center",
-                    v_align="center",
-                ),
-                self.current_notif_app_name_label,
-                Box(
-                    name="notif-sep",
-                    h_expand=False,
-                    v_expand=False,
-                    h_align="center",
-                    v_align="center",
-                ),
-                self.current_time_label,
-            ],
-        )
-        self.current_notif_text_box = Box(
-            name="notification-text",
-            orientation="v",
-            v_align="center",
-            h_expand=True,
-            children=[
-                self.current_notif_summary_box,
-                self.current_notif_body_label,
-            ],
-        )
-        self.current_notif_close_button = Button(
-            name="notif-close-button",
-            child=Label(name="notif-close-label", markup=icons.cancel),
-            on_clicked=lambda *_: on_container_destroy(container),
-        )
-        self.current_notif_close_button_box = Box(
-            orientation="v",
-            children=[
-                self.current_notif_close_button,
-                Box(v_expand=True),
-            ],
-        )
-        content_box = Box(
-            name="notification-content",
-            spacing=8,
-            children=[
-                self.current_notif_image_box,
-                self.current_notif_text_box,
-                self.current_notif_close_button_box,
-            ],
-        )
-        container.notification_box = notification_box
-        hist_box = Box(
-            name="notification-box-hist",
-            orientation="v",
-            h_align="fill",
-            h_expand=True,
-        )
-        hist_box.add(content_box)
-        content_box.get_children()[2].get_children()[0].connect(
-            "clicked", lambda *_: on_container_destroy(container)
-        )
-        container.add(hist_box)
-        self.containers.insert(0, container)
+            self._append_persistent_notification(
+                notification, note_id, image_path, arrival_time
+            )
+        self._save_persistent_history()
         self.rebuild_with_separators()
-        self._append_persistent_notification(notification_box, container.arrival_time)
-        self.update_no_notifications_label_visibility()
 
-    def _append_persistent_notification(self, notification_box, arrival_time):
+    def _append_persistent_notification(
+        self, notification, note_id, cached_image_path, arrival_time
+    ):
         note = {
-            "id": notification_box.uuid,
-            "app_icon": notification_box.notification.app_icon,
-            "summary": notification_box.notification.summary,
-            "body": notification_box.notification.body,
-            "app_name": notification_box.notification.app_name,
+            "id": note_id,
+            "app_icon": notification.app_icon,
+            "summary": notification.summary,
+            "body": notification.body,
+            "app_name": notification.app_name,
             "timestamp": arrival_time.isoformat(),
-            "cached_image_path": notification_box.cached_image_path,
+            "cached_image_path": cached_image_path,
         }
         self.persistent_notifications.insert(0, note)
-        self.persistent_notifications = self.persistent_notifications[:50]
-        self._save_persistent_history()
+        for dropped in self.persistent_notifications[HISTORY_LIMIT:]:
+            self._release_note_image(dropped)
+        self.persistent_notifications = self.persistent_notifications[:HISTORY_LIMIT]
 
     def _cleanup_orphan_cached_images(self):
         logger.debug("Starting orphan cached image cleanup.")
@@ -1026,22 +943,21 @@ class NotificationHistory(Box):
             return
 
         cached_files = [
-            f
-            for f in os.listdir(PERSISTENT_DIR)
-            if f.startswith("notification_") and f.endswith(".png")
+            f for f in os.listdir(PERSISTENT_DIR) if f.endswith((".png", ".png.tmp"))
         ]
         if not cached_files:
             logger.debug("No cached image files found, skipping cleanup.")
             return
 
-        history_uuids = {
-            note.get("id") for note in self.persistent_notifications if note.get("id")
+        history_images = {
+            os.path.basename(note["cached_image_path"])
+            for note in self.persistent_notifications
+            if note.get("cached_image_path")
         }
         deleted_count = 0
         for cached_file in cached_files:
             try:
-                uuid_from_filename = cached_file[len("notification_") : -len(".png")]
-                if uuid_from_filename not in history_uuids:
+                if cached_file not in history_images:
                     cache_file_path = os.path.join(PERSISTENT_DIR, cached_file)
                     os.remove(cache_file_path)
                     logger.info(f"Deleted orphan cached image: {cache_file_path}")
@@ -1063,51 +979,24 @@ class NotificationHistory(Box):
             logger.info("Orphan cached image cleanup finished. No orphan images found.")
 
     def update_no_notifications_label_visibility(self):
-        has_notifications = bool(self.containers)
+        has_notifications = bool(self.persistent_notifications)
         self.no_notifications_box.set_visible(not has_notifications)
         self.notifications_list.set_visible(has_notifications)
 
     def clear_history_for_app(self, app_name):
         """Clears all notifications in history for a specific app."""
-        containers_to_remove = []
-        persistent_notes_to_remove_ids = set()
-        for container in list(self.containers):
-            if (
-                hasattr(container, "notification_box")
-                and container.notification_box.notification.app_name == app_name
-            ):
-                containers_to_remove.append(container)
-                persistent_notes_to_remove_ids.add(container.notification_box.uuid)
-
-        for container in containers_to_remove:
-            if (
-                hasattr(container, "notification_box")
-                and hasattr(container.notification_box, "cached_image_path")
-                and container.notification_box.cached_image_path
-                and os.path.exists(container.notification_box.cached_image_path)
-            ):
-                try:
-                    os.remove(container.notification_box.cached_image_path)
-                    logger.info(
-                        f"Deleted cached image of replaced history notification: {container.notification_box.cached_image_path}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image of replaced history notification: {e}"
-                    )
-            self.containers.remove(container)
-            self.notifications_list.remove(container)
-            container.notification_box.destroy(from_history_delete=True)
-            container.destroy()
+        kept_notes = []
+        for note in self.persistent_notifications:
+            if note.get("app_name") == app_name:
+                self._release_note_image(note)
+            else:
+                kept_notes.append(note)
+        if len(kept_notes) == len(self.persistent_notifications):
+            return
 
-        self.persistent_notifications = [
-            note
-            for note in self.persistent_notifications
-            if note.get("id") not in persistent_notes_to_remove_ids
-        ]
+        self.persistent_notifications = kept_notes
         self._save_persistent_history()
         self.rebuild_with_separators()
-        self.update_no_notifications_label_visibility()
 
 
 class NotificationContainer(Box):
@@ -1195,25 +1084,123 @@ class NotificationContainer(Box):
         self.update_navigation_buttons()
         self._destroyed_notifications = set()
 
+        # Notifications waiting for the coalescing window to close, by id.
+        self._incoming = {}
+        self._flush_id = None
+        # Monotonic times of the cards recently shown for each app.
+        self._shown_times = {}
+
     def on_new_notification(self, fabric_notif, id):
+        notification = fabric_notif.get_notification_from_id(id)
+        # A replacement queued in the same window supersedes the earlier one.
+        self._incoming.pop(id, None)
+        self._incoming[id] = notification
+        if self._flush_id is None:
+            self._flush_id = GLib.timeout_add(
+                data.NOTIFICATION_COALESCE_MS, self._flush_incoming
+            )
+
+    def _flush_incoming(self):
+        if self._is_destroying:
+            # Wait until the hide animation has cleared the stack.
+            return True
+        self._flush_id = None
+        incoming = list(self._incoming.values())
+        self._incoming.clear()
         notification_history_instance = self.notification_history
+
         if notification_history_instance.do_not_disturb_enabled:
             logger.info(
-                "Do Not Disturb mode enabled: adding notification directly to history."
+                f"Do Not Disturb mode enabled: adding {len(incoming)} notification(s) directly to history."
             )
-            notification = fabric_notif.get_notification_from_id(id)
-            new_box = NotificationBox(notification)
-            if notification.image_pixbuf:
-                cache_notification_pixbuf(new_box)
-            notification_history_instance.add_notification(new_box)
-            return
+            notification_history_instance.add_notification_entries(
+                [
+                    (notification, store_notification_image(notification))
+                    for notification in incoming
+                ]
+            )
+            return False
 
-        notification = fabric_notif.get_notification_from_id(id)
-        new_box = NotificationBox(notification)
+        groups = {}
+        for notification in incoming:
+            if not self._replace_existing(notification):
+                groups.setdefault(notification.app_name, []).append(notification)
+
+        for app_name, notifications in groups.items():
+            for notification in notifications:
+                self._destroyed_notifications.discard(notification.id)
+                notification.connect("closed", self.on_notification_closed)
+
+            if self._allow_card(app_name):
+                self._show_card(app_name, notifications)
+                continue
+
+            card = self._card_for_app(app_name)
+            if card is not None:
+                logger.info(f"Rate limit reached for {app_name}, stacking.")
+                for notification in notifications:
+                    card.stack(notification)
+            else:
+                logger.info(f"Rate limit reached for {app_name}, sending to history.")
+                notification_history_instance.add_notification_entries(
+                    [
+                        (notification, store_notification_image(notification))
+                        for notification in notifications
+                    ]
+                )
+
+        if not self.notifications:
+            return False
+        for notification_box in self.notifications:
+            notification_box.start_timeout()
+        self.main_revealer.show_all()
+        self.main_revealer.set_reveal_child(True)
+        self.update_navigation_buttons()
+        return False
+
+    def _replace_existing(self, notification):
+        """Patch the card showing `notification.id` in place, if there is one."""
+        for card in self.notifications:
+            previous = card.replace(notification)
+            if previous is not None:
+                if previous is not notification:
+                    notification.connect("closed", self.on_notification_closed)
+                return True
+        return False
+
+    def _allow_card(self, app_name):
+        """Record a new card for `app_name` unless it exceeds its rate limit."""
+        limit = data.NOTIFICATION_APP_RATE_LIMITS.get(
+            app_name, data.NOTIFICATION_RATE_LIMIT
+        )
+        if not limit:
+            return True
+        now = time.monotonic()
+        shown = self._shown_times.setdefault(app_name, deque())
+        while shown and now - shown[0] > RATE_LIMIT_WINDOW:
+            shown.popleft()
+        if len(shown) >= limit:
+            return False
+        shown.append(now)
+        return True
+
+    def _card_for_app(self, app_name):
+        for card in reversed(self.notifications):
+            if card.notification.app_name == app_name:
+                return card
+        return None
+
+    def _show_card(self, app_name, notifications):
+        """Show a burst from one app as a single card with a counter."""
+        notification_history_instance = self.notification_history
+        new_box = NotificationBox(notifications[0])
         new_box.set_container(self)
-        notification.connect("closed", self.on_notification_closed)
+        for notification in notifications[1:]:
+            if app_name in self.LIMITED_APPS:
+                new_box.update(notification)
+            else:
+                new_box.stack(notification)
 
-        app_name = notification.app_name
         if app_name in self.LIMITED_APPS:
             notification_history_instance.clear_history_for_app(app_name)
 
@@ -1230,40 +1217,19 @@ class NotificationContainer(Box):
                 self.stack.remove(old_notification_box)
                 old_notification_box.destroy()
 
-                self.stack.add_named(new_box, str(id))
-                self.notifications.append(new_box)
-                self.current_index = len(self.notifications) - 1
-                self.stack.set_visible_child(new_box)
-            else:
-                while len(self.notifications) >= 5:
-                    oldest_notification = self.notifications[0]
-                    notification_history_instance.add_notification(oldest_notification)
-                    self.stack.remove(oldest_notification)
-                    self.notifications.pop(0)
-                    if self.current_index > 0:
-                        self.current_index -= 1
-                self.stack.add_named(new_box, str(id))
-                self.notifications.append(new_box)
-                self.current_index = len(self.notifications) - 1
-                self.stack.set_visible_child(new_box)
-        else:
-            while len(self.notifications) >= 5:
-                oldest_notification = self.notifications[0]
-                notification_history_instance.add_notification(oldest_notification)
-                self.stack.remove(oldest_notification)
-                self.notifications.pop(0)
-                if self.current_index > 0:
-                    self.current_index -= 1
-            self.stack.add_named(new_box, str(id))
-            self.notifications.append(new_box)
-            self.current_index = len(self.notifications) - 1
-            self.stack.set_visible_child(new_box)
-
-        for notification_box in self.notifications:
-            notification_box.start_timeout()
-        self.main_revealer.show_all()
-        self.main_revealer.set_reveal_child(True)
-        self.update_navigation_buttons()
+        while len(self.notifications) >= 5:
+            oldest_notification = self.notifications[0]
+            notification_history_instance.add_notification(oldest_notification)
+            oldest_notification.set_is_history(True)
+            self.stack.remove(oldest_notification)
+            oldest_notification.destroy()
+            self.notifications.pop(0)
+            if self.current_index > 0:
+                self.current_index -= 1
+        self.stack.add_named(new_box, str(new_box.notification.id))
+        self.notifications.append(new_box)
+        self.current_index = len(self.notifications) - 1
+        self.stack.set_visible_child(new_box)
 
     def show_previous(self, *args):
         if self.current_index > 0:
@@ -1297,6 +1263,7 @@ class NotificationContainer(Box):
                     notif_to_remove = (i, notif_box)
                     break
             if not notif_to_remove:
+                self._on_stacked_notification_closed(notification, reason)
                 return
             i, notif_box = notif_to_remove
             reason_str = str(reason)
@@ -1318,7 +1285,7 @@ class NotificationContainer(Box):
                 )
                 notif_box.set_is_history(True)
                 notification_history_instance.add_notification(notif_box)
-                notif_box.stop_timeout()
+                notif_box.destroy()
             else:
                 logger.warning(
                     f"Unknown close reason: {reason_str} for notification {notification.id}. Defaulting to destroy."
@@ -1356,6 +1323,18 @@ class NotificationContainer(Box):
         except Exception as e:
             logger.error(f"Error closing notification: {e}")
 
+    def _on_stacked_notification_closed(self, notification, reason):
+        for card in self.notifications:
+            entry = card.unstack(notification.id)
+            if entry is None:
+                continue
+            if str(reason) == "NotificationCloseReason.DISMISSED_BY_USER":
+                if entry[1]:
+                    image_store.release(entry[1])
+            else:
+                self.notification_history.add_notification_entries([entry])
+            return
+
     def _destroy_container(self):
         try:
             self.notifications.clear()
@@ -1393,7 +1372,7 @@ class NotificationContainer(Box):
     def close_all_notifications(self, *args):
         notifications_to_close = self.notifications.copy()
         for notification_box in notifications_to_close:
-            notification_box.notification.close("dismissed-by-user")
+            notification_box.dismiss()
 
 
 class NotificationPopup(Window):
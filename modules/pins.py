@@ -7,20 +7,15 @@ import json
 import os
 import re
 import subprocess
-import tempfile
-import urllib.parse
-import urllib.request
-from pathlib import Path
 
 import cairo
 from fabric.widgets.box import Box
 from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import Gdk, GdkPixbuf, Gio, GLib, Gtk
-from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
+from gi.repository import Gdk, Gio, GLib, Gtk
 
 import modules.icons as icons
+from utils.pin_previews import pin_previews
 
 SAVE_FILE = os.path.expanduser("~/.pins.json")
 
@@ -61,72 +56,6 @@ def is_url(text):
         r'(?:/?|[/?]\S+)$', re.IGNORECASE)
     return bool(url_pattern.match(text))
 
-def get_favicon_url(url):
-    """Extract the base domain from a URL and construct a favicon URL."""
-    parsed_url = urllib.parse.urlparse(url)
-    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-    return f"{base_url}/favicon.ico"
-
-def download_favicon(url, callback):
-    """Download a favicon asynchronously and call the callback with the result."""
-    favicon_url = get_favicon_url(url)
-    
-    def do_download():
-        temp_file = None
-        try:
-
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.ico')
-            os.close(temp_fd)
-            
-
-            urllib.request.urlretrieve(favicon_url, temp_path)
-            
-
-            GLib.idle_add(callback, temp_path)
-        except Exception as e:
-            print(f"Error downloading favicon: {e}")
-
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-            GLib.idle_add(callback, None)
-        return False
-    
-
-    GLib.idle_add(do_download)
-
-class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self, app):
-        self.app = app
-
-    def on_any_event(self, event):
-        if event.is_directory:
-            return
-
-        for cell in self.app.cells:
-            if cell.content_type == 'file' and cell.content:
-                try:
-                    cell_real = os.path.realpath(cell.content)
-                    src_real = os.path.realpath(event.src_path)
-                    dest_real = os.path.realpath(getattr(event, 'dest_path', ''))
-                    if cell_real == src_real or (dest_real and cell_real == dest_real):
-                        GLib.idle_add(self.handle_file_event, cell, event)
-                except Exception:
-                    pass
-
-    def handle_file_event(self, cell, event):
-        if event.event_type == 'deleted':
-            cell.clear_cell()
-            self.app.save_state()
-        elif event.event_type == 'moved':
-            if hasattr(event, 'dest_path') and os.path.exists(event.dest_path):
-                cell.content = event.dest_path
-                cell.update_display()
-                self.app.save_state()
-                self.app.add_monitor_for_path(os.path.dirname(event.dest_path))
-
 class Cell(Gtk.EventBox):
     def __init__(self, app, content=None, content_type=None):
         super().__init__(name="pin-cell")
@@ -135,9 +64,10 @@ class Cell(Gtk.EventBox):
         self.content_type = content_type
         self.box = Box(name="pin-cell-box", orientation="v", spacing=4)
         self.add(self.box)
-        
 
-        self.favicon_temp_path = None
+        self.monitor = None
+        # Bumped on every render so late previews for old content are dropped.
+        self.render_token = 0
 
         target_dest = Gtk.TargetEntry.new("text/uri-list", 0, 0)
         self.drag_dest_set(Gtk.DestDefaults.ALL, [target_dest], Gdk.DragAction.COPY)
@@ -156,15 +86,10 @@ class Cell(Gtk.EventBox):
 
         self.update_display()
 
-    def update_display(self):
+    def update_display(self, save=True):
+        self.render_token += 1
+        self.watch_file()
 
-        if self.favicon_temp_path and os.path.exists(self.favicon_temp_path):
-            try:
-                os.remove(self.favicon_temp_path)
-                self.favicon_temp_path = None
-            except Exception as e:
-                print(f"Error removing temp favicon: {e}")
-        
         for child in self.box.get_children():
             self.box.remove(child)
         
@@ -194,38 +119,54 @@ class Cell(Gtk.EventBox):
                     self.box.pack_start(label, False, False, 0)
                     
 
-                    download_favicon(
-                        self.content, 
-                        lambda path: self.update_favicon(icon_container, url_icon, path)
+                    token = self.render_token
+                    favicon_size = 36 if data.PANEL_THEME == "Panel" and data.BAR_POSITION in ["Left", "Right"] else 48
+                    pin_previews.load_favicon(
+                        self.content,
+                        favicon_size,
+                        lambda pixbuf: self.update_favicon(icon_container, url_icon, pixbuf, token)
                     )
                 else:
 
                     label = Label(name="pin-text", label=self.content.split('\n')[0], justification="center", ellipsization="end", line_wrap="word-char")
                     self.box.pack_start(label, True, True, 0)
         self.box.show_all()
-        if not self.app.loading_state:
+        if save and not self.app.loading_state:
             self.app.save_state()
-    
-    def update_favicon(self, container, icon_widget, favicon_path):
-        """Update the icon with the downloaded favicon or keep the default."""
-        if not favicon_path or not os.path.exists(favicon_path):
 
+    def watch_file(self):
+        """Follow the pinned file itself, so only its own events arrive here."""
+        if self.monitor is not None:
+            self.monitor.cancel()
+            self.monitor = None
+        if self.content_type != 'file' or not self.content:
             return
-        
         try:
-
-            self.favicon_temp_path = favicon_path
-            
-
-            if data.PANEL_THEME == "Panel" and data.BAR_POSITION in ["Left", "Right"]:
-
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    favicon_path, width=36, height=36, preserve_aspect_ratio=True)
+            self.monitor = Gio.File.new_for_path(self.content).monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            self.monitor.connect("changed", self.on_file_changed)
+        except GLib.Error as e:
+            print(f"Error monitoring {self.content}: {e}")
+
+    def on_file_changed(self, monitor, file, other_file, event_type):
+        if event_type == Gio.FileMonitorEvent.DELETED:
+            self.clear_cell()
+        elif event_type in (Gio.FileMonitorEvent.RENAMED, Gio.FileMonitorEvent.MOVED_OUT):
+            new_path = other_file.get_path() if other_file else None
+            if new_path and os.path.exists(new_path):
+                self.content = new_path
+                self.update_display()
             else:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    favicon_path, width=48, height=48, preserve_aspect_ratio=True)
-            
-
+                self.clear_cell()
+        elif event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            # New mtime, new thumbnail; the pin itself is unchanged.
+            self.update_display(save=False)
+    
+    def update_favicon(self, container, icon_widget, pixbuf, token):
+        """Update the icon with the cached favicon or keep the default."""
+        if pixbuf is None or token != self.render_token:
+            return
+        
+        try:
             container.remove(icon_widget)
             
 
@@ -242,8 +183,9 @@ class Cell(Gtk.EventBox):
     def get_file_preview(self, filepath):
         try:
             file = Gio.File.new_for_path(filepath)
-            info = file.query_info("standard::content-type", Gio.FileQueryInfoFlags.NONE, None)
-            content_type = info.get_content_type()
+            # The fast type comes from the name alone, without reading the file.
+            info = file.query_info("standard::fast-content-type", Gio.FileQueryInfoFlags.NONE, None)
+            content_type = info.get_attribute_string("standard::fast-content-type")
         except Exception:
             content_type = None
 
@@ -258,12 +200,19 @@ class Cell(Gtk.EventBox):
                 return Gtk.Image.new_from_icon_name("default-folder", Gtk.IconSize.DIALOG)
 
         if content_type and content_type.startswith("image/"):
+            # Show the generic icon until the worker has the thumbnail.
             try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    filepath, width=icon_size, height=icon_size, preserve_aspect_ratio=True)
-                return Gtk.Image.new_from_pixbuf(pixbuf)
-            except Exception as e:
-                print("Error loading image preview:", e)
+                image = Gtk.Image.new_from_pixbuf(icon_theme.load_icon("image-x-generic", icon_size, 0))
+            except Exception:
+                image = Gtk.Image.new_from_icon_name("image-x-generic", Gtk.IconSize.DIALOG)
+            token = self.render_token
+
+            def on_thumbnail(pixbuf):
+                if pixbuf is not None and token == self.render_token:
+                    image.set_from_pixbuf(pixbuf)
+
+            pin_previews.load_thumbnail(filepath, icon_size, on_thumbnail)
+            return image
 
         elif content_type and content_type.startswith("video/"):
             try:
@@ -367,14 +316,6 @@ class Cell(Gtk.EventBox):
         dialog.destroy()
 
     def clear_cell(self):
-
-        if self.favicon_temp_path and os.path.exists(self.favicon_temp_path):
-            try:
-                os.remove(self.favicon_temp_path)
-                self.favicon_temp_path = None
-            except Exception as e:
-                print(f"Error removing temp favicon: {e}")
-        
         self.content = None
         self.content_type = None
         self.update_display()
@@ -384,9 +325,6 @@ class Pins(Gtk.Box):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
 
         self.loading_state = True
-        self.monitored_paths = set()
-        self.observer = Observer()
-        self.event_handler = FileChangeHandler(self)
 
         self.cells = []
 
@@ -425,25 +363,10 @@ class Pins(Gtk.Box):
 
         self.load_state()
         self.loading_state = False
-        self.start_file_monitoring()
 
         self.drag_dest_set(Gtk.DestDefaults.ALL, [], Gdk.DragAction.COPY)
         self.connect("drag-data-received", self.on_drag_data_received)
 
-    def start_file_monitoring(self):
-        for cell in self.cells:
-            if cell.content_type == 'file' and cell.content:
-                dir_path = os.path.dirname(cell.content)
-                if os.path.exists(dir_path) and dir_path not in self.monitored_paths:
-                    self.observer.schedule(self.event_handler, dir_path, recursive=False)
-                    self.monitored_paths.add(dir_path)
-        self.observer.start()
-
-    def add_monitor_for_path(self, path):
-        if path not in self.monitored_paths and os.path.exists(path):
-            self.observer.schedule(self.event_handler, path, recursive=False)
-            self.monitored_paths.add(path)
-
     def save_state(self):
         state = []
         for cell in self.cells:
@@ -490,13 +413,7 @@ class Pins(Gtk.Box):
         drag_context.finish(True, False, time)
 
     def stop_monitoring(self):
-
         for cell in self.cells:
-            if hasattr(cell, 'favicon_temp_path') and cell.favicon_temp_path and os.path.exists(cell.favicon_temp_path):
-                try:
-                    os.remove(cell.favicon_temp_path)
-                except Exception:
-                    pass
-                    
-        self.observer.stop()
-        self.observer.join()
+            if cell.monitor is not None:
+                cell.monitor.cancel()
+                cell.monitor = None
@@ -1,8 +1,6 @@
 import os
-import tempfile
-import urllib.parse
-import urllib.request
 
+from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.centerbox import CenterBox
@@ -16,6 +14,7 @@ import config.data as data
 import modules.icons as icons
 from modules.cavalcade import SpectrumRender
 from services.mpris import MprisPlayer, MprisPlayerManager
+from utils.art_cache import art_cache
 from widgets.circle_image import CircleImage
 
 vertical_mode = False
@@ -26,6 +25,26 @@ if data.PANEL_THEME == "Panel" and (
 
 WALL_EXIST = os.path.exists(os.path.expanduser("~/.current.wall"))
 
+# MprisPlayer change names that affect each group of widgets.
+TEXT_CHANGES = frozenset({"metadata", "title", "album", "artist"})
+COVER_CHANGES = frozenset({"metadata", "arturl"})
+STATUS_CHANGES = frozenset({"playback-status"})
+SEEK_CHANGES = frozenset(
+    {
+        "metadata",
+        "length",
+        "can-seek",
+        "player-name",
+        "playback-status",
+        "seeked",
+        "rate",
+    }
+)
+NAVIGATION_CHANGES = frozenset({"can-go-next", "can-go-previous"})
+SMALL_CHANGES = frozenset(
+    {"metadata", "title", "artist", "player-name", "playback-status"}
+)
+
 
 def get_player_icon_markup_by_name(player_name):
     if player_name:
@@ -63,6 +82,9 @@ class PlayerBox(Box):
         )
         self.mpris_player = mpris_player
         self._progress_timer_id = None
+        self._seekable = False
+        self._cover_url = None
+        self._wallpaper_monitor = None
 
         image_file = f"{data.HOME_DIR}/.current.wall"
         if not WALL_EXIST:
@@ -236,6 +258,8 @@ class PlayerBox(Box):
             self.forward.connect("clicked", self._on_forward_clicked)
             self.next.connect("clicked", self._on_next_clicked)
             self.mpris_player.connect("changed", self._on_mpris_changed)
+            self.progressbar.connect("map", self._on_progress_mapped)
+            self.progressbar.connect("unmap", lambda *_: self._sync_progress_timer())
         else:
             self.play_pause.get_child().set_markup(icons.stop)
             self.play_pause.add_style_class("stop")
@@ -247,29 +271,48 @@ class PlayerBox(Box):
             self.progressbar.set_value(0.0)
             self.time.set_text("--:-- / --:--")
 
-    def _apply_mpris_properties(self):
+    def _apply_mpris_properties(self, changes=None):
+        """Update the widgets affected by `changes`, or all of them if None."""
+        mp = self.mpris_player
+        if changes is None or changes & TEXT_CHANGES:
+            self.title.set_visible(bool(mp.title and mp.title.strip()))
+            if mp.title and mp.title.strip():
+                self.title.set_text(mp.title)
+            self.album.set_visible(bool(mp.album and mp.album.strip()))
+            if mp.album and mp.album.strip():
+                self.album.set_text(mp.album)
+            self.artist.set_visible(bool(mp.artist and mp.artist.strip()))
+            if mp.artist and mp.artist.strip():
+                self.artist.set_text(mp.artist)
+        if changes is None or changes & COVER_CHANGES:
+            self._update_cover()
+        if changes is None or changes & STATUS_CHANGES:
+            self.update_play_pause_icon()
+        if changes is None or changes & SEEK_CHANGES:
+            self._update_seek_controls()
+        if changes is None or changes & NAVIGATION_CHANGES:
+            if hasattr(mp, "can_go_previous") and mp.can_go_previous:
+                self.prev.remove_style_class("disabled")
+            else:
+                self.prev.add_style_class("disabled")
+
+            if hasattr(mp, "can_go_next") and mp.can_go_next:
+                self.next.remove_style_class("disabled")
+            else:
+                self.next.add_style_class("disabled")
+
+    def _update_cover(self):
         mp = self.mpris_player
-        self.title.set_visible(bool(mp.title and mp.title.strip()))
-        if mp.title and mp.title.strip():
-            self.title.set_text(mp.title)
-        self.album.set_visible(bool(mp.album and mp.album.strip()))
-        if mp.album and mp.album.strip():
-            self.album.set_text(mp.album)
-        self.artist.set_visible(bool(mp.artist and mp.artist.strip()))
-        if mp.artist and mp.artist.strip():
-            self.artist.set_text(mp.artist)
         if mp.arturl:
-            parsed = urllib.parse.urlparse(mp.arturl)
-            if parsed.scheme == "file":
-                local_arturl = urllib.parse.unquote(parsed.path)
-                self._set_cover_image(local_arturl)
-            elif parsed.scheme in ("http", "https"):
-                GLib.Thread.new(
-                    "download-artwork", self._download_and_set_artwork, mp.arturl
+            if mp.arturl != self._cover_url:
+                self._cover_url = mp.arturl
+                art_cache.load(
+                    mp.arturl,
+                    self.cover.size,
+                    lambda pixbuf, url=mp.arturl: self._on_cover_loaded(url, pixbuf),
                 )
-            else:
-                self._set_cover_image(mp.arturl)
-        else:
+        elif self._cover_url is not None or self._wallpaper_monitor is None:
+            self._cover_url = None
 
             fallback = f"{data.HOME_DIR}/.current.wall"
             if not WALL_EXIST:
@@ -279,8 +322,9 @@ class PlayerBox(Box):
             monitor = file_obj.monitor_file(Gio.FileMonitorFlags.NONE, None)
             monitor.connect("changed", self.on_wallpaper_changed)
             self._wallpaper_monitor = monitor
-        self.update_play_pause_icon()
 
+    def _update_seek_controls(self):
+        mp = self.mpris_player
         self.progressbar.set_visible(True)
         self.time.set_visible(True)
 
@@ -290,36 +334,41 @@ class PlayerBox(Box):
             else ""
         )
         can_seek = hasattr(mp, "can_seek") and mp.can_seek
+        self._seekable = player_name != "firefox" and bool(can_seek)
 
-        if player_name == "firefox" or not can_seek:
+        if not self._seekable:
 
             self.backward.add_style_class("disabled")
             self.forward.add_style_class("disabled")
             self.progressbar.set_value(0.0)
             self.time.set_text("--:-- / --:--")
-
-            if self._progress_timer_id:
-                GLib.source_remove(self._progress_timer_id)
-                self._progress_timer_id = None
         else:
 
             self.backward.remove_style_class("disabled")
             self.forward.remove_style_class("disabled")
-
-            if not self._progress_timer_id:
-                self._progress_timer_id = GLib.timeout_add(1000, self._update_progress)
-
             self._update_progress()
 
-        if hasattr(mp, "can_go_previous") and mp.can_go_previous:
-            self.prev.remove_style_class("disabled")
-        else:
-            self.prev.add_style_class("disabled")
+        self._sync_progress_timer()
 
-        if hasattr(mp, "can_go_next") and mp.can_go_next:
-            self.next.remove_style_class("disabled")
-        else:
-            self.next.add_style_class("disabled")
+    def _sync_progress_timer(self):
+        """Tick only while the progress bar is on screen and the track moves."""
+        mp = self.mpris_player
+        wanted = (
+            mp is not None
+            and self._seekable
+            and self.progressbar.get_mapped()
+            and mp.is_playing()
+        )
+        if wanted and not self._progress_timer_id:
+            self._progress_timer_id = GLib.timeout_add(1000, self._update_progress)
+        elif not wanted and self._progress_timer_id:
+            GLib.source_remove(self._progress_timer_id)
+            self._progress_timer_id = None
+
+    def _on_progress_mapped(self, *_):
+        if self.mpris_player and self._seekable:
+            self._update_progress()
+        self._sync_progress_timer()
 
     def _set_cover_image(self, image_path):
 
@@ -350,26 +399,14 @@ class PlayerBox(Box):
             monitor.connect("changed", self.on_wallpaper_changed)
             self._wallpaper_monitor = monitor
 
-    def _download_and_set_artwork(self, arturl):
-        """
-        Download the artwork from the given URL asynchronously and update the cover image
-        using GLib.idle_add to ensure UI updates occur on the main thread.
-        """
-        try:
-            parsed = urllib.parse.urlparse(arturl)
-            suffix = os.path.splitext(parsed.path)[1] or ".png"
-            with urllib.request.urlopen(arturl) as response:
-                data = response.read()
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp_file.write(data)
-            temp_file.close()
-            local_arturl = temp_file.name
-        except Exception:
-            local_arturl = f"{data.HOME_DIR}/.current.wall"
-            if not WALL_EXIST:
-                local_arturl = get_relative_path("../assets/icons/player.png")
-        GLib.idle_add(self._set_cover_image, local_arturl)
-        return None
+    def _on_cover_loaded(self, url, pixbuf):
+        # The track may have changed while the cover was loading.
+        if url != self._cover_url:
+            return
+        if pixbuf is not None:
+            self.cover.set_image_from_pixbuf(pixbuf)
+        else:
+            self._set_cover_image(None)
 
     def update_play_pause_icon(self):
         if self.mpris_player.playback_status == "playing":
@@ -403,7 +440,7 @@ class PlayerBox(Box):
             and self.mpris_player.can_seek
             and "disabled" not in self.backward.get_style_context().list_classes()
         ):
-            new_pos = max(0, self.mpris_player.position - 5000000)
+            new_pos = max(0, self.mpris_player.current_position() - 5000000)
             self.mpris_player.position = new_pos
 
     def _on_forward_clicked(self, button):
@@ -413,7 +450,7 @@ class PlayerBox(Box):
             and self.mpris_player.can_seek
             and "disabled" not in self.forward.get_style_context().list_classes()
         ):
-            new_pos = self.mpris_player.position + 5000000
+            new_pos = self.mpris_player.current_position() + 5000000
             self.mpris_player.position = new_pos
 
     def _on_next_clicked(self, button):
@@ -429,10 +466,8 @@ class PlayerBox(Box):
                 self._progress_timer_id = None
             return False
 
-        try:
-            current = self.mpris_player.position
-        except Exception:
-            current = 0
+        # Estimated locally; the player is only asked on seeks and state changes.
+        current = self.mpris_player.current_position()
         try:
             total = int(self.mpris_player.length or 0)
         except Exception:
@@ -463,24 +498,13 @@ class PlayerBox(Box):
         self._apply_mpris_properties()
         return True
 
-    def _on_mpris_changed(self, *args):
-
-        if not hasattr(self, "_update_pending") or not self._update_pending:
-            self._update_pending = True
-
-            GLib.idle_add(self._apply_mpris_properties_debounced)
-
-    def _apply_mpris_properties_debounced(self):
-
+    def _on_mpris_changed(self, _, changes):
+        # MprisPlayer already batches one main loop iteration into `changes`.
         if self.mpris_player:
-            self._apply_mpris_properties()
-        else:
-
-            if self._progress_timer_id:
-                GLib.source_remove(self._progress_timer_id)
-                self._progress_timer_id = None
-        self._update_pending = False
-        return False
+            self._apply_mpris_properties(changes)
+        elif self._progress_timer_id:
+            GLib.source_remove(self._progress_timer_id)
+            self._progress_timer_id = None
 
 
 class Player(Box):
@@ -792,9 +816,9 @@ class PlayerSmall(CenterBox):
             self.mpris_player.play_pause()
             self.update_play_pause_icon()
 
-    def _on_mpris_changed(self, *args):
-
-        self._apply_mpris_properties()
+    def _on_mpris_changed(self, _, changes):
+        if changes & SMALL_CHANGES:
+            self._apply_mpris_properties()
 
     def on_player_appeared(self, manager, player):
 
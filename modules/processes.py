@@ -0,0 +1,186 @@
+import threading
+import time
+
+from fabric.widgets.box import Box
+from fabric.widgets.button import Button
+from fabric.widgets.centerbox import CenterBox
+from fabric.widgets.label import Label
+from fabric.widgets.scale import Scale
+from gi.repository import GLib
+
+import modules.icons as icons
+from services.metrics import MetricsService
+from utils.procfs import ProcessSampler
+
+TOP_COUNT = 6
+SAMPLE_INTERVAL = 2.0
+# Back off so that sampling never takes more than ~5% of the wall time on
+# machines with thousands of processes.
+MAX_SAMPLER_SHARE = 0.05
+
+
+def format_bytes(value: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+class ProcessRow(Box):
+    def __init__(self, **kwargs):
+        super().__init__(name="process-row", spacing=8, **kwargs)
+        self.name_label = Label(
+            name="process-name", h_expand=True, h_align="start", ellipsization="end"
+        )
+        self.value_label = Label(name="process-value", h_align="end")
+        self.add(self.name_label)
+        self.add(self.value_label)
+
+    def bind(self, name: str, value: str, tooltip: str):
+        self.name_label.set_label(name)
+        self.value_label.set_label(value)
+        self.set_tooltip_text(tooltip)
+        self.set_visible(True)
+
+
+class ProcessesPanel(Box):
+    """
+    Per-core CPU bars and the top processes by CPU and memory.
+
+    Per-core values come from the shared metrics sampler. The process lists
+    are fed by a `ProcessSampler` running in a worker thread that only
+    exists while the panel is mapped. Rows are created once and rebound on
+    every sample.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            name="processes",
+            orientation="vertical",
+            spacing=4,
+            **kwargs,
+        )
+        self.widgets = kwargs.get("widgets")
+
+        self.back_button = Button(
+            name="processes-back",
+            child=Label(name="processes-back-label", markup=icons.chevron_left),
+            on_clicked=lambda *_: self.widgets.show_notif(),
+        )
+        header_box = CenterBox(
+            name="processes-header",
+            start_children=[self.back_button],
+            center_children=[Label(name="processes-title", label="Processes")],
+        )
+
+        self.metrics_service = MetricsService.get_initial()
+        self.core_scales = [
+            self._make_core_scale(i) for i in range(self.metrics_service.cpu_cores)
+        ]
+        self.cores_box = Box(
+            name="processes-cores",
+            spacing=2,
+            h_expand=True,
+            children=self.core_scales,
+        )
+
+        self.cpu_rows = [ProcessRow() for _ in range(TOP_COUNT)]
+        self.mem_rows = [ProcessRow() for _ in range(TOP_COUNT)]
+        lists_box = Box(
+            spacing=8,
+            h_expand=True,
+            v_expand=True,
+            children=[
+                Box(
+                    name="processes-list",
+                    orientation="v",
+                    h_expand=True,
+                    children=[Label(name="processes-list-title", label="CPU")]
+                    + self.cpu_rows,
+                ),
+                Box(
+                    name="processes-list",
+                    orientation="v",
+                    h_expand=True,
+                    children=[Label(name="processes-list-title", label="Memory")]
+                    + self.mem_rows,
+                ),
+            ],
+        )
+
+        self.add(header_box)
+        self.add(self.cores_box)
+        self.add(lists_box)
+
+        self._sampler = ProcessSampler()
+        self._sampler_lock = threading.Lock()
+        self._stop_event = None
+
+        sampled_id = self.metrics_service.connect("sampled", self.on_sampled)
+        self.connect("destroy", lambda *_: self.metrics_service.disconnect(sampled_id))
+        self.metrics_service.subscribe(self, ["cpu"])
+        self.connect("map", lambda *_: self.start_sampling())
+        self.connect("unmap", lambda *_: self.stop_sampling())
+
+    @staticmethod
+    def _make_core_scale(core: int) -> Scale:
+        scale = Scale(
+            name="processes-core",
+            value=0,
+            orientation="v",
+            inverted=True,
+            v_align="fill",
+            h_expand=True,
+            tooltip_text=f"Core {core}",
+        )
+        scale.set_sensitive(False)
+        return scale
+
+    def on_sampled(self, _, sample):
+        if "cores" not in sample or not self.get_mapped():
+            return
+        for i, value in enumerate(sample["cores"][: len(self.core_scales)]):
+            self.core_scales[i].value = value / 100.0
+            self.core_scales[i].set_tooltip_text(f"Core {i}: {value:.0f}%")
+
+    def start_sampling(self):
+        if self._stop_event is not None:
+            return
+        self._stop_event = threading.Event()
+        threading.Thread(
+            target=self._sample_loop,
+            args=(self._stop_event,),
+            name="process-sampler",
+            daemon=True,
+        ).start()
+
+    def stop_sampling(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+
+    def _sample_loop(self, stop: threading.Event):
+        while not stop.is_set():
+            started = time.monotonic()
+            with self._sampler_lock:
+                primed = self._sampler.primed
+                top_cpu, top_rss = self._sampler.sample(TOP_COUNT)
+            cost = time.monotonic() - started
+            if primed:
+                GLib.idle_add(self._apply, top_cpu, top_rss)
+            # The first sample only seeds the jiffy deltas.
+            delay = max(SAMPLE_INTERVAL, cost / MAX_SAMPLER_SHARE) if primed else 0.5
+            stop.wait(delay)
+        # Deltas across the time the panel was closed would be meaningless.
+        with self._sampler_lock:
+            self._sampler.reset()
+
+    def _apply(self, top_cpu, top_rss):
+        for row, info in zip(self.cpu_rows, top_cpu):
+            row.bind(info.name, f"{info.cpu:.0f}%", f"PID {info.pid}")
+        for row, info in zip(self.mem_rows, top_rss):
+            row.bind(info.name, format_bytes(info.rss), f"PID {info.pid}")
+        for row in self.cpu_rows[len(top_cpu) :] + self.mem_rows[len(top_rss) :]:
+            row.set_visible(False)
+        return False
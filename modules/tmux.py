@@ -1,7 +1,6 @@
-import os
-import subprocess
+import time
 
-from fabric.utils import exec_shell_command_async, idle_add, remove_handler
+from fabric.utils import exec_shell_command_async, remove_handler
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
@@ -9,8 +8,8 @@ from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
 from gi.repository import Gdk, GLib, Gtk
 
-import config.data as data
 import modules.icons as icons
+from services.tmux import Tmux, TmuxSession, terminal_template
 
 
 class TmuxManager(Box):
@@ -26,6 +25,15 @@ class TmuxManager(Box):
         self.selected_index = -1  # Track the selected item index
 
         self._arranger_handler: int = 0
+        # Slot whose inline rename entry is open, and whether a session
+        # change arrived meanwhile.
+        self._renaming = None
+        self._refresh_pending = False
+
+        # Sessions are kept current by the control-mode client, so opening
+        # the manager only renders what is already in memory.
+        self.service = Tmux.get_initial()
+        self.service.connect("changed", self.on_sessions_changed)
 
         self.viewport = Box(name="viewport", spacing=4, orientation="v")
         self.session_name_entry = Entry(
@@ -86,6 +94,8 @@ class TmuxManager(Box):
 
     def close_manager(self):
         """Close the tmux manager"""
+        self._renaming = None
+        self._refresh_pending = False
         self.viewport.children = []
         self.selected_index = -1  # Reset selection
         self.notch.close_notch()
@@ -93,6 +103,11 @@ class TmuxManager(Box):
     def open_manager(self):
         """Open the tmux manager and refresh sessions"""
         self.refresh_sessions()
+        # Activity is not notified, so ask for a fresh list in the background.
+        if self.service.connected:
+            self.service.refresh()
+        else:
+            self.service.connect_client()
         self.session_name_entry.set_text("")
         self.session_name_entry.grab_focus()
 
@@ -102,8 +117,7 @@ class TmuxManager(Box):
         self.viewport.children = []
         self.selected_index = -1  # Clear selection when viewport changes
 
-        # Get tmux sessions
-        sessions = self.get_tmux_sessions()
+        sessions = self.service.sessions
         if not sessions:
             # Create a container box to better center the message
             container = Box(
@@ -134,21 +148,33 @@ class TmuxManager(Box):
 
     def get_tmux_sessions(self):
         """Get list of tmux sessions"""
-        try:
-            result = subprocess.run(
-                ["tmux", "list-sessions", "-F", "#{session_name}"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                return [s.strip() for s in result.stdout.strip().split('\n') if s.strip()]
-            return []
-        except Exception as e:
-            print(f"Error getting tmux sessions: {e}")
-            return []
+        return self.service.session_names()
 
-    def create_session_slot(self, session_name):
+    def on_sessions_changed(self, *_):
+        """Re-render the session list if the manager is on screen"""
+        if not self.get_mapped():
+            return
+        if self._renaming is not None:
+            # Rebuilding would destroy the entry being typed in; catch up
+            # once the rename ends.
+            self._refresh_pending = True
+            return
+
+        # Keep keyboard focus on the same session across the rebuild.
+        focused = self.get_toplevel().get_focus()
+        focused_session = getattr(focused, "session_name", None)
+        self.refresh_sessions()
+        if focused_session is not None:
+            for button in self.viewport.get_children():
+                if getattr(button, "session_name", None) == focused_session:
+                    button.grab_focus()
+                    break
+
+    def create_session_slot(self, session: TmuxSession):
         """Create a button for a tmux session"""
+        session_name = session.name
+        windows = f"{session.windows} window{'s' if session.windows != 1 else ''}"
+        last_active = time.strftime("%H:%M", time.localtime(session.activity))
         # Create an entry for inline editing (initially hidden)
         name_entry = Entry(
             name="session-name-entry",
@@ -185,7 +211,7 @@ class TmuxManager(Box):
         button = Button(
             name="slot-button",  # reuse existing CSS styling
             child=slot_box,
-            tooltip_text=f"Attach to session: {session_name}",
+            tooltip_text=f"Attach to session: {session_name}\n{windows}, last active {last_active}",
             on_clicked=lambda *_: self.attach_to_session(session_name),
             can_focus=True,  # Ensure the button can receive focus
         )
@@ -245,6 +271,7 @@ class TmuxManager(Box):
         
         # Mark button as being edited
         button.get_style_context().add_class("editing")
+        self._renaming = button
 
     def finish_rename(self, button, old_name, entry):
         """Finish renaming a session"""
@@ -268,6 +295,11 @@ class TmuxManager(Box):
         
         # Return focus to session name entry
         self.session_name_entry.grab_focus()
+
+        self._renaming = None
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.on_sessions_changed()
     
     def on_rename_key_press(self, entry, event):
         """Handle key presses in the rename entry"""
@@ -359,31 +391,25 @@ class TmuxManager(Box):
                 
             session_name = str(counter)
             
-        try:
-            # Clean the session name (replace spaces with underscores)
-            clean_name = session_name.strip().replace(" ", "_")
-            
-            # Create session
-            subprocess.run(
-                ["tmux", "new-session", "-d", "-s", clean_name],
-                check=True
-            )
-            
-            # Refresh the session list
-            self.refresh_sessions()
-            
-            # Clear entry
-            self.session_name_entry.set_text("")
-            
+        # Clean the session name (replace spaces with underscores)
+        clean_name = session_name.strip().replace(" ", "_")
+
+        def on_created(ok):
+            if not ok:
+                print(f"Error creating tmux session: {clean_name}")
+                return
             # Launch a terminal and attach to this session
             terminal_cmd = self.get_terminal_command(f"tmux attach-session -t {clean_name}")
             exec_shell_command_async(terminal_cmd)
-            
-            # Close manager
-            self.close_manager()
-            
-        except Exception as e:
-            print(f"Error creating tmux session: {e}")
+
+        # Create session; the list updates from tmux notifications
+        self.service.new_session(clean_name, on_created)
+        
+        # Clear entry
+        self.session_name_entry.set_text("")
+        
+        # Close manager
+        self.close_manager()
 
     def attach_to_session(self, session_name):
         """Attach to an existing tmux session"""
@@ -397,39 +423,8 @@ class TmuxManager(Box):
 
     def get_terminal_command(self, cmd):
         """Get terminal command based on configured terminal or available terminals"""
-        # First try to use the configured terminal command
-        if hasattr(data, 'TERMINAL_COMMAND') and data.TERMINAL_COMMAND:
-            parts = data.TERMINAL_COMMAND.split()
-            terminal = parts[0]
-            
-            try:
-                # Check if the configured terminal is available
-                subprocess.run(["which", terminal], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                return f"{data.TERMINAL_COMMAND} {cmd}"
-            except subprocess.CalledProcessError:
-                # If configured terminal is not available, fall back to defaults
-                pass
-                
-        # Fallback to checking available terminals
-        terminals = [
-            ("kitty", f"kitty -e {cmd}"),
-            ("alacritty", f"alacritty -e {cmd}"),
-            ("foot", f"foot {cmd}"),
-            ("gnome-terminal", f"gnome-terminal -- {cmd}"),
-            ("konsole", f"konsole -e {cmd}"),
-            ("xfce4-terminal", f"xfce4-terminal -e '{cmd}'"),
-        ]
-        
-        for term, term_cmd in terminals:
-            try:
-                # Check if terminal is available
-                subprocess.run(["which", term], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                return term_cmd
-            except subprocess.CalledProcessError:
-                continue
-                
-        # Default fallback
-        return f"kitty -e {cmd}"
+        # The terminal is detected once and cached by the tmux service
+        return terminal_template().format(cmd=cmd)
 
     def rename_session_dialog(self, old_name):
         """Show dialog to rename a session"""
@@ -463,39 +458,18 @@ class TmuxManager(Box):
 
     def rename_session(self, old_name, new_name):
         """Rename a tmux session"""
-        try:
-            # Clean the session name (replace spaces with underscores)
-            clean_name = new_name.strip().replace(" ", "_")
-            
-            # Rename session
-            subprocess.run(
-                ["tmux", "rename-session", "-t", old_name, clean_name],
-                check=True
-            )
-            
-            # Refresh the session list
-            self.refresh_sessions()
-            
-        except Exception as e:
-            print(f"Error renaming tmux session: {e}")
+        # Clean the session name (replace spaces with underscores)
+        clean_name = new_name.strip().replace(" ", "_")
+        
+        # Rename session; the slot label follows %session-renamed
+        self.service.rename_session(old_name, clean_name)
 
     def kill_session(self, session_name):
         """Kill a tmux session"""
-        try:
-            # Kill session
-            subprocess.run(
-                ["tmux", "kill-session", "-t", session_name],
-                check=True
-            )
-            
-            # Refresh the session list
-            self.refresh_sessions()
-            
-            # Close the notch after killing session
-            self.close_manager()
-            
-        except Exception as e:
-            print(f"Error killing tmux session: {e}")
+        self.service.kill_session(session_name)
+        
+        # Close the notch after killing session
+        self.close_manager()
 
     # Add new method to handle key presses on session slots
     def on_slot_key_press(self, button, event, session_name, label, entry):
@@ -1,14 +1,13 @@
 import json
 import os
 import shutil
-import socket
-import subprocess
 import sys
 import threading
 import time
 from pathlib import Path
 from loguru import logger
 import gi
+import requests
 
 # Insertion for embedded VTE terminal
 gi.require_version("Gtk", "3.0")
@@ -20,16 +19,23 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from fabric.utils.helpers import get_relative_path
 
 import config.data as data
+from services.network import NetworkClient
 
 # File locations
 VERSION_FILE = get_relative_path("../version.json")
-REMOTE_VERSION_FILE = "/tmp/remote_version.json"
-REMOTE_URL = "https://raw.githubusercontent.com/fram446742/hyprfabricated/refs/heads/main/utils/version.json"
+REMOTE_VERSION_FILE = os.path.join(data.CACHE_DIR, "remote_version.json")
+REMOTE_VERSION_META_FILE = os.path.join(data.CACHE_DIR, "remote_version.meta.json")
+REMOTE_URL = data.UPDATER_URL
 REPO_DIR = get_relative_path("../")
 
 SNOOZE_FILE_NAME = "updater_snooze.txt"
 UPDATER_DISABLE_FILE_NAME = "updater_disabled.flag"
 SNOOZE_DURATION_SECONDS = 8 * 60 * 60  # 8 hours
+CHECK_INTERVAL_SECONDS = 60 * 60  # 1 hour
+REQUEST_TIMEOUT_SECONDS = 15
+
+# Reused across checks so the connection to the update host is kept alive.
+_session = requests.Session()
 
 # --- Global state for standalone execution control ---
 _QUIT_GTK_IF_NO_WINDOW_STANDALONE = False
@@ -61,28 +67,87 @@ def get_disable_file_path():
 
 def fetch_remote_version():
     """
-    Downloads the remote version JSON using curl, with timeout and error handling.
+    Refreshes REMOTE_VERSION_FILE from REMOTE_URL with a conditional request,
+    so an unchanged version.json costs a 304 instead of a download.
+    Returns True if a remote version file is available afterwards.
     """
+    meta = {}
+    if os.path.exists(REMOTE_VERSION_FILE):
+        try:
+            with open(REMOTE_VERSION_META_FILE, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        # Validators only apply to the URL they were issued for.
+        if meta.get("url") != REMOTE_URL:
+            meta = {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
     try:
-        subprocess.run(
-            [
-                "curl",
-                "-sL",
-                "--connect-timeout",
-                "10",
-                REMOTE_URL,
-                "-o",
-                REMOTE_VERSION_FILE,
-            ],
-            check=False,
-            timeout=15,
+        response = _session.get(
+            REMOTE_URL, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS
         )
-    except subprocess.TimeoutExpired:
-        logger.error("curl timed out while fetching the remote version.")
-    except FileNotFoundError:
-        logger.error("curl not found. Please install curl.")
-    except Exception as e:
+        if response.status_code == 304:
+            logger.info("Remote version unchanged.")
+            return True
+        response.raise_for_status()
+        response.json()  # Reject error pages before they replace the cache
+    except (requests.RequestException, ValueError) as e:
         logger.error(f"Error fetching remote version: {e}")
+        return os.path.exists(REMOTE_VERSION_FILE)
+
+    try:
+        get_cache_dir()
+        tmp = f"{REMOTE_VERSION_FILE}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, REMOTE_VERSION_FILE)
+        with open(REMOTE_VERSION_META_FILE, "w") as f:
+            json.dump(
+                {
+                    "url": REMOTE_URL,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+                f,
+            )
+    except OSError as e:
+        logger.error(f"Error saving remote version: {e}")
+        return False
+    return True
+
+
+def snooze_remaining():
+    """
+    Returns the seconds left on the 'Later' snooze, or 0 if it is not active.
+    Expired or corrupt snooze files are removed.
+    """
+    snooze_file_path = get_snooze_file_path()
+    if not os.path.exists(snooze_file_path):
+        return 0
+    try:
+        with open(snooze_file_path, "r") as f:
+            snooze_timestamp = float(f.read().strip())
+        remaining = snooze_timestamp + SNOOZE_DURATION_SECONDS - time.time()
+        if remaining > 0:
+            return remaining
+        logger.info("Snooze period expired. Removing file and checking for updates.")
+    except ValueError:
+        logger.error(f"Invalid content in snooze file. Removing: {snooze_file_path}")
+    except Exception as e_snooze:
+        logger.error(
+            f"Error processing snooze file {snooze_file_path}: {e_snooze}. Proceeding with check."
+        )
+    try:
+        os.remove(snooze_file_path)
+    except OSError as e_remove:
+        logger.error(f"Error removing snooze file: {e_remove}")
+    return 0
 
 
 def get_local_version():
@@ -130,27 +195,17 @@ def get_remote_version():
 
 def update_local_version_file():
     """
-    Replaces the local version with the remote one by moving the downloaded JSON to the local version file.
+    Replaces the local version with the remote one by copying the downloaded JSON to the local version file.
+    The download is kept so the next check can still revalidate it.
     """
     if os.path.exists(REMOTE_VERSION_FILE):
         try:
-            shutil.move(REMOTE_VERSION_FILE, VERSION_FILE)
+            shutil.copyfile(REMOTE_VERSION_FILE, VERSION_FILE)
         except Exception as e:
             logger.error(f"Error updating local version file: {e}")
             raise
 
 
-def is_connected():
-    """
-    Checks basic connectivity by attempting to connect to www.google.com:80.
-    """
-    try:
-        socket.create_connection(("www.google.com", 80), timeout=5)
-        return True
-    except OSError:
-        return False
-
-
 class UpdateWindow(Gtk.Window):
     def __init__(self, latest_version, changelog, pkg_update, is_standalone_mode=False):
         super().__init__(name="update-window", title=f"{data.APP_NAME_CAP} Updater")
@@ -482,7 +537,7 @@ def _initiate_update_check_flow(
     is_standalone_mode, force=False
 ):  # Added force argument with default
     """
-    Logic that checks connection, snooze, and downloads the remote version.
+    Logic that checks snooze and downloads the remote version.
     If there's a new version or force is True, launches the update window.
     """
     global _QUIT_GTK_IF_NO_WINDOW_STANDALONE
@@ -497,12 +552,8 @@ def _initiate_update_check_flow(
             GLib.idle_add(Gtk.main_quit)
         return
 
-    if not is_connected():
-        logger.info("No internet connection. Skipping update check.")
-        if is_standalone_mode and _QUIT_GTK_IF_NO_WINDOW_STANDALONE:
-            GLib.idle_add(Gtk.main_quit)
-        return
-
+    # A failed fetch doubles as the connectivity check here; the periodic
+    # UpdateChecker asks NetworkManager before getting this far.
     fetch_remote_version()
     latest_version, changelog, _, pkg_update = get_remote_version()  # Unpack pkg_update
 
@@ -515,62 +566,32 @@ def _initiate_update_check_flow(
                 f"Warning: Could not fetch remote version details for {data.APP_NAME_CAP}. Updater will show default/empty info."
             )
         GLib.idle_add(
-            launch_update_window(
-                latest_version, changelog, pkg_update, is_standalone_mode
-            )
+            launch_update_window,
+            latest_version,
+            changelog,
+            pkg_update,
+            is_standalone_mode,
         )
         return  # Exit after launching in force mode
 
     # --- Regular update check flow (if not forced) ---
-    snooze_file_path = get_snooze_file_path()
-    if os.path.exists(snooze_file_path):
-        try:
-            with open(snooze_file_path, "r") as f:
-                snooze_timestamp_str = f.read().strip()
-                snooze_timestamp = float(snooze_timestamp_str)
-
-            current_time = time.time()
-            if current_time - snooze_timestamp < SNOOZE_DURATION_SECONDS:
-                snooze_until_time = snooze_timestamp + SNOOZE_DURATION_SECONDS
-                snooze_until_time_str = time.strftime(
-                    "%Y-%m-%d %H:%M:%S", time.localtime(snooze_until_time)
-                )
-                logger.info(
-                    f"Check postponed. It will resume after {snooze_until_time_str}."
-                )
-                if is_standalone_mode and _QUIT_GTK_IF_NO_WINDOW_STANDALONE:
-                    GLib.idle_add(Gtk.main_quit)
-                return
-            else:
-                logger.info(
-                    "Snooze period expired. Removing file and checking for updates."
-                )
-                os.remove(snooze_file_path)
-        except ValueError:
-            logger.error(
-                f"Invalid content in snooze file. Removing: {snooze_file_path}"
-            )
-            try:
-                os.remove(snooze_file_path)
-            except OSError as e_remove:
-                logger.error(f"Error removing corrupt snooze file: {e_remove}")
-        except Exception as e_snooze:
-            logger.error(
-                f"Error processing snooze file {snooze_file_path}: {e_snooze}. Proceeding with check."
-            )
-            try:
-                os.remove(snooze_file_path)  # Attempt to remove problematic snooze file
-            except OSError as e_remove_generic:
-                logger.error(
-                    f"Error removing problematic snooze file: {e_remove_generic}"
-                )
-
-    current_version, _ = get_local_version()
+    remaining = snooze_remaining()
+    if remaining > 0:
+        snooze_until_time_str = time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.localtime(time.time() + remaining)
+        )
+        logger.info(f"Check postponed. It will resume after {snooze_until_time_str}.")
+        if is_standalone_mode and _QUIT_GTK_IF_NO_WINDOW_STANDALONE:
+            GLib.idle_add(Gtk.main_quit)
+        return
 
-    # Basic version comparison (not strict semver)
-    if latest_version > current_version and latest_version != "0.0.0":
+    if is_update_available(latest_version):
         GLib.idle_add(
-            launch_update_window, latest_version, changelog, is_standalone_mode
+            launch_update_window,
+            latest_version,
+            changelog,
+            pkg_update,
+            is_standalone_mode,
         )
     else:
         logger.info(
@@ -580,6 +601,15 @@ def _initiate_update_check_flow(
             GLib.idle_add(Gtk.main_quit)
 
 
+def is_update_available(latest_version):
+    """
+    Compares the remote version against the local one.
+    """
+    current_version, _ = get_local_version()
+    # Basic version comparison (not strict semver)
+    return latest_version > current_version and latest_version != "0.0.0"
+
+
 def launch_update_window(latest_version, changelog, pkg_update, is_standalone_mode):
     """
     Creates and shows the update window.
@@ -590,6 +620,7 @@ def launch_update_window(latest_version, changelog, pkg_update, is_standalone_mo
     if is_standalone_mode:
         win.quit_gtk_main_on_destroy = True
     win.show_all()
+    return win
 
 
 def check_for_updates():
@@ -605,6 +636,83 @@ def check_for_updates():
     thread.start()
 
 
+class UpdateChecker:
+    """
+    Periodic update check for the running shell.
+
+    Checks are timed on the GLib main loop: a snoozed check is rescheduled for
+    the end of the snooze, and while NetworkManager reports no connectivity
+    the check waits for it to come back instead of probing the network.
+    Only the HTTP request runs in a worker thread.
+    """
+
+    def __init__(self, interval=CHECK_INTERVAL_SECONDS):
+        self.interval = interval
+        self.network = NetworkClient()
+        self.network.connect("notify::online", self._on_online_changed)
+        self._timer_id = None
+        self._checking = False
+        self._waiting_for_network = False
+        self._window = None
+
+    def start(self):
+        self._schedule(0)
+
+    def _schedule(self, delay):
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add_seconds(int(max(1, delay)), self._on_timer)
+
+    def _on_timer(self):
+        self._timer_id = None
+        self.check()
+        return False
+
+    def _on_online_changed(self, *args):
+        if self._waiting_for_network and self.network.online:
+            self._waiting_for_network = False
+            self.check()
+
+    def check(self):
+        if self._checking:
+            return
+        if os.path.exists(get_disable_file_path()):
+            self._schedule(self.interval)
+            return
+        remaining = snooze_remaining()
+        if remaining > 0:
+            self._schedule(remaining)
+            return
+        if not self.network.online:
+            logger.info("No internet connection. Waiting for it before checking.")
+            self._waiting_for_network = True
+            return
+        self._checking = True
+        threading.Thread(target=self._fetch, daemon=True).start()
+
+    def _fetch(self):
+        available = fetch_remote_version()
+        GLib.idle_add(self._on_fetched, available)
+
+    def _on_fetched(self, available):
+        self._checking = False
+        self._schedule(self.interval)
+        if not available:
+            return False
+        latest_version, changelog, _, pkg_update = get_remote_version()
+        if not is_update_available(latest_version):
+            logger.info(f"{data.APP_NAME_CAP} is up to date.")
+        elif self._window is None:
+            self._window = launch_update_window(
+                latest_version, changelog, pkg_update, False
+            )
+            self._window.connect("destroy", self._on_window_destroyed)
+        return False
+
+    def _on_window_destroyed(self, *args):
+        self._window = None
+
+
 def run_updater(force=False):  # Modified to accept force argument
     """
     Standalone entry point: starts Gtk.main and the update check.
@@ -6,6 +6,7 @@ from fabric.widgets.label import Label
 from fabric.widgets.stack import Stack
 
 import config.data as data
+from modules.agenda import Agenda
 from modules.bluetooth import BluetoothConnections
 from modules.buttons import Buttons
 from modules.calendar_module import Calendar
@@ -14,6 +15,7 @@ from modules.metrics import Metrics
 from modules.network import NetworkConnections
 from modules.notifications import NotificationHistory
 from modules.player import Player
+from modules.processes import ProcessesPanel
 
 
 class Widgets(Box):
@@ -37,7 +39,7 @@ class Widgets(Box):
 
         calendar_view_mode = "week" if vertical_layout else "month"
 
-        self.calendar = Calendar(view_mode=calendar_view_mode)
+        self.calendar = Calendar(view_mode=calendar_view_mode, widgets=self)
 
         self.notch = kwargs["notch"]
 
@@ -71,6 +73,10 @@ class Widgets(Box):
 
         self.network_connections = NetworkConnections(widgets=self)
 
+        self.processes = ProcessesPanel(widgets=self)
+
+        self.agenda = Agenda(widgets=self)
+
         self.applet_stack = Stack(
             h_expand=True,
             v_expand=True,
@@ -79,6 +85,8 @@ class Widgets(Box):
                 self.notification_history,
                 self.network_connections,
                 self.bluetooth,
+                self.processes,
+                self.agenda,
             ],
         )
 
@@ -162,5 +170,12 @@ class Widgets(Box):
     def show_notif(self):
         self.applet_stack.set_visible_child(self.notification_history)
 
+    def show_agenda(self, day=None):
+        self.agenda.show_from(day)
+        self.applet_stack.set_visible_child(self.agenda)
+
     def show_network_applet(self):
         self.notch.open_notch("network_applet")
+
+    def show_processes(self):
+        self.notch.open_notch("processes")
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for one bar metrics sample.
+
+Compares the psutil calls the old `MetricsProvider._update` made every second
+(cpu_percent, virtual_memory, disk_usage per configured disk, plus the
+separate net_io_counters repeater) with the /proc readers in `utils.procfs`.
+
+Usage: python scripts/metrics_bench.py [iterations] [disk ...]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.procfs import CpuStat, MemInfo, NetDev, disk_percent  # noqa: E402
+
+
+def bench_psutil(iterations, disks):
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    def sample():
+        psutil.cpu_percent(interval=0)
+        psutil.virtual_memory().percent
+        [psutil.disk_usage(path).percent for path in disks]
+        psutil.net_io_counters()
+
+    return timeit.timeit(sample, number=iterations)
+
+
+def bench_procfs(iterations, disks, disk_every):
+    cpu, mem, net = CpuStat(), MemInfo(), NetDev()
+    tick = [0]
+
+    def sample():
+        cpu.update()
+        mem.update()
+        net.update()
+        # Disk usage runs on its own slower schedule in MetricsService.
+        if tick[0] % disk_every == 0:
+            [disk_percent(path) for path in disks]
+        tick[0] += 1
+
+    return timeit.timeit(sample, number=iterations)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    disks = sys.argv[2:] or ["/"]
+
+    results = {
+        "psutil (legacy _update)": bench_psutil(iterations, disks),
+        "procfs, disk every tick": bench_procfs(iterations, disks, 1),
+        "procfs, disk every 30 ticks": bench_procfs(iterations, disks, 30),
+    }
+    for name, total in results.items():
+        if total is None:
+            print(f"{name:<30} skipped (psutil not installed)")
+        else:
+            print(f"{name:<30} {total / iterations * 1e6:8.1f} us/sample")
+
+
+if __name__ == "__main__":
+    main()
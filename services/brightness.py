@@ -2,12 +2,18 @@ import os
 
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import exec_shell_command_async, monitor_file
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 from loguru import logger
 
 import utils.functions as helpers
 from utils.colors import Colors
 
+BACKLIGHT_DIR = "/sys/class/backlight"
+# Writes are coalesced to at most one per frame at 60 Hz.
+FRAME_INTERVAL_MS = 16
+# Kernel preference when several interfaces drive the same panel.
+BACKLIGHT_TYPE_ORDER = {"firmware": 0, "platform": 1, "raw": 2}
+
 
 def exec_brightnessctl_async(args: str):
     if not helpers.executable_exists("brightnessctl"):
@@ -16,15 +22,45 @@ def exec_brightnessctl_async(args: str):
     exec_shell_command_async(f"brightnessctl {args}", lambda _: None)
 
 
-# Discover screen backlight device
-try:
-    screen_device = os.listdir("/sys/class/backlight")
-    screen_device = screen_device[0] if screen_device else ""
-except FileNotFoundError:
-    logger.error(
-        f"{Colors.ERROR}No backlight devices found, brightness control disabled"
-    )
-    screen_device = ""
+def read_int(path: str, default: int = -1) -> int:
+    try:
+        with open(path) as f:
+            return int(f.readline())
+    except (OSError, ValueError):
+        return default
+
+
+class BacklightDevice:
+    """A /sys/class/backlight entry with its cached brightness."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = os.path.join(BACKLIGHT_DIR, name)
+        self.brightness_path = os.path.join(self.path, "brightness")
+        self.max_brightness = read_int(os.path.join(self.path, "max_brightness"))
+        self.brightness = read_int(self.brightness_path)
+        self.writable = os.access(self.brightness_path, os.W_OK)
+        try:
+            with open(os.path.join(self.path, "type")) as f:
+                self.type = f.read().strip()
+        except OSError:
+            self.type = ""
+
+
+def discover_backlight_devices() -> list[BacklightDevice]:
+    """All backlight devices, the preferred one (by kernel type) first."""
+    try:
+        names = sorted(os.listdir(BACKLIGHT_DIR))
+    except FileNotFoundError:
+        names = []
+    devices = [BacklightDevice(name) for name in names]
+    devices = [device for device in devices if device.max_brightness > 0]
+    devices.sort(key=lambda device: BACKLIGHT_TYPE_ORDER.get(device.type, 3))
+    if not devices:
+        logger.error(
+            f"{Colors.ERROR}No backlight devices found, brightness control disabled"
+        )
+    return devices
 
 
 class Brightness(Service):
@@ -47,65 +83,132 @@ class Brightness(Service):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # Path for screen backlight control
-        self.screen_backlight_path = f"/sys/class/backlight/{screen_device}"
+        # Every panel follows the primary device; values are in its units.
+        self.devices = discover_backlight_devices()
+        self.primary = self.devices[0] if self.devices else None
+        self.max_screen = self.primary.max_brightness if self.primary else -1
 
-        # Initialize maximum brightness level
-        self.max_screen = self.do_read_max_brightness(self.screen_backlight_path)
+        self._pending_value = None
+        self._flush_source_id = None
+        self._writes_in_flight = 0
+        self._system_bus = None
 
-        if screen_device == "":
+        if self.primary is None:
             return
 
-        # Monitor screen brightness file
-        self.screen_monitor = monitor_file(f"{self.screen_backlight_path}/brightness")
-
-        self.screen_monitor.connect(
-            "changed",
-            lambda _, file, *args: self.emit(
-                "screen",
-                round(int(file.load_bytes()[0].get_data())),
-            ),
-        )
+        # Monitor the primary brightness file to keep the cached value fresh.
+        self.screen_monitor = monitor_file(self.primary.brightness_path)
+        self.screen_monitor.connect("changed", self.on_brightness_file_changed)
 
         # Log the initialization of the service
         logger.info(
-            f"{Colors.INFO}Brightness service initialized for device: {screen_device}"
+            f"{Colors.INFO}Brightness service initialized for devices: "
+            f"{', '.join(device.name for device in self.devices)}"
         )
 
-    def do_read_max_brightness(self, path: str) -> int:
-        # Reads the maximum brightness value from the specified path.
-        max_brightness_path = os.path.join(path, "max_brightness")
-        if os.path.exists(max_brightness_path):
-            with open(max_brightness_path) as f:
-                return int(f.readline())
-        return -1  # Return -1 if file doesn't exist, indicating an error.
+    def on_brightness_file_changed(self, _, file, *args):
+        # Ignore echoes of our own writes while newer values are queued,
+        # otherwise a dragged slider would jump back.
+        if self._pending_value is not None or self._writes_in_flight:
+            return
+        try:
+            value = int(file.load_bytes()[0].get_data())
+        except (GLib.Error, ValueError):
+            return
+        if value != self.primary.brightness:
+            self.primary.brightness = value
+            self.emit("screen", value)
 
     @Property(int, "read-write")
     def screen_brightness(self) -> int:
-        # Property to get or set the screen brightness.
-        brightness_path = os.path.join(self.screen_backlight_path, "brightness")
-        if os.path.exists(brightness_path):
-            with open(brightness_path) as f:
-                return int(f.readline())
-        logger.warning(
-            f"{Colors.WARNING}Brightness file does not exist: {brightness_path}"
-        )
-        return -1  # Return -1 if file doesn't exist, indicating error.
+        # Property to get or set the screen brightness, served from the cache.
+        if self.primary is None:
+            return -1  # -1 indicates that there is no backlight.
+        return self.primary.brightness
 
     @screen_brightness.setter
     def screen_brightness(self, value: int):
-        # Setter for screen brightness property.
-        if not (0 <= value <= self.max_screen):
-            value = max(0, min(value, self.max_screen))
+        # Setter for screen brightness property; the write is coalesced.
+        if self.primary is None:
+            return
+        value = max(0, min(int(round(value)), self.max_screen))
+        if value == self.primary.brightness and self._pending_value is None:
+            return
 
-        try:
-            exec_brightnessctl_async(f"--device '{screen_device}' set {value}")
-            self.emit("screen", int((value / self.max_screen) * 100))
-            logger.info(
-                f"{Colors.INFO}Set screen brightness to {value} "
-                f"(out of {self.max_screen})"
+        self.primary.brightness = value
+        self._pending_value = value
+        if self._flush_source_id is None:
+            self._flush_source_id = GLib.timeout_add(
+                FRAME_INTERVAL_MS, self._flush_brightness
             )
+        self.emit("screen", value)
+
+    def _flush_brightness(self):
+        # Wait for the previous logind calls so they cannot land out of order.
+        if self._writes_in_flight:
+            return True
+        self._flush_source_id = None
+        value = self._pending_value
+        self._pending_value = None
+        if value is None:
+            return False
+
+        for device in self.devices:
+            if device is self.primary:
+                device_value = value
+            else:
+                device_value = round(value * device.max_brightness / self.max_screen)
+            self._write_device(device, device_value)
+        logger.debug(
+            f"{Colors.INFO}Set screen brightness to {value} "
+            f"(out of {self.max_screen})"
+        )
+        return False
+
+    def _write_device(self, device: BacklightDevice, value: int):
+        device.brightness = value
+        if device.writable:
+            try:
+                with open(device.brightness_path, "w") as f:
+                    f.write(str(value))
+                return
+            except OSError as e:
+                logger.warning(
+                    f"{Colors.WARNING}Cannot write {device.brightness_path}: {e}"
+                )
+                device.writable = False
+
+        try:
+            if self._system_bus is None:
+                self._system_bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        except GLib.Error as e:
+            logger.error(f"{Colors.ERROR}Error connecting to logind: {e.message}")
+            exec_brightnessctl_async(f"--device '{device.name}' set {value}")
+            return
+
+        self._writes_in_flight += 1
+        self._system_bus.call(
+            "org.freedesktop.login1",
+            "/org/freedesktop/login1/session/auto",
+            "org.freedesktop.login1.Session",
+            "SetBrightness",
+            GLib.Variant("(ssu)", ("backlight", device.name, value)),
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+            self._on_set_brightness_done,
+            device,
+            value,
+        )
+
+    def _on_set_brightness_done(self, bus, result, device, value):
+        self._writes_in_flight -= 1
+        try:
+            bus.call_finish(result)
         except GLib.Error as e:
-            logger.error(f"{Colors.ERROR}Error setting screen brightness: {e.message}")
-        except Exception as e:
-            logger.exception(f"Unexpected error setting screen brightness: {e}")
\ No newline at end of file
+            logger.error(
+                f"{Colors.ERROR}Error setting screen brightness via logind: "
+                f"{e.message}"
+            )
+            exec_brightnessctl_async(f"--device '{device.name}' set {value}")
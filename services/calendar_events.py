@@ -0,0 +1,399 @@
+"""
+Calendar events from local iCalendar files and vdir collections.
+
+Sources (`data.CALENDAR_SOURCES`) are `.ics` files or directories of them,
+such as the collections vdirsyncer and khal keep under `~/.calendars`. A
+worker thread stats the sources and only parses files whose mtime or size
+changed. Parsed events are kept in an interval index (single events bucketed
+by week, recurring events as rules with the span they cover) that is saved
+to CACHE_DIR, so a restart only has to stat the files.
+
+Recurring events are expanded for the range a view asks for. Queries run on
+the same worker as the scans and answer on the main loop; recent answers
+are cached until the index changes.
+"""
+
+import marshal
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, NamedTuple
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+import config.data as data
+from utils.ical import Event, occurrences, overlaps, read_calendar
+
+INDEX_FORMAT = 1
+INDEX_FILE = os.path.join(data.CACHE_DIR, "calendar_index.marshal")
+BUCKET_SECONDS = 7 * 24 * 60 * 60
+# Single events covering more buckets than this are checked by every query
+# instead of being added to each bucket.
+MAX_EVENT_BUCKETS = 8
+RESCAN_DELAY_MS = 1000
+RESULT_CACHE_SIZE = 16
+
+
+class Occurrence(NamedTuple):
+    summary: str
+    location: str
+    calendar: str
+    all_day: bool
+    start: float
+    end: float
+
+
+def _zone_key() -> str:
+    """Identifies the local zone, which floating and all-day times depend on."""
+    return repr(
+        (
+            time.tzname,
+            time.timezone,
+            os.environ.get("TZ", ""),
+            os.path.realpath("/etc/localtime"),
+        )
+    )
+
+
+def _collection_name(directory: str) -> str:
+    try:
+        with open(os.path.join(directory, "displayname")) as f:
+            name = f.read().strip()
+    except OSError:
+        name = ""
+    return name or os.path.basename(directory.rstrip("/"))
+
+
+def discover(sources: list[str]) -> tuple[dict[str, tuple], list[str]]:
+    """
+    `.ics` files under `sources` as {path: (mtime_ns, size, collection)},
+    and the paths to watch. A source directory may hold `.ics` files itself
+    or one level of collection directories.
+    """
+    files = {}
+    watched = []
+    for source in sources:
+        source = os.path.expanduser(source)
+        try:
+            stat = os.stat(source)
+        except OSError:
+            continue
+        watched.append(source)
+        if not os.path.isdir(source):
+            files[source] = (stat.st_mtime_ns, stat.st_size, "")
+            continue
+
+        directories = [source]
+        try:
+            with os.scandir(source) as it:
+                directories += sorted(
+                    entry.path
+                    for entry in it
+                    if entry.is_dir() and not entry.name.startswith(".")
+                )
+        except OSError:
+            continue
+        watched += directories[1:]
+        for directory in directories:
+            name = _collection_name(directory)
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(".ics") and entry.is_file():
+                            stat = entry.stat()
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size, name)
+            except OSError:
+                continue
+    return files, watched
+
+
+class CalendarIndex:
+    """Parsed files and the interval index over their events."""
+
+    def __init__(self, files: dict | None = None):
+        # path -> (mtime_ns, size, calendar name, [Event])
+        self.files: dict[str, tuple] = files or {}
+        self.events: list[tuple[str, Event]] = []
+        # Starts of occurrences replaced by exceptions, by UID.
+        self.overrides: dict[str, set[float]] = {}
+        self.buckets: dict[int, list[int]] = {}
+        self.long: list[int] = []
+        self.recurring: list[int] = []
+        self._flatten()
+
+    def _flatten(self):
+        for path in sorted(self.files):
+            calendar = self.files[path][2]
+            for event in self.files[path][3]:
+                self.events.append((calendar, event))
+                if event.recurrence_id is not None:
+                    self.overrides.setdefault(event.uid, set()).add(event.recurrence_id)
+
+    def build(self):
+        self.buckets, self.long, self.recurring = {}, [], []
+        for event_id, (_, event) in enumerate(self.events):
+            if event.rule is not None:
+                self.recurring.append(event_id)
+                continue
+            if event.cancelled:
+                continue
+            first = int(event.start // BUCKET_SECONDS)
+            last = int(max(event.start, event.end - 1) // BUCKET_SECONDS)
+            if last - first >= MAX_EVENT_BUCKETS:
+                self.long.append(event_id)
+                continue
+            for bucket in range(first, last + 1):
+                self.buckets.setdefault(bucket, []).append(event_id)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> "CalendarIndex":
+        try:
+            with open(path, "rb") as f:
+                key, files, buckets, long, recurring = marshal.loads(f.read())
+            if key != (INDEX_FORMAT, _zone_key()):
+                return cls()
+            index = cls(
+                {
+                    file_path: (
+                        mtime,
+                        size,
+                        calendar,
+                        list(map(Event.from_record, records)),
+                    )
+                    for file_path, (mtime, size, calendar, records) in files.items()
+                }
+            )
+        except (OSError, ValueError, EOFError, TypeError):
+            return cls()
+        index.buckets, index.long, index.recurring = buckets, long, recurring
+        return index
+
+    def save(self, path: str = INDEX_FILE):
+        files = {
+            file_path: (mtime, size, calendar, [event.to_record() for event in events])
+            for file_path, (mtime, size, calendar, events) in self.files.items()
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(
+                    marshal.dumps(
+                        (
+                            (INDEX_FORMAT, _zone_key()),
+                            files,
+                            self.buckets,
+                            self.long,
+                            self.recurring,
+                        )
+                    )
+                )
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save calendar index: {e}")
+
+    def query(self, range_start: float, range_end: float) -> list[Occurrence]:
+        found = []
+        candidates = set(self.long)
+        for bucket in range(
+            int(range_start // BUCKET_SECONDS),
+            int((range_end - 1) // BUCKET_SECONDS) + 1,
+        ):
+            candidates.update(self.buckets.get(bucket, ()))
+        for event_id in candidates:
+            calendar, event = self.events[event_id]
+            if overlaps(event.start, event.end, range_start, range_end):
+                found.append(self._occurrence(calendar, event, event.start, event.end))
+
+        for event_id in self.recurring:
+            calendar, event = self.events[event_id]
+            if event.start >= range_end or (
+                event.end is not None and event.end <= range_start
+            ):
+                continue
+            replaced = self.overrides.get(event.uid, ())
+            for start, end in occurrences(event, range_start, range_end):
+                if start not in replaced:
+                    found.append(self._occurrence(calendar, event, start, end))
+
+        found.sort(key=lambda occurrence: (occurrence.start, not occurrence.all_day))
+        return found
+
+    @staticmethod
+    def _occurrence(calendar: str, event: Event, start: float, end: float):
+        return Occurrence(
+            event.summary, event.location, calendar, event.all_day, start, end
+        )
+
+
+class CalendarEvents(Service):
+    """Event occurrences by date range, from the configured calendar sources."""
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if CalendarEvents.instance is None:
+            CalendarEvents.instance = CalendarEvents()
+
+        return CalendarEvents.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Emitted when events were added, changed or removed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sources = list(data.CALENDAR_SOURCES)
+        # Only read and replaced on the worker.
+        self._index = CalendarIndex()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="calendar-events"
+        )
+        self._generation = 0
+        self._results = OrderedDict()
+        # Callbacks waiting on a query already in flight, by range.
+        self._pending = {}
+        self._monitors = {}
+        self._rescan_id = None
+
+        self._executor.submit(self._load_in_thread)
+        data.subscribe(("CALENDAR_SOURCES",), self._on_config_changed)
+
+    def query(
+        self, start: date, end: date, callback: Callable[[list[Occurrence]], None]
+    ):
+        """Calls `callback(occurrences)` on the main loop for [start, end)."""
+        key = (start, end)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            callback(result)
+            return
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+        self._pending[key] = [callback]
+        self._executor.submit(self._query_in_thread, key, self._generation)
+
+    def rescan(self):
+        """Re-reads the sources, parsing only files that changed."""
+        if self._rescan_id is not None:
+            GLib.source_remove(self._rescan_id)
+            self._rescan_id = None
+        self._executor.submit(self._scan_in_thread, list(self.sources))
+
+    # --- Worker ---
+
+    def _load_in_thread(self):
+        self._index = CalendarIndex.load()
+        GLib.idle_add(self._on_index_changed, True)
+
+    def _scan_in_thread(self, sources: list[str]):
+        started = time.monotonic()
+        found, watched = discover(sources)
+        GLib.idle_add(self._watch, watched)
+
+        previous = self._index.files
+        files = {}
+        parsed = 0
+        for path, (mtime, size, collection) in found.items():
+            entry = previous.get(path)
+            if entry is not None and entry[:2] == (mtime, size):
+                files[path] = entry
+                continue
+            try:
+                name, events = read_calendar(path)
+            except OSError as e:
+                logger.warning(f"Could not read calendar {path}: {e}")
+                continue
+            calendar = collection or name or os.path.splitext(os.path.basename(path))[0]
+            files[path] = (mtime, size, calendar, events)
+            parsed += 1
+
+        if not parsed and files.keys() == previous.keys():
+            return
+        index = CalendarIndex(files)
+        index.build()
+        index.save()
+        self._index = index
+        logger.info(
+            f"Indexed {len(index.events)} calendar events ({parsed} files parsed) "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        GLib.idle_add(self._on_index_changed, False)
+
+    def _query_in_thread(self, key: tuple[date, date], generation: int):
+        start, end = key
+        result = []
+        try:
+            result = self._index.query(
+                datetime(start.year, start.month, start.day).timestamp(),
+                datetime(end.year, end.month, end.day).timestamp(),
+            )
+        except Exception as e:
+            logger.error(f"Calendar query for {start} to {end} failed: {e}")
+        GLib.idle_add(self._deliver, key, generation, result)
+
+    # --- Main loop ---
+
+    def _deliver(self, key: tuple, generation: int, result: list[Occurrence]):
+        if generation == self._generation:
+            self._results[key] = result
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        for callback in self._pending.pop(key, []):
+            callback(result)
+        return False
+
+    def _on_index_changed(self, loaded: bool):
+        self._generation += 1
+        self._results.clear()
+        self.emit("changed")
+        if loaded:
+            # Queries already asked for are answered from the saved index
+            # before the sources are checked.
+            self.rescan()
+        return False
+
+    def _on_config_changed(self, changed):
+        self.sources = list(data.CALENDAR_SOURCES)
+        self.rescan()
+
+    def _watch(self, paths: list[str]):
+        for path in list(self._monitors):
+            if path not in paths:
+                self._monitors.pop(path).cancel()
+        for path in paths:
+            if path in self._monitors:
+                continue
+            file = Gio.File.new_for_path(path)
+            try:
+                if os.path.isdir(path):
+                    monitor = file.monitor_directory(
+                        Gio.FileMonitorFlags.WATCH_MOVES, None
+                    )
+                else:
+                    monitor = file.monitor_file(Gio.FileMonitorFlags.NONE, None)
+            except GLib.Error as e:
+                logger.warning(f"Cannot watch calendar source {path}: {e.message}")
+                continue
+            monitor.connect("changed", self._on_source_changed)
+            self._monitors[path] = monitor
+        return False
+
+    def _on_source_changed(self, monitor, file, other_file, event_type):
+        if event_type == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        # Syncs write many files at once; rescan when they settle.
+        if self._rescan_id is None:
+            self._rescan_id = GLib.timeout_add(RESCAN_DELAY_MS, self._rescan_later)
+
+    def _rescan_later(self):
+        self._rescan_id = None
+        self.rescan()
+        return False
@@ -0,0 +1,363 @@
+import glob
+import json
+import os
+import re
+import subprocess
+import time
+
+from gi.repository import GLib
+from loguru import logger
+
+import utils.functions as helpers
+from utils.procfs import ProcFile
+
+DRM_ROOT = "/sys/class/drm"
+NVIDIA_PROC_ROOT = "/proc/driver/nvidia/gpus"
+
+DRIVER_NAMES = {"amdgpu": "AMD GPU", "i915": "Intel GPU", "xe": "Intel GPU"}
+
+
+class GpuBackend:
+    """
+    Base class for GPU utilisation sources.
+
+    `devices` returns one display name per GPU and `utilization` one busy
+    percentage per GPU in the same order. `start` and `stop` bracket the
+    period in which utilisation is being sampled.
+    """
+
+    def devices(self) -> list[str]:
+        return []
+
+    def utilization(self) -> list[int]:
+        return []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class DrmSysfsBackend(GpuBackend):
+    """
+    Reads vendor counters under /sys/class/drm directly.
+
+    amdgpu exposes `gpu_busy_percent`. i915 and xe only expose idle residency
+    counters (RC6 / gtidle), so their busy percentage is derived from the
+    idle time accumulated between two samples. `root` and `clock` can point
+    at a fake sysfs tree and a fake clock in tests.
+    """
+
+    def __init__(self, root: str = DRM_ROOT, clock=time.monotonic):
+        self._clock = clock
+        self._cards = []
+
+        try:
+            entries = sorted(os.listdir(root), key=lambda e: (len(e), e))
+        except OSError:
+            entries = []
+
+        for entry in entries:
+            if not re.fullmatch(r"card\d+", entry):
+                continue
+            card = os.path.join(root, entry)
+            device = os.path.join(card, "device")
+            driver = self._read_driver(device)
+            counter = self._find_counter(card, device, driver)
+            if counter is None:
+                continue
+            kind, path = counter
+            try:
+                counter_file = ProcFile(path, bufsize=64)
+            except OSError as e:
+                logger.warning(f"Cannot open GPU counter {path}: {e}")
+                continue
+            name = self._read_text(os.path.join(device, "product_name"))
+            self._cards.append(
+                {
+                    "name": name or DRIVER_NAMES.get(driver, driver or entry),
+                    "kind": kind,
+                    "file": counter_file,
+                    "last_idle": None,
+                    "last_time": None,
+                    "value": 0,
+                }
+            )
+
+    @staticmethod
+    def _read_text(path: str) -> str:
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    def _read_driver(self, device: str) -> str:
+        for line in self._read_text(os.path.join(device, "uevent")).splitlines():
+            if line.startswith("DRIVER="):
+                return line[len("DRIVER=") :]
+        try:
+            return os.path.basename(os.readlink(os.path.join(device, "driver")))
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _find_counter(card: str, device: str, driver: str):
+        if driver == "amdgpu":
+            path = os.path.join(device, "gpu_busy_percent")
+            return ("busy", path) if os.path.exists(path) else None
+        if driver == "i915":
+            for path in (
+                os.path.join(card, "gt", "gt0", "rc6_residency_ms"),
+                os.path.join(card, "power", "rc6_residency_ms"),
+            ):
+                if os.path.exists(path):
+                    return ("idle", path)
+        if driver == "xe":
+            paths = sorted(
+                glob.glob(
+                    os.path.join(device, "tile*", "gt*", "gtidle", "idle_residency_ms")
+                )
+            )
+            if paths:
+                return ("idle", paths[0])
+        return None
+
+    def devices(self) -> list[str]:
+        return [card["name"] for card in self._cards]
+
+    def utilization(self) -> list[int]:
+        now = self._clock()
+        for card in self._cards:
+            try:
+                raw = int(card["file"].read())
+            except (OSError, ValueError):
+                card["value"] = 0
+                continue
+            if card["kind"] == "busy":
+                card["value"] = raw
+                continue
+            last_idle, last_time = card["last_idle"], card["last_time"]
+            if last_idle is not None and now > last_time:
+                elapsed_ms = (now - last_time) * 1000.0
+                idle = min(1.0, max(0.0, (raw - last_idle) / elapsed_ms))
+                card["value"] = round((1.0 - idle) * 100)
+            card["last_idle"] = raw
+            card["last_time"] = now
+        return [card["value"] for card in self._cards]
+
+    def stop(self):
+        # Idle deltas across a pause would average over the whole gap.
+        for card in self._cards:
+            card["last_idle"] = card["last_time"] = None
+
+
+class NvidiaSmiBackend(GpuBackend):
+    """
+    Keeps one `nvidia-smi` process in loop mode and parses its CSV stream
+    incrementally from a GLib IO watch, instead of spawning per sample.
+    """
+
+    def __init__(self, interval: int = 1000, root: str = NVIDIA_PROC_ROOT):
+        self.interval = interval
+        self._names = []
+        for info in sorted(glob.glob(os.path.join(root, "*", "information"))):
+            model = "NVIDIA GPU"
+            try:
+                with open(info) as f:
+                    for line in f:
+                        if line.startswith("Model:"):
+                            model = line.split(":", 1)[1].strip()
+                            break
+            except OSError:
+                pass
+            self._names.append(model)
+        self._values = [0] * len(self._names)
+        self._buffer = b""
+        self._process = None
+        self._watch_id = None
+
+    def devices(self) -> list[str]:
+        return list(self._names)
+
+    def utilization(self) -> list[int]:
+        return list(self._values)
+
+    def start(self):
+        if self._process is not None or not self._names:
+            return
+        try:
+            self._process = subprocess.Popen(
+                [
+                    "nvidia-smi",
+                    "--query-gpu=index,utilization.gpu",
+                    "--format=csv,noheader,nounits",
+                    "-lms",
+                    str(self.interval),
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                preexec_fn=helpers.set_death_signal,
+            )
+        except OSError as e:
+            logger.warning(f"Could not start nvidia-smi sampler: {e}")
+            self._process = None
+            return
+        fd = self._process.stdout.fileno()
+        os.set_blocking(fd, False)
+        self._watch_id = GLib.io_add_watch(
+            fd, GLib.PRIORITY_DEFAULT, GLib.IO_IN | GLib.IO_HUP, self._on_output
+        )
+
+    def stop(self):
+        if self._watch_id is not None:
+            GLib.source_remove(self._watch_id)
+            self._watch_id = None
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process.stdout.close()
+            self._process = None
+        self._buffer = b""
+
+    def _on_output(self, fd, condition):
+        try:
+            chunk = os.read(fd, 4096)
+        except BlockingIOError:
+            return True
+        except OSError:
+            chunk = b""
+
+        if not chunk:
+            logger.warning("nvidia-smi sampler exited; GPU usage unavailable.")
+            self._watch_id = None
+            self.stop()
+            self._values = [0] * len(self._names)
+            return False
+
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            index, _, value = line.partition(b",")
+            try:
+                index = int(index)
+                self._values[index] = int(value)
+            except (ValueError, IndexError):
+                # "[N/A]" or a partial line after a driver hiccup.
+                continue
+        return True
+
+
+class NvtopBackend(GpuBackend):
+    """
+    Fallback for GPUs without readable counters: runs `nvtop -s` in a thread,
+    at most one invocation at a time.
+    """
+
+    def __init__(self):
+        self._values = []
+        self._running = False
+        info = self._run_nvtop(timeout=5) or []
+        self._names = [v.get("device_name", "GPU") for v in info]
+
+    @staticmethod
+    def _run_nvtop(timeout: int):
+        try:
+            return json.loads(
+                subprocess.check_output(
+                    ["nvtop", "-s"],
+                    text=True,
+                    timeout=timeout,
+                    stderr=subprocess.DEVNULL,
+                )
+            )
+        except FileNotFoundError:
+            logger.warning("nvtop not found; GPU info unavailable.")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"nvtop failed with exit code {e.returncode}")
+        except subprocess.TimeoutExpired:
+            logger.error("nvtop command timed out.")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed parsing nvtop JSON: {e}")
+        return None
+
+    def devices(self) -> list[str]:
+        return list(self._names)
+
+    def utilization(self) -> list[int]:
+        if not self._running:
+            self._running = True
+            GLib.Thread.new("nvtop-thread", lambda _: self._update_in_thread(), None)
+        return list(self._values)
+
+    def _update_in_thread(self):
+        info = self._run_nvtop(timeout=10)
+        values = []
+        try:
+            values = [
+                int(v["gpu_util"].strip("%")) if v["gpu_util"] is not None else 0
+                for v in info or []
+            ]
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Failed parsing nvtop JSON: {e}")
+        GLib.idle_add(self._set_values, values)
+        self._running = False
+
+    def _set_values(self, values):
+        self._values = values
+        return False
+
+
+class CompositeGpuBackend(GpuBackend):
+    """Concatenates several backends, e.g. an integrated and a discrete GPU."""
+
+    def __init__(self, backends: list[GpuBackend]):
+        self.backends = backends
+
+    def devices(self) -> list[str]:
+        return [name for backend in self.backends for name in backend.devices()]
+
+    def utilization(self) -> list[int]:
+        values = []
+        for backend in self.backends:
+            usage = backend.utilization()
+            # Keep positions stable if a backend lost track of its devices.
+            count = len(backend.devices())
+            values.extend((usage + [0] * count)[:count])
+        return values
+
+    def start(self):
+        for backend in self.backends:
+            backend.start()
+
+    def stop(self):
+        for backend in self.backends:
+            backend.stop()
+
+
+def detect_gpu_backend(interval: int = 1000) -> GpuBackend:
+    """
+    Pick the cheapest available GPU source: sysfs counters first, then a
+    persistent nvidia-smi stream, and `nvtop -s` only if neither applies.
+    """
+    backends = []
+
+    sysfs = DrmSysfsBackend()
+    if sysfs.devices():
+        backends.append(sysfs)
+
+    if helpers.executable_exists("nvidia-smi"):
+        nvidia = NvidiaSmiBackend(interval)
+        if nvidia.devices():
+            backends.append(nvidia)
+
+    if not backends and helpers.executable_exists("nvtop"):
+        backends.append(NvtopBackend())
+
+    if len(backends) == 1:
+        return backends[0]
+    return CompositeGpuBackend(backends)
@@ -0,0 +1,296 @@
+"""
+Kanban boards, independent of the widgets that show them.
+
+A board is a list of titled columns holding cards. Every edit goes through
+one of the board's operations, which records its inverse for undo/redo and
+emits `changed` with a small description of what happened, so views can
+patch themselves instead of rebuilding. Saving is debounced: the snapshot is
+serialized on the main loop and written to a temporary file that is renamed
+over the board file from a worker thread.
+
+The default board keeps its historical location (`~/.kanban.json`); other
+boards live as `~/.kanban/<name>.json` and are only read when first used.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import threading
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+DEFAULT_BOARD = "default"
+DEFAULT_BOARD_FILE = os.path.expanduser("~/.kanban.json")
+BOARDS_DIR = os.path.expanduser("~/.kanban")
+DEFAULT_COLUMNS = ["To Do", "In Progress", "Done"]
+SAVE_DELAY_MS = 500
+HISTORY_LIMIT = 200
+
+_card_ids = itertools.count(1)
+
+
+class KanbanCard:
+    __slots__ = ("id", "text")
+
+    def __init__(self, text: str):
+        # Ids only identify cards within this session; files store text.
+        self.id = next(_card_ids)
+        self.text = text
+
+
+class KanbanBoard(Service):
+    """
+    Columns of cards with undoable operations and debounced saving.
+
+    `changed` carries one of:
+        ("reset",)
+        ("insert", column, index, card)
+        ("delete", column, index, card)
+        ("move", card, from_column, from_index, to_column, to_index)
+        ("edit", card)
+    """
+
+    @Signal
+    def changed(self, change: object) -> None: ...
+
+    def __init__(self, name: str, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+        self.path = path
+        self.titles: list[str] = []
+        self.columns: list[list[KanbanCard]] = []
+        self._cards: dict[int, KanbanCard] = {}
+        self._undo: list[tuple] = []
+        self._redo: list[tuple] = []
+
+        self._save_id = None
+        self._save_seq = 0
+        self._written_seq = 0
+        self._write_lock = threading.Lock()
+        self._writers: list[threading.Thread] = []
+
+        self.load()
+
+    # --- Persistence ---
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            columns = [
+                (column["title"], [str(note) for note in column.get("notes", [])])
+                for column in state["columns"]
+            ]
+        except FileNotFoundError:
+            columns = [(title, []) for title in DEFAULT_COLUMNS]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error loading kanban board {self.path}: {e}")
+            columns = [(title, []) for title in DEFAULT_COLUMNS]
+
+        self.titles = [title for title, _ in columns]
+        self.columns = [[KanbanCard(text) for text in notes] for _, notes in columns]
+        self._cards = {card.id: card for column in self.columns for card in column}
+        self._undo.clear()
+        self._redo.clear()
+        self.emit("changed", ("reset",))
+
+    def snapshot(self) -> str:
+        return json.dumps(
+            {
+                "columns": [
+                    {"title": title, "notes": [card.text for card in column]}
+                    for title, column in zip(self.titles, self.columns)
+                ]
+            },
+            ensure_ascii=False,
+        )
+
+    def _schedule_save(self):
+        if self._save_id is None:
+            self._save_id = GLib.timeout_add(SAVE_DELAY_MS, self._save_later)
+
+    def _save_later(self):
+        self._save_id = None
+        self._save_seq += 1
+        writer = threading.Thread(
+            target=self._write, args=(self.snapshot(), self._save_seq), daemon=True
+        )
+        self._writers = [thread for thread in self._writers if thread.is_alive()]
+        self._writers.append(writer)
+        writer.start()
+        return False
+
+    def flush(self):
+        """
+        Writes pending changes now, on the calling thread, and waits for
+        background writes still in flight.
+        """
+        if self._save_id is not None:
+            GLib.source_remove(self._save_id)
+            self._save_id = None
+            self._save_seq += 1
+            self._write(self.snapshot(), self._save_seq)
+        for writer in self._writers:
+            writer.join()
+        self._writers = []
+
+    def _write(self, text: str, seq: int):
+        with self._write_lock:
+            # A newer snapshot already landed; never go back in time.
+            if seq <= self._written_seq:
+                return
+            tmp = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._written_seq = seq
+            except OSError as e:
+                logger.error(f"Error saving kanban board {self.path}: {e}")
+
+    # --- Operations ---
+
+    def locate(self, card_id: int) -> tuple[int, int]:
+        """Column and index of a card."""
+        return self._index_of(self._cards[card_id])
+
+    def card(self, card_id: int) -> KanbanCard | None:
+        return self._cards.get(card_id)
+
+    def add_card(self, column: int, text: str, index: int | None = None) -> KanbanCard:
+        card = KanbanCard(text)
+        if index is None:
+            index = len(self.columns[column])
+        self._do(("insert", column, index, card))
+        return card
+
+    def edit_card(self, card_id: int, text: str):
+        if self._cards[card_id].text != text:
+            self._do(("edit", card_id, text))
+
+    def move_card(self, card_id: int, column: int, index: int | None = None):
+        """
+        Moves a card before position `index` of `column` as currently laid
+        out (the end if None), which is what a drop target reports.
+        """
+        from_column, from_index = self.locate(card_id)
+        if index is None:
+            index = len(self.columns[column])
+        if column == from_column and from_index < index:
+            index -= 1
+        if (column, index) != (from_column, from_index):
+            self._do(("move", card_id, column, index))
+
+    def delete_card(self, card_id: int):
+        self._do(("delete", card_id))
+
+    def _do(self, op: tuple):
+        self._undo.append(self._apply(op))
+        del self._undo[:-HISTORY_LIMIT]
+        self._redo.clear()
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        self._redo.append(self._apply(self._undo.pop()))
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        self._undo.append(self._apply(self._redo.pop()))
+        return True
+
+    def _apply(self, op: tuple) -> tuple:
+        """Performs `op`, notifies views and returns its inverse."""
+        kind = op[0]
+        if kind == "insert":
+            _, column, index, card = op
+            index = min(index, len(self.columns[column]))
+            self.columns[column].insert(index, card)
+            self._cards[card.id] = card
+            change, inverse = ("insert", column, index, card), ("delete", card.id)
+        elif kind == "delete":
+            card = self._cards.pop(op[1])
+            column, index = self._index_of(card)
+            del self.columns[column][index]
+            change = ("delete", column, index, card)
+            inverse = ("insert", column, index, card)
+        elif kind == "move":
+            _, card_id, column, index = op
+            card = self._cards[card_id]
+            from_column, from_index = self._index_of(card)
+            del self.columns[from_column][from_index]
+            index = min(index, len(self.columns[column]))
+            self.columns[column].insert(index, card)
+            change = ("move", card, from_column, from_index, column, index)
+            inverse = ("move", card_id, from_column, from_index)
+        elif kind == "edit":
+            _, card_id, text = op
+            card = self._cards[card_id]
+            inverse = ("edit", card_id, card.text)
+            card.text = text
+            change = ("edit", card)
+        else:
+            raise ValueError(f"Unknown kanban operation {kind}")
+
+        self.emit("changed", change)
+        self._schedule_save()
+        return inverse
+
+    def _index_of(self, card: KanbanCard) -> tuple[int, int]:
+        for column_index, column in enumerate(self.columns):
+            for index, other in enumerate(column):
+                if other is card:
+                    return column_index, index
+        raise KeyError(card.id)
+
+
+class KanbanStore:
+    """Loads boards on first use and flushes them at exit."""
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if KanbanStore.instance is None:
+            KanbanStore.instance = KanbanStore()
+
+        return KanbanStore.instance
+
+    def __init__(self):
+        self._boards: dict[str, KanbanBoard] = {}
+        atexit.register(self.flush)
+
+    def board_path(self, name: str) -> str:
+        if name == DEFAULT_BOARD:
+            return DEFAULT_BOARD_FILE
+        return os.path.join(BOARDS_DIR, f"{name}.json")
+
+    def board_names(self) -> list[str]:
+        try:
+            names = sorted(
+                entry[: -len(".json")]
+                for entry in os.listdir(BOARDS_DIR)
+                if entry.endswith(".json")
+            )
+        except FileNotFoundError:
+            names = []
+        return [DEFAULT_BOARD] + [name for name in names if name != DEFAULT_BOARD]
+
+    def board(self, name: str = DEFAULT_BOARD) -> KanbanBoard:
+        board = self._boards.get(name)
+        if board is None:
+            board = KanbanBoard(name, self.board_path(name))
+            self._boards[name] = board
+        return board
+
+    def flush(self):
+        for board in self._boards.values():
+            board.flush()
@@ -0,0 +1,290 @@
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+import config.data as data
+from modules.upower.upower import UPowerManager
+from services.gpu import detect_gpu_backend
+from utils.procfs import CpuStat, MemInfo, NetDev, disk_percent
+from utils.ringbuffer import MetricHistory
+
+# Metrics a widget can subscribe to. Each tick only collects the keys wanted by
+# at least one active subscriber.
+METRIC_KEYS = frozenset({"cpu", "mem", "disk", "gpu", "battery", "net"})
+
+# Metrics kept sampled for history even when no widget is showing them.
+HISTORY_KEYS = frozenset({"cpu", "mem", "disk", "net"})
+
+# 10 minutes of full-rate samples and 24 hours of 1-minute peaks.
+HISTORY_FINE_SPAN = 10 * 60 * 1000
+HISTORY_BUCKET_SPAN = 60 * 1000
+HISTORY_COARSE_BUCKETS = 24 * 60
+
+
+class MetricsService(Service):
+    """
+    Shared sampler for CPU, memory, disk, GPU, battery and network metrics.
+
+    Widgets register the metrics they display with `subscribe`. While a
+    subscribed widget is mapped its metrics are collected on every tick, and
+    each tick emits a single `sampled` signal carrying the whole batch. When
+    nothing is subscribed the sampling timer is removed.
+
+    CPU, memory and network counters come from the /proc readers in
+    `utils.procfs`. Disk usage changes slowly, so it is sampled on its own
+    `disk_interval` schedule and each tick reports the latest value. GPU
+    usage comes from the backend picked by `services.gpu.detect_gpu_backend`.
+
+    With `metrics_history` enabled every sampled value is also appended to a
+    `MetricHistory` (per core, disk, GPU and network direction), read with
+    `history_for`, and the HISTORY_KEYS stay sampled in the background.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if MetricsService.instance is None:
+            MetricsService.instance = MetricsService()
+
+        return MetricsService.instance
+
+    @Signal
+    def sampled(self, sample: object) -> None:
+        """Signal emitted once per tick with a dict of the collected metrics."""
+
+    def __init__(
+        self,
+        interval: int = data.METRICS_SAMPLE_INTERVAL,
+        disk_interval: int = data.METRICS_DISK_INTERVAL,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.interval = max(100, int(interval))
+        self.disk_interval = max(self.interval, int(disk_interval))
+
+        self._subscribers = {}
+        self._active = frozenset()
+        self._timer_id = None
+        self._disk_timer_id = None
+        self._pending_tick = None
+        self.sample = {}
+
+        self._cpu = CpuStat()
+        self._mem = MemInfo()
+        self._net = NetDev()
+        self.disk = []
+
+        self.gpu_backend = detect_gpu_backend(self.interval)
+
+        self.upower = UPowerManager()
+        self.display_device = self.upower.get_display_device()
+
+        self.history = {}
+        self._history_keys = HISTORY_KEYS if data.METRICS_HISTORY else frozenset()
+        if self._history_keys:
+            self._update_active()
+
+        data.subscribe(
+            ("METRICS_SAMPLE_INTERVAL", "METRICS_DISK_INTERVAL", "BAR_METRICS_DISKS"),
+            self._on_config_changed,
+        )
+
+    @property
+    def cpu_cores(self) -> int:
+        return self._cpu.cores
+
+    # Subscriptions
+
+    def subscribe(self, widget, keys, only_mapped: bool = True):
+        """
+        Register `widget` as a consumer of `keys`.
+
+        With `only_mapped` the keys are sampled only while the widget is
+        mapped. Widgets that hide themselves based on the sampled value (e.g.
+        the battery indicator) must pass `only_mapped=False`.
+        """
+        keys = frozenset(keys) & METRIC_KEYS
+        if widget in self._subscribers:
+            self.unsubscribe(widget)
+
+        handlers = [widget.connect("destroy", lambda *_: self.unsubscribe(widget))]
+        if only_mapped:
+            handlers += [
+                widget.connect("map", lambda *_: self._update_active()),
+                widget.connect("unmap", lambda *_: self._update_active()),
+            ]
+        self._subscribers[widget] = (keys, only_mapped, handlers)
+        self._update_active()
+
+    def unsubscribe(self, widget):
+        entry = self._subscribers.pop(widget, None)
+        if entry is None:
+            return
+        for handler in entry[2]:
+            try:
+                widget.disconnect(handler)
+            except Exception:
+                pass
+        self._update_active()
+
+    def _update_active(self):
+        active = self._history_keys.union(
+            *(
+                keys
+                for widget, (keys, only_mapped, _) in self._subscribers.items()
+                if not only_mapped or widget.get_mapped()
+            )
+        )
+        previous = self._active
+        added = active - previous
+        self._active = active
+
+        if "net" not in active:
+            self._net.reset()
+
+        if "gpu" in added:
+            self.gpu_backend.start()
+        elif "gpu" in previous - active:
+            self.gpu_backend.stop()
+
+        if "disk" in active and self._disk_timer_id is None:
+            self._sample_disks()
+            self._disk_timer_id = GLib.timeout_add(
+                self.disk_interval, self._sample_disks
+            )
+        elif "disk" not in active and self._disk_timer_id is not None:
+            GLib.source_remove(self._disk_timer_id)
+            self._disk_timer_id = None
+
+        if active and self._timer_id is None:
+            self._timer_id = GLib.timeout_add(self.interval, self._tick)
+        elif not active and self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+
+        # Give newly shown widgets a value right away instead of after a tick.
+        if added and self._pending_tick is None:
+            self._pending_tick = GLib.idle_add(self._tick_once)
+
+    def set_interval(self, interval: int):
+        self.interval = max(100, int(interval))
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = GLib.timeout_add(self.interval, self._tick)
+
+    def _on_config_changed(self, changed):
+        if "METRICS_SAMPLE_INTERVAL" in changed:
+            self.set_interval(data.METRICS_SAMPLE_INTERVAL)
+        if changed & {"METRICS_SAMPLE_INTERVAL", "METRICS_DISK_INTERVAL"}:
+            self.disk_interval = max(self.interval, int(data.METRICS_DISK_INTERVAL))
+            if self._disk_timer_id is not None:
+                GLib.source_remove(self._disk_timer_id)
+                self._disk_timer_id = GLib.timeout_add(
+                    self.disk_interval, self._sample_disks
+                )
+        if "BAR_METRICS_DISKS" in changed:
+            # Disk histories are kept by position in the list. The service
+            # subscribes before any widget, so they are gone before widgets
+            # rebuild and ask for them again.
+            for name in [name for name in self.history if name.startswith("disk")]:
+                del self.history[name]
+            if self._disk_timer_id is not None:
+                self._sample_disks()
+
+    # Sampling
+
+    def _tick_once(self):
+        self._pending_tick = None
+        if self._active:
+            self._tick()
+        return False
+
+    def _tick(self):
+        keys = self._active
+        sample = {}
+
+        if "cpu" in keys:
+            sample["cpu"] = self._cpu.update()
+            sample["cores"] = self._cpu.percent[1:]
+        if "mem" in keys:
+            sample["mem"] = self._mem.update()
+        if "disk" in keys:
+            sample["disk"] = self.disk
+        if "gpu" in keys:
+            sample["gpu"] = self.gpu_backend.utilization()
+        if "battery" in keys:
+            sample["battery"] = self._read_battery()
+        if "net" in keys:
+            sample["net"] = self._read_net()
+
+        if data.METRICS_HISTORY:
+            self._record_history(sample)
+
+        self.sample = sample
+        self.emit("sampled", sample)
+        return True
+
+    # History
+
+    def history_for(self, name: str) -> MetricHistory:
+        """
+        History of one series: "cpu", "cpu<core>", "mem", "disk<i>",
+        "gpu<i>", "net_down", "net_up" or "battery".
+        """
+        history = self.history.get(name)
+        if history is None:
+            history = MetricHistory(
+                max(2, HISTORY_FINE_SPAN // self.interval),
+                HISTORY_COARSE_BUCKETS,
+                max(1, HISTORY_BUCKET_SPAN // self.interval),
+            )
+            self.history[name] = history
+        return history
+
+    def _record_history(self, sample):
+        if "cpu" in sample:
+            self.history_for("cpu").append(sample["cpu"])
+            for core, value in enumerate(sample["cores"]):
+                self.history_for(f"cpu{core}").append(value)
+        if "mem" in sample:
+            self.history_for("mem").append(sample["mem"])
+        for i, value in enumerate(sample.get("disk", ())):
+            self.history_for(f"disk{i}").append(value)
+        for i, value in enumerate(sample.get("gpu", ())):
+            self.history_for(f"gpu{i}").append(value)
+        if "net" in sample:
+            download, upload = sample["net"]
+            self.history_for("net_down").append(download)
+            self.history_for("net_up").append(upload)
+        if "battery" in sample and sample["battery"][1] is not None:
+            self.history_for("battery").append(sample["battery"][0])
+
+    def _read_battery(self):
+        battery = self.upower.get_full_device_information(self.display_device)
+        if battery is None:
+            return (0.0, None, 0)
+        charging = battery["State"] == 1
+        return (
+            battery["Percentage"],
+            charging,
+            battery["TimeToFull"] if charging else battery["TimeToEmpty"],
+        )
+
+    def _read_net(self):
+        return self._net.update()
+
+    def _sample_disks(self):
+        disks = []
+        for path in data.BAR_METRICS_DISKS:
+            try:
+                disks.append(disk_percent(path))
+            except OSError as e:
+                logger.warning(f"Could not stat {path}: {e}")
+                disks.append(0.0)
+        self.disk = disks
+        return True
+
+    def get_gpu_info(self):
+        """One entry per GPU, in the order of the `gpu` sample values."""
+        return [{"device_name": name} for name in self.gpu_backend.devices()]
@@ -4,7 +4,7 @@ import gi
 
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import bulk_connect
-from gi.repository import GLib  # type: ignore
+from gi.repository import Gio, GLib  # type: ignore
 from loguru import logger
 
 from config.data import OTHERPLAYERS
@@ -35,7 +35,8 @@ class MprisPlayer(Service):
     def exit(self, value: bool) -> bool: ...
 
     @Signal
-    def changed(self) -> None: ...
+    def changed(self, properties: object) -> None:
+        """Emitted once per main loop iteration with the set of changed names."""
 
     def __init__(
         self,
@@ -44,12 +45,27 @@ class MprisPlayer(Service):
     ):
         self._signal_connectors: dict = {}
         self._player: Playerctl.Player = player
+        # Names changed since the last "changed" emission.
+        self._pending_changes: set = set()
+        # Position anchor: the player was at `_position` (µs) at the monotonic
+        # time `_position_time` (µs), moving at `_rate` while `_playing`.
+        self._position = 0
+        self._position_time = GLib.get_monotonic_time()
+        self._playing = False
+        self._rate = 1.0
+        self._rate_proxy = None
+        self._rate_handler = None
         super().__init__(**kwargs)
-        for sn in ["playback-status", "loop-status", "shuffle", "volume", "seeked"]:
+        self._property_names = {prop.name for prop in self.list_properties()}  # type: ignore
+        for sn in ["playback-status", "loop-status", "shuffle", "volume"]:
             self._signal_connectors[sn] = self._player.connect(
                 sn,
                 lambda *args, sn=sn: self.notifier(sn, args),
             )
+        self._signal_connectors["seeked"] = self._player.connect(
+            "seeked",
+            self.on_seeked,
+        )
 
         self._signal_connectors["exit"] = self._player.connect(
             "exit",
@@ -60,52 +76,144 @@ class MprisPlayer(Service):
             lambda *args: self.update_status(),
         )
         GLib.idle_add(lambda *args: self.update_status_once())
+        self._connect_rate()
+
+    def _connect_rate(self):
+        # Playerctl does not expose Rate, so follow it on the player's own
+        # MPRIS interface; the proxy keeps it cached from PropertiesChanged.
+        instance = self._player.get_property("player-instance")
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SESSION,
+            Gio.DBusProxyFlags.DO_NOT_AUTO_START,
+            None,
+            f"org.mpris.MediaPlayer2.{instance}",
+            "/org/mpris/MediaPlayer2",
+            "org.mpris.MediaPlayer2.Player",
+            None,
+            self._on_rate_proxy_ready,
+        )
 
-    def update_status(self):
-        # schedule each notifier asynchronously.
-        def notify_property(prop):
-            if self.get_property(prop) is not None:
-                self.notifier(prop)
+    def _on_rate_proxy_ready(self, _, result):
+        try:
+            proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            logger.warning(f"[MprisPlayer] Could not follow playback rate: {e}")
+            return
+        if not hasattr(self, "_player"):
+            return
+        self._rate_proxy = proxy
+        self._rate_handler = proxy.connect(
+            "g-properties-changed", self._on_player_properties_changed
+        )
+        self._update_rate()
+
+    def _on_player_properties_changed(self, proxy, changed, invalidated):
+        if "Rate" in changed.keys() or "Rate" in invalidated:
+            self._update_rate()
+
+    def _update_rate(self):
+        value = self._rate_proxy.get_cached_property("Rate")
+        rate = value.unpack() if value is not None else 1.0
+        if rate == self._rate:
+            return
+        # Re-anchor so the elapsed time so far keeps the old rate.
+        self._position = self.current_position()
+        self._position_time = GLib.get_monotonic_time()
+        self._rate = rate
+        self.notifier("rate")
+
+    def sync_position(self, position: int | None = None):
+        """
+        Re-anchor the local position clock at `position` (µs), reading it
+        from the player over D-Bus when not given.
+        """
+        if not hasattr(self, "_player"):
+            return
+        if position is None:
+            try:
+                position = self._player.get_property("position")
+            except Exception:
+                position = 0
+        self._position = position or 0
+        self._position_time = GLib.get_monotonic_time()
+        self._playing = (
+            self._player.get_property("playback-status")
+            == Playerctl.PlaybackStatus.PLAYING
+        )
+
+    def current_position(self) -> int:
+        """Estimated position in µs, without asking the player."""
+        position = self._position
+        if self._playing:
+            elapsed = GLib.get_monotonic_time() - self._position_time
+            position += int(elapsed * self._rate)
+        try:
+            length = int(self.length or 0) if hasattr(self, "_player") else 0
+        except (TypeError, ValueError):
+            length = 0
+        if length > 0:
+            position = min(position, length)
+        return max(0, position)
+
+    def is_playing(self) -> bool:
+        """Playback state as of the last resync."""
+        return self._playing
 
+    def on_seeked(self, player, position):
+        self.sync_position(position)
+        self.notifier("seeked")
+
+    def update_status(self):
+        # A new track restarts the clock somewhere the player decides.
+        self.sync_position()
+        # A metadata change touches every track-dependent property.
         for prop in [
             "metadata",
             "title",
             "artist",
+            "album",
             "arturl",
             "length",
-        ]:
-            GLib.idle_add(lambda p=prop: (notify_property(p), False))
-        for prop in [
             "can-seek",
             "can-pause",
             "can-shuffle",
             "can-go-next",
             "can-go-previous",
         ]:
-            GLib.idle_add(lambda p=prop: (self.notifier(p), False))
+            self.notifier(prop)
 
     def update_status_once(self):
-        # schedule notifier calls for each property
-        def notify_all():
-            for prop in self.list_properties():  # type: ignore
-                self.notifier(prop.name)
-            return False
-
-        GLib.idle_add(notify_all, priority=GLib.PRIORITY_DEFAULT_IDLE)
+        self.sync_position()
+        for prop in self._property_names:
+            self.notifier(prop)
 
     def notifier(self, name: str, args=None):
-        def notify_and_emit():
-            self.notify(name)
-            self.emit("changed")
+        """Queue `name` for the next batched "changed" emission."""
+        if name == "playback-status":
+            self.sync_position()
+        if not self._pending_changes:
+            GLib.idle_add(self._emit_changes, priority=GLib.PRIORITY_DEFAULT_IDLE)
+        self._pending_changes.add(name)
+
+    def _emit_changes(self):
+        changes = frozenset(self._pending_changes)
+        self._pending_changes.clear()
+        if not hasattr(self, "_player"):
+            # The player exited before the batch was flushed.
             return False
-
-        GLib.idle_add(notify_and_emit, priority=GLib.PRIORITY_DEFAULT_IDLE)
+        for name in changes & self._property_names:
+            self.notify(name)
+        self.emit("changed", changes)
+        return False
 
     def on_player_exit(self, player):
         for id in list(self._signal_connectors.values()):
             with contextlib.suppress(Exception):
                 self._player.disconnect(id)
         del self._signal_connectors
+        if self._rate_proxy is not None:
+            self._rate_proxy.disconnect(self._rate_handler)
+            self._rate_proxy = None
         GLib.idle_add(lambda: (self.emit("exit", True), False))
         del self._player
 
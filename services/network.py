@@ -272,6 +272,7 @@ class NetworkClient(Service):
 
     def _init_network_client(self, client: NM.Client, task: Gio.Task, **kwargs):
         self._client = client
+        self._client.connect("notify::state", lambda *args: self.notify("online"))
         wifi_device: NM.DeviceWifi | None = self._get_device(NM.DeviceType.WIFI)  # type: ignore
         ethernet_device: NM.DeviceEthernet | None = self._get_device(
             NM.DeviceType.ETHERNET
@@ -286,6 +287,7 @@ class NetworkClient(Service):
             self.emit("device-ready")
 
         self.notify("primary-device")
+        self.notify("online")
 
     def _get_device(self, device_type) -> Any:
         devices: List[NM.Device] = self._client.get_devices()  # type: ignore
@@ -321,3 +323,10 @@ class NetworkClient(Service):
     @Property(str, "readable")
     def primary_device(self) -> Literal["wifi", "wired"] | None:
         return self._get_primary_device()
+
+    @Property(bool, "readable", default_value=False)
+    def online(self) -> bool:
+        """Whether NetworkManager reports global connectivity."""
+        if not self._client:
+            return False
+        return self._client.get_state() == NM.State.CONNECTED_GLOBAL
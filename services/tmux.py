@@ -0,0 +1,333 @@
+"""
+Tmux session list backed by a single control-mode client.
+
+One `tmux -C` process stays attached to the server (with `ignore-size` and
+`no-output`, so it never resizes windows or receives pane data). Renames are
+applied from `%session-renamed` notifications; other session and window
+notifications refresh the list through the same connection. Commands are
+written to the client's stdin and their `%begin`/`%end` blocks are matched
+back to callbacks in order, so no process is spawned per action.
+
+A control client has to be attached to a session, so when the server has no
+sessions the service is idle until `connect_client` is called again.
+"""
+
+import shutil
+from typing import Callable
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+import config.data as data
+
+CLIENT_FLAGS = "ignore-size,no-output"
+RECONNECT_DELAY_MS = 500
+SESSION_FORMAT = "\t".join(
+    [
+        "#{session_id}",
+        "#{session_name}",
+        "#{session_windows}",
+        "#{session_activity}",
+    ]
+)
+# Notifications after which window counts or the session set may differ.
+REFRESH_NOTIFICATIONS = {
+    "%sessions-changed",
+    "%session-changed",
+    "%session-window-changed",
+    "%window-add",
+    "%window-close",
+    "%unlinked-window-add",
+    "%unlinked-window-close",
+}
+TERMINALS = [
+    ("kitty", "kitty -e {cmd}"),
+    ("alacritty", "alacritty -e {cmd}"),
+    ("foot", "foot {cmd}"),
+    ("gnome-terminal", "gnome-terminal -- {cmd}"),
+    ("konsole", "konsole -e {cmd}"),
+    ("xfce4-terminal", "xfce4-terminal -e '{cmd}'"),
+]
+
+_terminal_templates: dict[str, str] = {}
+
+
+def quote(arg: str) -> str:
+    """Quotes `arg` for the tmux command parser (no `$` or `~` expansion)."""
+    return "'" + arg.replace("'", "'\\''") + "'"
+
+
+def terminal_template() -> str:
+    """
+    Command template with a `{cmd}` placeholder for the configured terminal,
+    or the first installed fallback. Looked up once per configured command.
+    """
+    configured = getattr(data, "TERMINAL_COMMAND", "") or ""
+    template = _terminal_templates.get(configured)
+    if template is not None:
+        return template
+
+    template = "kitty -e {cmd}"
+    if configured and shutil.which(configured.split()[0]):
+        template = configured.replace("{", "{{").replace("}", "}}") + " {cmd}"
+    else:
+        for terminal, candidate in TERMINALS:
+            if shutil.which(terminal):
+                template = candidate
+                break
+    _terminal_templates[configured] = template
+    return template
+
+
+class TmuxSession:
+    def __init__(self, session_id: str, name: str, windows: int, activity: int):
+        self.id = session_id
+        self.name = name
+        self.windows = windows
+        # Unix time of the last activity in the session.
+        self.activity = activity
+
+    @classmethod
+    def parse(cls, line: str) -> "TmuxSession | None":
+        fields = line.split("\t")
+        if len(fields) != 4:
+            return None
+        session_id, name, windows, activity = fields
+        try:
+            return cls(session_id, name, int(windows), int(activity))
+        except ValueError:
+            return None
+
+
+class Tmux(Service):
+    """Session list and commands through one tmux control-mode client."""
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if Tmux.instance is None:
+            Tmux.instance = Tmux()
+
+        return Tmux.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Emitted when the session list changes."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sessions: list[TmuxSession] = []
+
+        self._process: Gio.Subprocess | None = None
+        self._stdin: Gio.OutputStream | None = None
+        self._stdout: Gio.DataInputStream | None = None
+        self._established = False
+        # Callbacks for commands we sent, answered in order.
+        self._replies: list[Callable[[list[str], bool], None] | None] = []
+        self._block: list[str] | None = None
+        self._block_ours = False
+        self._listing = False
+        self._list_again = False
+        self._reconnect_id = None
+
+        self.connect_client()
+
+    @property
+    def connected(self) -> bool:
+        return self._process is not None
+
+    def connect_client(self, create: str | None = None):
+        """
+        Starts the control client unless it is running. With `create`, that
+        session is made (or reused) for the client to attach to.
+        """
+        if self._process is not None:
+            return
+        if not shutil.which("tmux"):
+            return
+
+        argv = ["tmux", "-C"]
+        if create is not None:
+            argv += [
+                "new-session",
+                "-A",
+                "-d",
+                "-s",
+                create,
+                ";",
+                "attach-session",
+                "-t",
+                create,
+            ]
+        else:
+            argv += ["attach-session"]
+        argv += ["-f", CLIENT_FLAGS]
+
+        try:
+            self._process = Gio.Subprocess.new(
+                argv,
+                Gio.SubprocessFlags.STDIN_PIPE
+                | Gio.SubprocessFlags.STDOUT_PIPE
+                | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            logger.error(f"Could not start tmux control client: {e.message}")
+            return
+
+        self._stdin = self._process.get_stdin_pipe()
+        self._stdout = Gio.DataInputStream.new(self._process.get_stdout_pipe())
+        self._established = False
+        self._replies = []
+        self._block = None
+        self._listing = False
+        self._list_again = False
+        self._read_next_line()
+        self.refresh()
+
+    def _read_next_line(self):
+        self._stdout.read_line_async(
+            GLib.PRIORITY_DEFAULT, None, self._on_line, self._process
+        )
+
+    def _on_line(self, stream, result, process):
+        if process is not self._process:
+            return
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+        except GLib.Error as e:
+            logger.warning(f"tmux control client read failed: {e.message}")
+            line = None
+        if line is None:
+            self._on_client_exit()
+            return
+
+        self._handle_line(line)
+        self._read_next_line()
+
+    def _handle_line(self, line: str):
+        if self._block is not None:
+            if line.startswith(("%end ", "%error ")):
+                block, ours = self._block, self._block_ours
+                self._block = None
+                if ours and self._replies:
+                    # Only an attached client runs commands from stdin.
+                    self._established = True
+                    callback = self._replies.pop(0)
+                    if callback is not None:
+                        callback(block, line.startswith("%end "))
+            else:
+                self._block.append(line)
+            return
+
+        if line.startswith("%begin "):
+            self._block = []
+            # Flag 1 marks output of commands written by this client; the
+            # attach command from argv answers with flag 0.
+            self._block_ours = line.rsplit(" ", 1)[-1] == "1"
+            return
+
+        notification, _, args = line.partition(" ")
+        if notification == "%session-renamed":
+            session_id, _, name = args.partition(" ")
+            for session in self.sessions:
+                if session.id == session_id:
+                    session.name = name
+                    self.emit("changed")
+                    break
+        elif notification in REFRESH_NOTIFICATIONS:
+            self.refresh()
+
+    def _on_client_exit(self):
+        was_established = self._established
+        replies = self._replies
+        self._process = self._stdin = self._stdout = None
+        self._replies = []
+        self._block = None
+        for callback in replies:
+            if callback is not None:
+                callback([], False)
+
+        # Our session went away; others may remain, so attach again once.
+        if was_established and self._reconnect_id is None:
+            self._reconnect_id = GLib.timeout_add(RECONNECT_DELAY_MS, self._reconnect)
+        elif self.sessions:
+            self.sessions = []
+            self.emit("changed")
+
+    def _reconnect(self):
+        self._reconnect_id = None
+        self.connect_client()
+        if self._process is None and self.sessions:
+            self.sessions = []
+            self.emit("changed")
+        return False
+
+    def command(
+        self, line: str, callback: Callable[[list[str], bool], None] | None = None
+    ):
+        """Sends a tmux command; `callback(output_lines, ok)` gets its reply."""
+        if self._process is None:
+            if callback is not None:
+                callback([], False)
+            return
+        try:
+            self._stdin.write_all(f"{line}\n".encode(), None)
+            self._stdin.flush(None)
+        except GLib.Error as e:
+            logger.warning(f"tmux control client write failed: {e.message}")
+            if callback is not None:
+                callback([], False)
+            return
+        self._replies.append(callback)
+
+    def refresh(self):
+        """Re-reads the session list, coalescing requests while one is pending."""
+        if self._listing:
+            self._list_again = True
+            return
+        self._listing = True
+        self.command(
+            f"list-sessions -F {quote(SESSION_FORMAT)}", self._on_sessions_listed
+        )
+
+    def _on_sessions_listed(self, lines: list[str], ok: bool):
+        self._listing = False
+        if self._list_again:
+            self._list_again = False
+            self.refresh()
+            return
+        if not ok:
+            return
+        sessions = [session for session in map(TmuxSession.parse, lines) if session]
+        self.sessions = sessions
+        self.emit("changed")
+
+    def session_names(self) -> list[str]:
+        return [session.name for session in self.sessions]
+
+    def new_session(self, name: str, callback: Callable[[bool], None] | None = None):
+        """Creates a detached session; `callback(ok)` runs once it exists."""
+        done = (lambda _, ok: callback(ok)) if callback is not None else None
+        if self._process is None:
+            # Commands from stdin run after the ones on the command line.
+            self.connect_client(create=name)
+            self.command(f"has-session -t {quote('=' + name)}", done)
+        else:
+            self.command(f"new-session -d -s {quote(name)}", done)
+
+    def rename_session(self, old_name: str, new_name: str):
+        self.command(
+            f"rename-session -t {quote(self._target(old_name))} {quote(new_name)}"
+        )
+
+    def kill_session(self, name: str):
+        self.command(f"kill-session -t {quote(self._target(name))}")
+
+    def _target(self, name: str) -> str:
+        # Session ids are unambiguous where names could prefix-match.
+        for session in self.sessions:
+            if session.name == name:
+                return session.id
+        return f"={name}"
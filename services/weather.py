@@ -0,0 +1,296 @@
+import json
+import os
+import time
+import urllib.parse
+
+import requests
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+import config.data as data
+
+LOCATION_URL = "https://ipinfo.io/json"
+CACHE_FILE = os.path.join(data.CACHE_DIR, "weather.json")
+
+REFRESH_INTERVAL = 600
+LOCATION_TTL = 24 * 60 * 60
+BACKOFF_INITIAL = 30
+BACKOFF_MAX = 30 * 60
+
+# wttr.in weather codes to the emoji its %c format would return.
+WEATHER_SYMBOLS = {
+    "Unknown": "✨",
+    "Cloudy": "☁️",
+    "Fog": "🌫",
+    "HeavyRain": "🌧",
+    "HeavyShowers": "🌧",
+    "HeavySnow": "❄️",
+    "HeavySnowShowers": "❄️",
+    "LightRain": "🌦",
+    "LightShowers": "🌦",
+    "LightSleet": "🌧",
+    "LightSleetShowers": "🌧",
+    "LightSnow": "🌨",
+    "LightSnowShowers": "🌨",
+    "PartlyCloudy": "⛅️",
+    "Sunny": "☀️",
+    "ThunderyHeavyRain": "🌩",
+    "ThunderyShowers": "⛈",
+    "ThunderySnowShowers": "⛈",
+    "VeryCloudy": "☁️",
+}
+
+WWO_CODES = {
+    "113": "Sunny",
+    "116": "PartlyCloudy",
+    "119": "Cloudy",
+    "122": "VeryCloudy",
+    "143": "Fog",
+    "176": "LightShowers",
+    "179": "LightSleetShowers",
+    "182": "LightSleet",
+    "185": "LightSleet",
+    "200": "ThunderyShowers",
+    "227": "LightSnow",
+    "230": "HeavySnow",
+    "248": "Fog",
+    "260": "Fog",
+    "263": "LightShowers",
+    "266": "LightRain",
+    "281": "LightSleet",
+    "284": "LightSleet",
+    "293": "LightRain",
+    "296": "LightRain",
+    "299": "HeavyShowers",
+    "302": "HeavyRain",
+    "305": "HeavyShowers",
+    "308": "HeavyRain",
+    "311": "LightSleet",
+    "314": "LightSleet",
+    "317": "LightSleet",
+    "320": "LightSnow",
+    "323": "LightSnowShowers",
+    "326": "LightSnowShowers",
+    "329": "HeavySnow",
+    "332": "HeavySnow",
+    "335": "HeavySnowShowers",
+    "338": "HeavySnow",
+    "350": "LightSleet",
+    "353": "LightShowers",
+    "356": "HeavyShowers",
+    "359": "HeavyRain",
+    "362": "LightSleetShowers",
+    "365": "LightSleetShowers",
+    "368": "LightSnowShowers",
+    "371": "HeavySnowShowers",
+    "374": "LightSleetShowers",
+    "377": "LightSleet",
+    "386": "ThunderyShowers",
+    "389": "ThunderyHeavyRain",
+    "392": "ThunderySnowShowers",
+    "395": "HeavySnowShowers",
+}
+
+WIND_ARROWS = ["↓", "↙", "←", "↖", "↑", "↗", "→", "↘"]
+
+
+def weather_emoji(condition: dict) -> str:
+    name = WWO_CODES.get(str(condition.get("weatherCode", "")), "Unknown")
+    return WEATHER_SYMBOLS[name]
+
+
+def wind_arrow(condition: dict) -> str:
+    try:
+        degree = int(condition["winddirDegree"])
+    except (KeyError, ValueError):
+        return ""
+    return WIND_ARROWS[int(((degree + 22.5) % 360) / 45)]
+
+
+class WeatherService(Service):
+    """
+    Shared wttr.in client for the bar and desktop weather widgets.
+
+    The location is resolved once (config, then cache, then ipinfo) and the
+    `format=j1` payload is fetched once per refresh for every consumer. The
+    payload is persisted under CACHE_DIR and served from there immediately
+    at startup; a refresh is only made once it is older than `ttl`. Failed
+    fetches keep serving the stale payload and retry with exponential
+    backoff. `base_url` can point at a local stub server.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        if WeatherService.instance is None:
+            WeatherService.instance = WeatherService()
+
+        return WeatherService.instance
+
+    @Signal
+    def changed(self, payload: object) -> None:
+        """Signal emitted with the j1 payload whenever new data is available."""
+
+    @Signal
+    def failed(self) -> None:
+        """Signal emitted when no payload, not even a stale one, is available."""
+
+    def __init__(
+        self,
+        base_url: str = data.WEATHER_BASE_URL,
+        cache_file: str = CACHE_FILE,
+        ttl: int = REFRESH_INTERVAL,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+        self.payload = None
+        self.fetched_at = 0.0
+        self.location = ""
+        self._location_at = 0.0
+
+        self._session = requests.Session()
+        self._fetching = False
+        self._backoff = 0
+        self._timer_id = None
+
+        self._load_cache()
+        if self.payload is not None:
+            GLib.idle_add(self._emit_payload)
+
+        age = time.time() - self.fetched_at
+        self._schedule(max(0, self.ttl - age) if self.payload is not None else 0)
+
+    # Cache
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cached.get("base_url") != self.base_url:
+            return
+        if data.WEATHER_LOCATION and cached.get("location") != data.WEATHER_LOCATION:
+            # Cached for another city; fetch the configured one right away.
+            return
+        self.payload = cached.get("payload")
+        self.fetched_at = cached.get("fetched_at", 0.0)
+        if not data.WEATHER_LOCATION:
+            self.location = cached.get("location", "")
+            self._location_at = cached.get("location_at", 0.0)
+
+    def _write_cache(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(
+                    {
+                        "base_url": self.base_url,
+                        "payload": self.payload,
+                        "fetched_at": self.fetched_at,
+                        "location": self.location,
+                        "location_at": self._location_at,
+                    },
+                    f,
+                )
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write weather cache: {e}")
+
+    # Fetching
+
+    def _schedule(self, seconds: float):
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add_seconds(int(seconds), self._on_timer)
+        return False
+
+    def _on_timer(self):
+        self._timer_id = None
+        self.refresh()
+        return False
+
+    def refresh(self):
+        """Fetch a new payload in the background unless one is in flight."""
+        if self._fetching:
+            return
+        self._fetching = True
+        GLib.Thread.new("weather-fetch", lambda _: self._fetch_in_thread(), None)
+
+    def _resolve_location(self) -> str:
+        if data.WEATHER_LOCATION:
+            # Recorded in the cache so a later location change is noticed;
+            # a zero timestamp makes it re-resolve if the setting is cleared.
+            self.location = data.WEATHER_LOCATION
+            self._location_at = 0.0
+            return self.location
+        if self.location and time.time() - self._location_at < LOCATION_TTL:
+            return self.location
+        response = self._session.get(LOCATION_URL, timeout=5)
+        response.raise_for_status()
+        self.location = response.json().get("city", "")
+        self._location_at = time.time()
+        return self.location
+
+    def _fetch_in_thread(self):
+        fetched = None
+        try:
+            location = self._resolve_location()
+            if not location:
+                raise ValueError("Could not determine a location")
+            response = self._session.get(
+                f"{self.base_url}/{urllib.parse.quote(location)}",
+                params={"format": "j1"},
+                timeout=5,
+            )
+            response.raise_for_status()
+            payload = response.json()
+            payload["current_condition"][0]
+            fetched = payload
+        except (
+            requests.RequestException,
+            ValueError,
+            KeyError,
+            IndexError,
+            TypeError,
+        ) as e:
+            logger.warning(f"Weather fetch failed: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching weather: {e}")
+        finally:
+            # Always report back: the main loop clears `_fetching` and
+            # schedules the next attempt.
+            if fetched is None:
+                GLib.idle_add(self._on_fetch_failed)
+            else:
+                GLib.idle_add(self._on_fetched, fetched)
+
+    def _on_fetched(self, payload):
+        self._fetching = False
+        self._backoff = 0
+        self.payload = payload
+        self.fetched_at = time.time()
+        self._write_cache()
+        self._emit_payload()
+        self._schedule(self.ttl)
+        return False
+
+    def _on_fetch_failed(self):
+        self._fetching = False
+        self._backoff = min(BACKOFF_MAX, max(BACKOFF_INITIAL, self._backoff * 2))
+        if self.payload is None:
+            self.emit("failed")
+        self._schedule(self._backoff)
+        return False
+
+    def _emit_payload(self):
+        if self.payload is not None:
+            self.emit("changed", self.payload)
+        return False
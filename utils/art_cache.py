@@ -0,0 +1,210 @@
+"""
+Album art cache for the player.
+
+Remote covers are stored under CACHE_DIR keyed by a hash of their URL and
+revalidated with conditional requests once they are older than
+`REVALIDATE_AFTER`. The store is trimmed to `MAX_CACHE_BYTES`, dropping the
+least recently used covers first. `file://` covers are read in place.
+
+Decoding and downscaling happen in worker threads; the decoded,
+widget-sized pixbufs are kept in an LRU so switching between tracks of the
+same album does not touch the disk again.
+"""
+
+import email.utils
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+import config.data as data
+from utils.notification_images import PixbufLRU
+
+CACHE_DIRECTORY = os.path.join(data.CACHE_DIR, "album_art")
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+REVALIDATE_AFTER = 24 * 60 * 60
+REQUEST_TIMEOUT = 10
+
+
+def decode_square(path: str, size: int) -> GdkPixbuf.Pixbuf:
+    """Decode `path` straight to a centred `size`x`size` square."""
+    _, width, height = GdkPixbuf.Pixbuf.get_file_info(path)
+    if not width or not height:
+        raise ValueError(f"Unsupported image: {path}")
+    scale = size / min(width, height)
+    scaled_width = max(size, math.ceil(width * scale))
+    scaled_height = max(size, math.ceil(height * scale))
+    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+        path, scaled_width, scaled_height, False
+    )
+    if scaled_width == size and scaled_height == size:
+        return pixbuf
+    return pixbuf.new_subpixbuf(
+        (scaled_width - size) // 2, (scaled_height - size) // 2, size, size
+    ).copy()
+
+
+class AlbumArtCache:
+    def __init__(
+        self,
+        directory: str = CACHE_DIRECTORY,
+        max_bytes: int = MAX_CACHE_BYTES,
+        lru_capacity: int = 16,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.pixbufs = PixbufLRU(lru_capacity)
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="album-art"
+        )
+        # Callbacks waiting on a request already in flight, by (url, size).
+        self._pending = {}
+
+    def load(self, url: str, size: int, callback):
+        """
+        Call `callback(pixbuf)` on the main loop with the cover at `url`
+        decoded to `size`x`size`, or with None if it cannot be loaded.
+        Cached covers are delivered synchronously.
+        """
+        key = (url, size)
+        pixbuf = self.pixbufs.get(key)
+        if pixbuf is not None:
+            callback(pixbuf)
+            return
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+        self._pending[key] = [callback]
+        self._executor.submit(self._load_in_thread, url, size)
+
+    def _load_in_thread(self, url: str, size: int):
+        pixbuf = None
+        try:
+            path = self._resolve(url)
+            if path:
+                pixbuf = decode_square(path, size)
+        except Exception as e:
+            logger.warning(f"Could not load album art {url}: {e}")
+        GLib.idle_add(self._deliver, url, size, pixbuf)
+
+    def _deliver(self, url: str, size: int, pixbuf):
+        key = (url, size)
+        if pixbuf is not None:
+            self.pixbufs.put(key, pixbuf)
+        for callback in self._pending.pop(key, []):
+            callback(pixbuf)
+        return False
+
+    def _resolve(self, url: str) -> str | None:
+        """Local path holding the image for `url`, fetching it if needed."""
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme in ("http", "https"):
+            return self._fetch(url)
+        if parsed.scheme == "file":
+            return urllib.parse.unquote(parsed.path)
+        return url if os.path.isfile(url) else None
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode()).hexdigest()[:32]
+        path = os.path.join(self.directory, digest)
+        return path, f"{path}.json"
+
+    def _fetch(self, url: str) -> str | None:
+        path, meta_path = self._paths(url)
+        meta = {}
+        if os.path.exists(path):
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+            if time.time() - meta.get("checked", 0) < REVALIDATE_AFTER:
+                os.utime(path)
+                return path
+
+        request = urllib.request.Request(url)
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                body = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            # Not modified: keep the stored copy and restart its clock.
+            meta["checked"] = time.time()
+            self._write_meta(meta_path, meta)
+            os.utime(path)
+            return path
+        except (urllib.error.URLError, OSError):
+            # Offline: a stale cover is better than none.
+            if os.path.exists(path):
+                return path
+            raise
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Workers may fetch the same cover for different sizes at once.
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        self._write_meta(
+            meta_path,
+            {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified")
+                or email.utils.formatdate(usegmt=True),
+                "checked": time.time(),
+            },
+        )
+        self._trim()
+        return path
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: dict):
+        tmp = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _trim(self):
+        """Drop the least recently used covers until the store fits."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith((".json", ".tmp")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, file_size, path in entries:
+            if total <= self.max_bytes:
+                break
+            for stale in (path, f"{path}.json"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+            total -= file_size
+
+
+art_cache = AlbumArtCache()
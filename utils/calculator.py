@@ -0,0 +1,368 @@
+"""
+Expression engine for the launcher calculator.
+
+Input is parsed with `ast` and only arithmetic, whitelisted names and calls
+to whitelisted functions are accepted. Evaluation happens in a separate
+worker process with a memory limit and is killed if it runs longer than
+`EVAL_TIMEOUT`, so inputs like `arange(1e12)` or `9**9**9` cannot freeze
+or exhaust the shell. Results are memoized by expression.
+
+Run as a script, this module is the worker: it reads one JSON request per
+line on stdin and answers with one JSON line on stdout.
+"""
+
+import ast
+import json
+import math
+import operator
+import os
+import re
+import select
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+
+EVAL_TIMEOUT = 2.0
+MEMORY_LIMIT_BYTES = 512 * 1024 * 1024
+MAX_ARRAY_SIZE = 1_000_000
+MAX_FACTORIAL = 5000
+# Larger integers are shown in scientific notation; Python refuses to
+# convert ints of more than 4300 digits to str.
+MAX_EXACT_DIGITS = 4000
+CACHE_SIZE = 256
+
+REPLACEMENTS = {
+    "^": "**",
+    "×": "*",
+    "÷": "/",
+    "π": "pi",
+    "[": "(",
+    "]": ")",
+    "{": "(",
+    "}": ")",
+}
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+CONSTANTS = {"pi", "e", "tau", "inf"}
+
+FUNCTIONS = {
+    "sin",
+    "cos",
+    "tan",
+    "asin",
+    "acos",
+    "atan",
+    "sinh",
+    "cosh",
+    "tanh",
+    "log",
+    "ln",
+    "log2",
+    "sqrt",
+    "abs",
+    "exp",
+    "floor",
+    "ceil",
+    "round",
+    "factorial",
+    "min",
+    "max",
+    "sum",
+    "mean",
+    "arange",
+    "linspace",
+    "array",
+}
+
+
+class CalculatorError(Exception):
+    """An expression that cannot be evaluated, with a user-facing message."""
+
+
+def normalize(text: str) -> str:
+    """Rewrites calculator notation (`^`, `×`, `n!`, ...) into Python syntax."""
+    expr = text.strip()
+    for old, new in REPLACEMENTS.items():
+        expr = expr.replace(old, new)
+    return re.sub(r"(\d+)!", r"factorial(\1)", expr)
+
+
+def compile_expression(expr: str) -> ast.Expression:
+    """Parses `expr` and rejects anything outside the whitelist."""
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError:
+        raise CalculatorError("Invalid expression")
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load, ast.Tuple, ast.List)):
+            continue
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(
+                node.value, (int, float, complex)
+            ):
+                raise CalculatorError("Only numbers are allowed")
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in BINARY_OPERATORS:
+                raise CalculatorError("Unsupported operator")
+        elif isinstance(node, ast.UnaryOp):
+            if type(node.op) not in UNARY_OPERATORS:
+                raise CalculatorError("Unsupported operator")
+        elif isinstance(node, ast.operator) or isinstance(node, ast.unaryop):
+            continue
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+                raise CalculatorError("Unknown function")
+            if node.keywords:
+                raise CalculatorError("Keyword arguments are not supported")
+        elif isinstance(node, ast.Name):
+            if node.id not in CONSTANTS and node.id not in FUNCTIONS:
+                raise CalculatorError(f"Unknown name '{node.id}'")
+        else:
+            raise CalculatorError("Unsupported expression")
+    return tree
+
+
+# --- Worker side ---
+
+
+def _namespace():
+    import numpy as np
+
+    def bounded(size):
+        if not 0 <= size <= MAX_ARRAY_SIZE:
+            raise CalculatorError(f"Arrays are limited to {MAX_ARRAY_SIZE} items")
+
+    def arange(*args):
+        start, stop, step = (0, args[0], 1) if len(args) == 1 else (*args, 1)[:3]
+        if step == 0:
+            raise CalculatorError("arange step cannot be zero")
+        bounded(math.ceil((stop - start) / step))
+        return np.arange(*args)
+
+    def linspace(start, stop, num=50):
+        bounded(num)
+        return np.linspace(start, stop, int(num))
+
+    def array(*items):
+        return np.array(items[0] if len(items) == 1 else items)
+
+    def reduction(function):
+        # Builtin semantics: max(1, 2) compares its arguments, max(x) reduces
+        # one array. numpy would take the second argument as the axis.
+        return lambda *args: function(args[0] if len(args) == 1 else args)
+
+    def factorial(n):
+        if n != int(n) or not 0 <= n <= MAX_FACTORIAL:
+            raise CalculatorError(
+                f"factorial() needs an integer between 0 and {MAX_FACTORIAL}"
+            )
+        return math.factorial(int(n))
+
+    return {
+        "pi": np.pi,
+        "e": np.e,
+        "tau": math.tau,
+        "inf": np.inf,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "asin": np.arcsin,
+        "acos": np.arccos,
+        "atan": np.arctan,
+        "sinh": np.sinh,
+        "cosh": np.cosh,
+        "tanh": np.tanh,
+        "log": np.log10,
+        "ln": np.log,
+        "log2": np.log2,
+        "sqrt": np.sqrt,
+        "abs": np.abs,
+        "exp": np.exp,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "round": np.round,
+        "factorial": factorial,
+        "min": reduction(np.min),
+        "max": reduction(np.max),
+        "sum": reduction(np.sum),
+        "mean": np.mean,
+        "arange": arange,
+        "linspace": linspace,
+        "array": array,
+    }
+
+
+def _evaluate_node(node, namespace):
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body, namespace)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return namespace[node.id]
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return [_evaluate_node(item, namespace) for item in node.elts]
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand, namespace))
+    if isinstance(node, ast.BinOp):
+        left = _evaluate_node(node.left, namespace)
+        right = _evaluate_node(node.right, namespace)
+        return BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.Call):
+        function = namespace[node.func.id]
+        return function(*(_evaluate_node(arg, namespace) for arg in node.args))
+    raise CalculatorError("Unsupported expression")
+
+
+def format_result(result) -> str:
+    import numpy as np
+
+    if isinstance(result, np.ndarray):
+        if result.size > 10:
+            return f"Array of shape {result.shape}"
+        return str(result)
+    if isinstance(result, (int, float, np.number)) and not isinstance(
+        result, (complex, np.complexfloating)
+    ):
+        if isinstance(result, (int, np.integer)) or float(result).is_integer():
+            value = int(result)
+            if value.bit_length() * math.log10(2) > MAX_EXACT_DIGITS:
+                return _scientific(value)
+            return str(value)
+        return f"{float(result):.10g}"
+    return str(result)
+
+
+def _scientific(value: int) -> str:
+    exponent = math.floor(math.log10(abs(value)))
+    mantissa = 10 ** (math.log10(abs(value)) - exponent)
+    if round(mantissa, 9) >= 10:
+        mantissa, exponent = mantissa / 10, exponent + 1
+    return f"{'-' if value < 0 else ''}{mantissa:.10g}e+{exponent}"
+
+
+def _worker_main():
+    import resource
+
+    namespace = _namespace()
+    # Limit the heap only after numpy is loaded so the import itself fits.
+    resource.setrlimit(resource.RLIMIT_DATA, (MEMORY_LIMIT_BYTES, MEMORY_LIMIT_BYTES))
+
+    for line in sys.stdin:
+        try:
+            expr = json.loads(line)["expr"]
+            result = _evaluate_node(compile_expression(expr), namespace)
+            reply = {"result": format_result(result)}
+        except MemoryError:
+            reply = {"error": "Out of memory"}
+        except Exception as e:
+            reply = {"error": str(e) or type(e).__name__}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+# --- Launcher side ---
+
+
+class Calculator:
+    """
+    Evaluates expressions in the worker process.
+
+    `evaluate` blocks for up to `timeout` seconds and must be called off the
+    GTK main loop. A worker that times out or dies is killed and replaced
+    on the next call.
+    """
+
+    def __init__(self, timeout: float = EVAL_TIMEOUT, cache_size: int = CACHE_SIZE):
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._process = None
+
+    def _ensure_worker(self):
+        if self._process is None or self._process.poll() is not None:
+            env = dict(os.environ, OPENBLAS_NUM_THREADS="1", OMP_NUM_THREADS="1")
+            self._process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                env=env,
+            )
+        return self._process
+
+    def _kill_worker(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def _remember(self, expr: str, outcome):
+        self._cache[expr] = outcome
+        self._cache.move_to_end(expr)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def evaluate(self, text: str) -> str:
+        """Formatted result of `text`; raises CalculatorError otherwise."""
+        expr = normalize(text)
+        with self._lock:
+            outcome = self._cache.get(expr)
+            if outcome is None:
+                outcome = self._evaluate_uncached(expr)
+            else:
+                self._cache.move_to_end(expr)
+        if "error" in outcome:
+            raise CalculatorError(outcome["error"])
+        return outcome["result"]
+
+    def _evaluate_uncached(self, expr: str) -> dict:
+        try:
+            compile_expression(expr)
+        except CalculatorError as e:
+            outcome = {"error": str(e)}
+            self._remember(expr, outcome)
+            return outcome
+
+        process = self._ensure_worker()
+        ready = []
+        try:
+            process.stdin.write(json.dumps({"expr": expr}) + "\n")
+            process.stdin.flush()
+            ready, _, _ = select.select([process.stdout], [], [], self.timeout)
+            line = process.stdout.readline() if ready else ""
+        except OSError:
+            line = ""
+        if not line:
+            # Timed out or killed by the memory limit; not worth caching.
+            self._kill_worker()
+            return {"error": "Took too long" if not ready else "Out of memory"}
+
+        outcome = json.loads(line)
+        self._remember(expr, outcome)
+        return outcome
+
+    def close(self):
+        with self._lock:
+            self._kill_worker()
+
+
+if __name__ == "__main__":
+    _worker_main()
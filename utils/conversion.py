@@ -1,5 +1,40 @@
+import json
+import os
+import threading
+import time
+
 import requests
 
+import config.data as data
+
+RATES_CACHE_FILE = os.path.join(data.CACHE_DIR, "currency_rates.json")
+RATES_MAX_AGE = 24 * 60 * 60
+
+# Orden en el que se buscan las unidades; define quién gana si una unidad
+# aparece en varios charts (p. ej. "oz" es peso y volumen).
+CHART_NAMES = (
+    "WEIGHT_CHART",
+    "LENGTH_CHART",
+    "TEMPERATURE_CHART",
+    "TIME_CHART",
+    "LIQUID_VOLUME_CHART",
+    "STORAGE_TYPE_CHART",
+    "ANGLE_CHART",
+    "ENERGY_CHART",
+    "SPEED_CHART",
+    "PRESSURE_CHART",
+    "FORCE_CHART",
+    "POWER_CHART",
+    "VOLTAGE_CHART",
+    "CURRENT_CHART",
+    "RESISTANCE_CHART",
+    "CAPACITANCE_CHART",
+    "INDUCTANCE_CHART",
+    "FREQUENCY_CHART",
+    "LUMINANCE_CHART",
+    "AREA_CHART",
+)
+
 
 class Units():
     def __init__(self):
@@ -303,62 +338,149 @@ class Units():
         # Ya no usamos currency_converter aquí.
 
 
+class CurrencyRates():
+    """
+    Tasas de floatrates.com cacheadas en CACHE_DIR.
+
+    Cada moneda base se descarga una vez al día; mientras tanto (o sin
+    conexión) se usan las tasas guardadas, refrescándolas en segundo plano.
+    Los métodos bloquean en la red sólo si no hay ninguna tasa utilizable,
+    así que deben llamarse fuera del hilo de GTK.
+    """
+
+    def __init__(self, cache_file: str = RATES_CACHE_FILE, max_age: float = RATES_MAX_AGE):
+        self.cache_file = cache_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._session = requests.Session()
+        # {"usd": {"fetched_at": 1700000000.0, "rates": {"ars": 870.5, ...}}}
+        self._bases: dict[str, dict] = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        with self._lock:
+            snapshot = json.dumps(self._bases)
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(snapshot)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"Error writing currency rates cache: {e}")
+
+    def _fetch(self, base: str) -> dict[str, float]:
+        url = f"https://www.floatrates.com/daily/{base}.json"
+        resp = self._session.get(url, timeout=5)
+        if resp.status_code != 200:
+            raise ValueError(f"Error al obtener datos de floatrates para {base.upper()}")
+        rates = {code: entry["rate"] for code, entry in resp.json().items()}
+        with self._lock:
+            self._bases[base] = {"fetched_at": time.time(), "rates": rates}
+        self._save()
+        return rates
+
+    def _refresh_in_background(self, base: str):
+        with self._lock:
+            if base in self._refreshing:
+                return
+            self._refreshing.add(base)
+
+        def refresh():
+            try:
+                self._fetch(base)
+            except (requests.RequestException, ValueError) as e:
+                print(f"Keeping cached {base.upper()} rates: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(base)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _cached_rate(self, from_lower: str, to_lower: str) -> float | None:
+        """Tasa desde la caché (aunque esté vieja), o None si no hay ninguna."""
+        with self._lock:
+            bases = [from_lower] + [base for base in self._bases if base != from_lower]
+            for base in bases:
+                entry = self._bases.get(base)
+                if not entry:
+                    continue
+                rates = dict(entry["rates"], **{base: 1.0})
+                # Cruce a través de otra base que conozca ambas monedas.
+                if rates.get(from_lower) and to_lower in rates:
+                    rate = rates[to_lower] / rates[from_lower]
+                    stale = time.time() - entry["fetched_at"] > self.max_age
+                    break
+            else:
+                return None
+        if stale:
+            self._refresh_in_background(base)
+        return rate
+
+    def rate(self, from_code: str, to_code: str) -> float:
+        from_lower = from_code.lower()
+        to_lower = to_code.lower()
+        if from_lower == to_lower:
+            return 1.0
+
+        rate = self._cached_rate(from_lower, to_lower)
+        if rate is not None:
+            return rate
+
+        try:
+            rates = self._fetch(from_lower)
+        except requests.RequestException as e:
+            raise ValueError(f"Sin tasas para {from_code} (sin conexión): {e}")
+        if to_lower not in rates:
+            raise ValueError(f"Moneda destino '{to_code}' no encontrada en la respuesta de floatrates para '{from_code}'")
+        return rates[to_lower]
+
+
 class Conversion():
     def __init__(self):
         self.units = Units()
+        self.rates = CurrencyRates()
+        # unidad -> ((chart, factor), ...) en el orden de CHART_NAMES
+        self._index: dict[str, tuple[tuple[str, object], ...]] = {}
+        for chart_name in CHART_NAMES:
+            for unit, factor in getattr(self.units, chart_name).items():
+                self._index[unit] = self._index.get(unit, ()) + ((chart_name, factor),)
 
     def convert(self, value: float, from_type: str, to_type: str):
         """
         Generalized conversion function que funciona con todas las categorías,
         incluyendo moneda via floatrates.com.
         """
-        # Colección de todos los charts no-monedas
-        charts = {
-            "WEIGHT_CHART": self.units.WEIGHT_CHART,
-            "LENGTH_CHART": self.units.LENGTH_CHART,
-            "TEMPERATURE_CHART": self.units.TEMPERATURE_CHART,
-            "TIME_CHART": self.units.TIME_CHART,
-            "LIQUID_VOLUME_CHART": self.units.LIQUID_VOLUME_CHART,
-            "STORAGE_TYPE_CHART": self.units.STORAGE_TYPE_CHART,
-            "ANGLE_CHART": self.units.ANGLE_CHART,
-            "ENERGY_CHART": self.units.ENERGY_CHART,
-            "SPEED_CHART": self.units.SPEED_CHART,  
-            "PRESSURE_CHART": self.units.PRESSURE_CHART,
-            "FORCE_CHART": self.units.FORCE_CHART,
-            "POWER_CHART": self.units.POWER_CHART,
-            "VOLTAGE_CHART": self.units.VOLTAGE_CHART,
-            "CURRENT_CHART": self.units.CURRENT_CHART,
-            "RESISTANCE_CHART": self.units.RESISTANCE_CHART,
-            "CAPACITANCE_CHART": self.units.CAPACITANCE_CHART,
-            "INDUCTANCE_CHART": self.units.INDUCTANCE_CHART,
-            "FREQUENCY_CHART": self.units.FREQUENCY_CHART,
-            "LUMINANCE_CHART": self.units.LUMINANCE_CHART,
-            "AREA_CHART": self.units.AREA_CHART,
-        }
-
-        # 1) Revisar si está en alguno de los charts (no monedas)
-        for chart_name, chart in charts.items():
-            if from_type in chart and to_type in chart:
-                # Temperaturas usan lambdas
-                if chart_name == "TEMPERATURE_CHART":
-                    if from_type == to_type:
-                        return value
-                    to_kelvin = chart[from_type][0]
-                    from_kelvin = chart[to_type][1]
-                    return from_kelvin(to_kelvin(value))
-                
-                # Handle WEIGHT_CHART separately (tuple values)
-                if chart_name == "WEIGHT_CHART":
-                    if from_type == to_type:
-                        return value
-                    to_kg = chart[from_type][0]
-                    from_kg = chart[to_type][1]
-                    return value * to_kg * from_kg
-
-                # Cualquier otro chart numérico
-                if from_type == to_type:
-                    return value
-                return value * (chart[from_type] / chart[to_type])
+        # 1) Buscar un chart (no monedas) que tenga ambas unidades
+        to_factors = dict(self._index.get(to_type, ()))
+        for chart_name, from_factor in self._index.get(from_type, ()):
+            if chart_name not in to_factors:
+                continue
+            to_factor = to_factors[chart_name]
+            if from_type == to_type:
+                return value
+
+            # Temperaturas usan lambdas
+            if chart_name == "TEMPERATURE_CHART":
+                to_kelvin = from_factor[0]
+                from_kelvin = to_factor[1]
+                return from_kelvin(to_kelvin(value))
+
+            # Handle WEIGHT_CHART separately (tuple values)
+            if chart_name == "WEIGHT_CHART":
+                to_kg = from_factor[0]
+                from_kg = to_factor[1]
+                return value * to_kg * from_kg
+
+            # Cualquier otro chart numérico
+            return value * (from_factor / to_factor)
 
         # 2) Si ambos son códigos de moneda (p. ej. “USD”, “ARS”)
         #    asumimos que están en mayúsculas y tienen 3 letras.
@@ -370,27 +492,9 @@ class Conversion():
 
     def _convert_currency_via_floatrates(self, value: float, from_code: str, to_code: str) -> float:
         """
-        Convierte usando el JSON de floatrates.com:
-        - Hace GET a https://www.floatrates.com/daily/{from_lower}.json
-        - Toma el rate de la clave to_lower y multiplica.
+        Convierte usando las tasas de floatrates.com (cacheadas, ver CurrencyRates).
         """
-        from_lower = from_code.lower()
-        to_lower = to_code.lower()
-
-        if from_lower == to_lower:
-            return value
-
-        url = f"https://www.floatrates.com/daily/{from_lower}.json"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
-            raise ValueError(f"Error al obtener datos de floatrates para {from_code}")
-
-        data = resp.json()
-        if to_lower not in data:
-            raise ValueError(f"Moneda destino '{to_code}' no encontrada en la respuesta de floatrates para '{from_code}'")
-
-        rate = data[to_lower]["rate"]
-        return value * rate
+        return value * self.rates.rate(from_code, to_code)
 
     def parse_input_and_convert(self, input: str):
         parts = input.split()
@@ -0,0 +1,229 @@
+"""
+Search index for the emoji picker.
+
+`assets/emoji.json` is compiled once into a compact marshal file under
+CACHE_DIR holding the emoji in source order, their names, a sorted token
+table with postings for prefix lookups and a trigram table for substring
+lookups. The file is rebuilt when the source changes (mtime and size) and
+is otherwise loaded with a single read.
+
+Picks are counted in `emoji_usage.json` so results can be ranked by use and
+the picker can open on recently used emoji.
+"""
+
+import bisect
+import json
+import marshal
+import os
+import re
+import time
+
+from loguru import logger
+
+import config.data as data
+
+INDEX_FORMAT = 1
+INDEX_FILE = os.path.join(data.CACHE_DIR, "emoji_index.marshal")
+USAGE_FILE = os.path.join(data.CACHE_DIR, "emoji_usage.json")
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.casefold())
+
+
+def trigrams(token: str):
+    return {token[i : i + 3] for i in range(len(token) - 2)}
+
+
+def _compile(source: str) -> dict:
+    with open(source, "rb") as f:
+        emojis = json.load(f)
+
+    chars, names = [], []
+    postings = {}
+    for emoji_id, (char, info) in enumerate(emojis.items()):
+        chars.append(char)
+        names.append(info.get("name", ""))
+        words = " ".join(
+            [
+                info.get("name", ""),
+                info.get("group", ""),
+                info.get("slug", ""),
+                " ".join(info.get("keywords", [])),
+            ]
+        )
+        for token in set(tokenize(words.replace("_", " "))):
+            postings.setdefault(token, []).append(emoji_id)
+
+    tokens = sorted(postings)
+    grams = {}
+    for token_id, token in enumerate(tokens):
+        for gram in trigrams(token):
+            grams.setdefault(gram, []).append(token_id)
+
+    return {
+        "chars": chars,
+        "names": names,
+        "tokens": tokens,
+        "postings": [tuple(postings[token]) for token in tokens],
+        "trigrams": {gram: tuple(ids) for gram, ids in grams.items()},
+    }
+
+
+class EmojiIndex:
+    def __init__(self, tables: dict):
+        self.chars: list[str] = tables["chars"]
+        self.names: list[str] = tables["names"]
+        self._tokens: list[str] = tables["tokens"]
+        self._postings: list[tuple] = tables["postings"]
+        self._trigrams: dict[str, tuple] = tables["trigrams"]
+        self.ids = {char: emoji_id for emoji_id, char in enumerate(self.chars)}
+
+    @classmethod
+    def empty(cls) -> "EmojiIndex":
+        return cls(
+            {"chars": [], "names": [], "tokens": [], "postings": [], "trigrams": {}}
+        )
+
+    @classmethod
+    def load(cls, source: str, index_file: str = INDEX_FILE) -> "EmojiIndex":
+        """Index for `source`, compiling and caching it if needed."""
+        stat = os.stat(source)
+        key = (INDEX_FORMAT, stat.st_mtime_ns, stat.st_size)
+        try:
+            with open(index_file, "rb") as f:
+                cached_key, tables = marshal.loads(f.read())
+            if tuple(cached_key) == key:
+                return cls(tables)
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+
+        started = time.monotonic()
+        tables = _compile(source)
+        try:
+            os.makedirs(os.path.dirname(index_file), exist_ok=True)
+            tmp = f"{index_file}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(marshal.dumps((key, tables)))
+            os.replace(tmp, index_file)
+        except OSError as e:
+            logger.warning(f"Could not cache emoji index: {e}")
+        logger.info(
+            f"Compiled emoji index in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        return cls(tables)
+
+    def __len__(self):
+        return len(self.chars)
+
+    def _tokens_matching(self, term: str) -> set[int]:
+        """Ids of tokens starting with `term`, or containing it if 3+ long."""
+        start = bisect.bisect_left(self._tokens, term)
+        matches = set()
+        for token_id in range(start, len(self._tokens)):
+            if not self._tokens[token_id].startswith(term):
+                break
+            matches.add(token_id)
+
+        if len(term) >= 3:
+            candidates = None
+            for gram in trigrams(term):
+                ids = self._trigrams.get(gram, ())
+                candidates = set(ids) if candidates is None else candidates & set(ids)
+                if not candidates:
+                    break
+            for token_id in candidates or ():
+                if term in self._tokens[token_id]:
+                    matches.add(token_id)
+        return matches
+
+    def search(self, query: str) -> tuple[list[int], set[int]]:
+        """
+        Emoji ids matching every term of `query` in source order, and the
+        subset where every term matched as a word prefix.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return list(range(len(self.chars))), set()
+
+        result = None
+        prefixed = None
+        for term in terms:
+            emoji_ids = set()
+            prefix_ids = set()
+            for token_id in self._tokens_matching(term):
+                postings = self._postings[token_id]
+                emoji_ids.update(postings)
+                if self._tokens[token_id].startswith(term):
+                    prefix_ids.update(postings)
+            result = emoji_ids if result is None else result & emoji_ids
+            prefixed = prefix_ids if prefixed is None else prefixed & prefix_ids
+            if not result:
+                return [], set()
+        return sorted(result), prefixed & result
+
+
+class EmojiUsage:
+    """Pick counts and last-use times, persisted as JSON."""
+
+    def __init__(self, path: str = USAGE_FILE):
+        self.path = path
+        try:
+            with open(path) as f:
+                self._usage: dict[str, list] = json.load(f)
+        except (OSError, ValueError):
+            self._usage = {}
+
+    def count(self, char: str) -> int:
+        return self._usage.get(char, (0, 0))[0]
+
+    def record(self, char: str):
+        count, _ = self._usage.get(char, (0, 0))
+        self._usage[char] = [count + 1, time.time()]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._usage, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save emoji usage: {e}")
+
+    def recent(self, limit: int) -> list[str]:
+        """Most recently picked emoji, newest first."""
+        ordered = sorted(
+            self._usage, key=lambda char: self._usage[char][1], reverse=True
+        )
+        return ordered[:limit]
+
+
+def recent_ids(index: EmojiIndex, usage: EmojiUsage, limit: int) -> list[int]:
+    return [index.ids[char] for char in usage.recent(limit) if char in index.ids]
+
+
+def rank(
+    index: EmojiIndex, usage: EmojiUsage, query: str, recent_limit: int
+) -> list[int]:
+    """
+    Emoji ids to show for `query`. Matches are ordered by use, then by
+    whether every term matched a word start, then source order. An empty
+    query starts with the `recent_limit` most recent picks.
+    """
+    if not tokenize(query):
+        recent = recent_ids(index, usage, recent_limit)
+        seen = set(recent)
+        return recent + [
+            emoji_id for emoji_id in range(len(index)) if emoji_id not in seen
+        ]
+
+    matches, prefixed = index.search(query)
+    return sorted(
+        matches,
+        key=lambda emoji_id: (
+            -usage.count(index.chars[emoji_id]),
+            emoji_id not in prefixed,
+            emoji_id,
+        ),
+    )
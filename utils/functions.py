@@ -1,5 +1,7 @@
+import ctypes
 import datetime
 import os
+import signal
 import shutil
 import subprocess
 from typing import Dict, List, Literal
@@ -230,6 +232,16 @@ def unique_list(lst) -> List:
     return list(set(lst))
 
 
+def set_death_signal():
+    """
+    Set the death signal of the child process to SIGTERM so that if the parent
+    process is killed, the child is automatically terminated.
+    """
+    libc = ctypes.CDLL("libc.so.6")
+    PR_SET_PDEATHSIG = 1
+    libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+
+
 # Function to check if an app is running
 def is_app_running(app_name: str) -> bool:
     return len(exec_shell_command(f"pidof {app_name}")) != 0
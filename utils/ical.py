@@ -0,0 +1,540 @@
+"""
+Minimal iCalendar (RFC 5545) reader for the calendar event index.
+
+Only VEVENT components are read, and only the properties the calendar
+shows or needs for recurrences: UID, SUMMARY, LOCATION, STATUS, DTSTART,
+DTEND or DURATION, RECURRENCE-ID, RRULE, RDATE and EXDATE. Files are read
+line by line, so a large calendar is never held in memory as a whole.
+
+Times are stored as Unix timestamps. Recurrence rules are kept as text and
+expanded on demand for a given range, in the wall time of the event's TZID
+so occurrences keep their local time across DST changes. The supported RRULE
+parts are FREQ (DAILY to YEARLY), INTERVAL, COUNT, UNTIL, WKST, BYDAY (with
+ordinals), BYMONTHDAY, BYMONTH and BYSETPOS; other parts are ignored.
+"""
+
+import calendar
+import functools
+import heapq
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, NamedTuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+FREQUENCIES = {"DAILY", "WEEKLY", "MONTHLY", "YEARLY"}
+# Bound on the periods walked for one expansion, for rules whose filters
+# never match (e.g. BYMONTH=2;BYMONTHDAY=30).
+MAX_PERIODS = 20000
+
+_DURATION = re.compile(
+    r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+_BYDAY = re.compile(r"([+-]?\d+)?(MO|TU|WE|TH|FR|SA|SU)$")
+_ESCAPE = re.compile(r"\\(.)")
+
+
+class Rule(NamedTuple):
+    """How a recurring event repeats; times are wall-clock in `tzid`."""
+
+    dtstart: tuple  # (year, month, day, hour, minute, second)
+    tzid: str
+    rrule: str
+    exdates: tuple  # timestamps of excluded starts
+    rdates: tuple  # timestamps of extra starts, sorted
+
+
+class Event(NamedTuple):
+    uid: str
+    summary: str
+    location: str
+    all_day: bool
+    start: float
+    # For recurring events, the end of the last occurrence (None if endless).
+    end: float | None
+    # Seconds for timed events, days for all-day ones.
+    duration: float
+    # Start of the occurrence this event replaces, if it is an exception.
+    recurrence_id: float | None
+    cancelled: bool
+    rule: Rule | None
+
+    @classmethod
+    def from_record(cls, record: tuple) -> "Event":
+        rule = record[-1]
+        return cls._make(record[:-1] + (Rule._make(rule) if rule else None,))
+
+    def to_record(self) -> tuple:
+        """Plain tuple form, for marshal."""
+        return tuple(self[:-1]) + (tuple(self.rule) if self.rule else None,)
+
+
+# --- Time helpers ---
+
+
+@functools.lru_cache(maxsize=64)
+def zone(tzid: str):
+    """tzinfo for a TZID; None (local time) for floating or unknown zones."""
+    if tzid == "UTC":
+        return timezone.utc
+    candidates = [tzid]
+    if "/" in tzid:
+        # Prefixed ids such as /mozilla.org/20050126_1/Europe/Berlin.
+        candidates.append("/".join(tzid.split("/")[-2:]))
+    for candidate in candidates:
+        try:
+            return ZoneInfo(candidate)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return None
+
+
+def to_timestamp(wall: datetime, tzid: str) -> float:
+    return wall.replace(tzinfo=zone(tzid) if tzid else None).timestamp()
+
+
+def to_wall(timestamp: float, tzid: str) -> datetime:
+    tz = zone(tzid) if tzid else None
+    return datetime.fromtimestamp(timestamp, tz).replace(tzinfo=None)
+
+
+def overlaps(start: float, end: float, range_start: float, range_end: float) -> bool:
+    # Zero-length events still belong to the range they start in.
+    return start < range_end and (end > range_start or start >= range_start)
+
+
+# --- Content lines ---
+
+
+def unfold(lines) -> Iterator[str]:
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def split_line(line: str) -> tuple[str, dict, str] | None:
+    """Name, parameters and value of a content line."""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            break
+    else:
+        return None
+    name, *param_list = line[:i].split(";")
+    params = {}
+    for param in param_list:
+        key, _, value = param.partition("=")
+        params[key.upper()] = value.strip('"')
+    return name.upper(), params, line[i + 1 :]
+
+
+def unescape(text: str) -> str:
+    return _ESCAPE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def parse_time(value: str, params: dict) -> tuple[datetime, str, bool]:
+    """Wall time, TZID ("UTC", or "" for floating) and whether it is a date."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime(int(value[:4]), int(value[4:6]), int(value[6:8])), "", True
+    tzid = params.get("TZID", "")
+    if value.endswith("Z"):
+        value, tzid = value[:-1], "UTC"
+    wall = datetime(
+        int(value[:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[9:11]),
+        int(value[11:13]),
+        int(value[13:15] or 0),
+    )
+    return wall, tzid, False
+
+
+def parse_duration(value: str) -> timedelta:
+    match = _DURATION.match(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid duration {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -delta if sign == "-" else delta
+
+
+def _timestamps(entries) -> Iterator[float]:
+    for params, value in entries:
+        if params.get("VALUE") == "PERIOD":
+            continue
+        for piece in value.split(","):
+            wall, tzid, is_date = parse_time(piece, params)
+            yield to_timestamp(wall, "" if is_date else tzid)
+
+
+# --- Files ---
+
+
+def read_calendar(path: str) -> tuple[str | None, list[Event]]:
+    """The X-WR-CALNAME of an .ics file and its events; bad events are skipped."""
+    name = None
+    events = []
+    props = None
+    nested = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in unfold(f):
+            parsed = split_line(line)
+            if parsed is None:
+                continue
+            key, params, value = parsed
+            if key == "BEGIN":
+                if props is not None:
+                    nested += 1  # e.g. VALARM
+                elif value.strip().upper() == "VEVENT":
+                    props, nested = {}, 0
+            elif key == "END":
+                if props is None:
+                    continue
+                if nested:
+                    nested -= 1
+                    continue
+                try:
+                    event = make_event(props)
+                except (KeyError, ValueError, IndexError, OverflowError):
+                    event = None
+                if event is not None:
+                    events.append(event)
+                props = None
+            elif props is not None:
+                if not nested:
+                    props.setdefault(key, []).append((params, value))
+            elif key == "X-WR-CALNAME":
+                name = unescape(value)
+    return name, events
+
+
+def make_event(props: dict) -> Event | None:
+    def text(key):
+        entries = props.get(key)
+        return unescape(entries[0][1]) if entries else ""
+
+    params, value = props["DTSTART"][0]
+    wall, tzid, all_day = parse_time(value, params)
+    if all_day:
+        tzid = ""
+    cancelled = text("STATUS").upper() == "CANCELLED"
+
+    if "DTEND" in props:
+        end_wall, end_tzid, _ = parse_time(props["DTEND"][0][1], props["DTEND"][0][0])
+        if all_day:
+            duration = (end_wall - wall).days
+        else:
+            duration = to_timestamp(end_wall, end_tzid) - to_timestamp(wall, tzid)
+    elif "DURATION" in props:
+        delta = parse_duration(props["DURATION"][0][1])
+        duration = delta.days if all_day else delta.total_seconds()
+    else:
+        duration = 1 if all_day else 0
+    duration = max(duration, 1 if all_day else 0)
+
+    recurrence_id = None
+    if "RECURRENCE-ID" in props:
+        params, value = props["RECURRENCE-ID"][0]
+        rid_wall, rid_tzid, rid_is_date = parse_time(value, params)
+        recurrence_id = to_timestamp(rid_wall, "" if rid_is_date else rid_tzid)
+
+    start = to_timestamp(wall, tzid)
+    rule = None
+    if recurrence_id is None and ("RRULE" in props or "RDATE" in props):
+        if cancelled:
+            return None
+        rule = Rule(
+            dtstart=wall.timetuple()[:6],
+            tzid=tzid,
+            rrule=props["RRULE"][0][1].strip() if "RRULE" in props else "",
+            exdates=tuple(_timestamps(props.get("EXDATE", ()))),
+            rdates=tuple(sorted(_timestamps(props.get("RDATE", ())))),
+        )
+
+    event = Event(
+        uid=text("UID"),
+        summary=text("SUMMARY"),
+        location=text("LOCATION"),
+        all_day=all_day,
+        start=start,
+        end=None,
+        duration=duration,
+        recurrence_id=recurrence_id,
+        cancelled=cancelled,
+        rule=rule,
+    )
+    if rule is None:
+        return event._replace(end=end_of(event, start))
+    return event._replace(end=span_end(event))
+
+
+def end_of(event: Event, start: float) -> float:
+    """End of the occurrence of `event` starting at `start`."""
+    if event.all_day:
+        return to_timestamp(to_wall(start, "") + timedelta(days=event.duration), "")
+    return start + event.duration
+
+
+# --- Recurrences ---
+
+
+@functools.lru_cache(maxsize=256)
+def parse_rule(text: str) -> dict | None:
+    """RRULE parts, or None if the rule is empty or its FREQ is unsupported."""
+    parts = {}
+    for part in text.split(";"):
+        key, _, value = part.partition("=")
+        parts[key.strip().upper()] = value.strip().upper()
+    if parts.get("FREQ") not in FREQUENCIES:
+        return None
+
+    byday = []
+    for item in filter(None, parts.get("BYDAY", "").split(",")):
+        match = _BYDAY.match(item)
+        if match:
+            byday.append((int(match.group(1) or 0), WEEKDAYS[match.group(2)]))
+
+    def numbers(key):
+        return [
+            int(n) for n in parts.get(key, "").split(",") if n.lstrip("+-").isdigit()
+        ]
+
+    return {
+        "freq": parts["FREQ"],
+        "interval": max(1, int(parts.get("INTERVAL") or 1)),
+        "count": int(parts["COUNT"]) if parts.get("COUNT", "").isdigit() else None,
+        "until": parts.get("UNTIL"),
+        "wkst": WEEKDAYS.get(parts.get("WKST"), 0),
+        "byday": byday,
+        "bymonthday": numbers("BYMONTHDAY"),
+        "bymonth": numbers("BYMONTH"),
+        "bysetpos": numbers("BYSETPOS"),
+    }
+
+
+def _until_timestamp(rule: dict, tzid: str) -> float | None:
+    if not rule["until"]:
+        return None
+    wall, until_tzid, is_date = parse_time(rule["until"], {})
+    if is_date:
+        # The whole day is included.
+        return to_timestamp(wall + timedelta(days=1), tzid) - 0.001
+    return to_timestamp(wall, until_tzid or tzid)
+
+
+def _weekday_days(first: date, last: date, weekday: int, ordinal: int) -> list[date]:
+    """Dates between `first` and `last` falling on `weekday`, or the nth one."""
+    start = first + timedelta(days=(weekday - first.weekday()) % 7)
+    days = []
+    while start <= last:
+        days.append(start)
+        start += timedelta(days=7)
+    if not ordinal:
+        return days
+    index = ordinal - 1 if ordinal > 0 else ordinal
+    return [days[index]] if -len(days) <= index < len(days) else []
+
+
+def _month_days(rule: dict, year: int, month: int, default_day: int) -> list[date]:
+    last = calendar.monthrange(year, month)[1]
+    days = None
+    if rule["bymonthday"]:
+        days = {day if day > 0 else last + day + 1 for day in rule["bymonthday"]}
+        days = {day for day in days if 1 <= day <= last}
+    if rule["byday"]:
+        first_date, last_date = date(year, month, 1), date(year, month, last)
+        matching = {
+            day.day
+            for ordinal, weekday in rule["byday"]
+            for day in _weekday_days(first_date, last_date, weekday, ordinal)
+        }
+        days = matching if days is None else days & matching
+    if days is None:
+        days = {default_day} if default_day <= last else set()
+    return [date(year, month, day) for day in sorted(days)]
+
+
+def _period_days(rule: dict, dtstart: date, index: int) -> tuple[date, list[date]]:
+    """First day of the `index`th period of the rule and its candidate days."""
+    freq, step = rule["freq"], index * rule["interval"]
+    if freq == "DAILY":
+        day = dtstart + timedelta(days=step)
+        days = [day]
+        if rule["bymonthday"]:
+            days = [d for d in days if d in _month_days(rule, d.year, d.month, 0)]
+        elif rule["byday"]:
+            days = [d for d in days if d.weekday() in {w for _, w in rule["byday"]}]
+        return day, _filter_months(rule, days)
+
+    if freq == "WEEKLY":
+        week = dtstart - timedelta(days=(dtstart.weekday() - rule["wkst"]) % 7)
+        week += timedelta(weeks=step)
+        weekdays = {w for _, w in rule["byday"]} or {dtstart.weekday()}
+        days = [week + timedelta(days=i) for i in range(7)]
+        days = [d for d in days if d.weekday() in weekdays]
+        return week, _filter_months(rule, days)
+
+    if freq == "MONTHLY":
+        year, month = divmod(dtstart.year * 12 + dtstart.month - 1 + step, 12)
+        month += 1
+        days = _month_days(rule, year, month, dtstart.day)
+        return date(year, month, 1), _filter_months(rule, days)
+
+    year = dtstart.year + step
+    if rule["bymonth"]:
+        days = [
+            day
+            for month in sorted(set(rule["bymonth"]))
+            if 1 <= month <= 12
+            for day in _month_days(rule, year, month, dtstart.day)
+        ]
+    elif rule["byday"] and not rule["bymonthday"]:
+        # Ordinals count through the whole year here.
+        first_date, last_date = date(year, 1, 1), date(year, 12, 31)
+        days = sorted(
+            {
+                day
+                for ordinal, weekday in rule["byday"]
+                for day in _weekday_days(first_date, last_date, weekday, ordinal)
+            }
+        )
+    elif rule["bymonthday"]:
+        days = [
+            day for month in range(1, 13) for day in _month_days(rule, year, month, 0)
+        ]
+    else:
+        days = _month_days(rule, year, dtstart.month, dtstart.day)
+    return date(year, 1, 1), days
+
+
+def _filter_months(rule: dict, days: list[date]) -> list[date]:
+    if not rule["bymonth"]:
+        return days
+    return [day for day in days if day.month in rule["bymonth"]]
+
+
+def _first_period(rule: dict, dtstart: date, day: date) -> int:
+    """Index of a period starting no later than `day`."""
+    freq = rule["freq"]
+    if freq == "DAILY":
+        periods = (day - dtstart).days
+    elif freq == "WEEKLY":
+        periods = (day - dtstart).days // 7
+    elif freq == "MONTHLY":
+        periods = (day.year - dtstart.year) * 12 + day.month - dtstart.month
+    else:
+        periods = day.year - dtstart.year
+    return max(0, periods // rule["interval"] - 1)
+
+
+def recurrence(
+    text: str,
+    dtstart: datetime,
+    tzid: str,
+    after: datetime | None = None,
+    before: datetime | None = None,
+) -> Iterator[datetime]:
+    """
+    Starts (wall time) of the rule `text`, DTSTART first. Without COUNT the
+    walk starts near `after`; it stops past `before` or the rule's end.
+    """
+    yield dtstart
+    rule = parse_rule(text) if text else None
+    if rule is None:
+        return
+
+    count = rule["count"]
+    if count is not None and count <= 1:
+        return
+    until = _until_timestamp(rule, tzid)
+    seen = 1
+    first_day = dtstart.date()
+    index = 0
+    if after is not None and count is None:
+        index = _first_period(rule, first_day, after.date())
+
+    for index in range(index, index + MAX_PERIODS):
+        period_start, days = _period_days(rule, first_day, index)
+        if before is not None and period_start > before.date():
+            return
+        if rule["bysetpos"]:
+            days = [
+                days[pos - 1 if pos > 0 else pos]
+                for pos in rule["bysetpos"]
+                if pos and -len(days) <= (pos - 1 if pos > 0 else pos) < len(days)
+            ]
+            days = sorted(set(days))
+        for day in days:
+            wall = datetime.combine(day, dtstart.time())
+            if wall <= dtstart:
+                continue
+            if until is not None and to_timestamp(wall, tzid) > until:
+                return
+            yield wall
+            seen += 1
+            if count is not None and seen >= count:
+                return
+
+
+def span_end(event: Event) -> float | None:
+    """End of the last occurrence of a recurring event, None if endless."""
+    rule = event.rule
+    parsed = parse_rule(rule.rrule) if rule.rrule else None
+    if parsed is not None and parsed["count"] is None and not parsed["until"]:
+        return None
+    last = event.start
+    for wall in recurrence(rule.rrule, datetime(*rule.dtstart), rule.tzid):
+        last = to_timestamp(wall, rule.tzid)
+    if rule.rdates:
+        last = max(last, rule.rdates[-1])
+    return end_of(event, last)
+
+
+def occurrences(
+    event: Event, range_start: float, range_end: float
+) -> Iterator[tuple[float, float]]:
+    """(start, end) of the occurrences of `event` overlapping the range."""
+    rule = event.rule
+    if rule is None:
+        if overlaps(event.start, event.end, range_start, range_end):
+            yield event.start, event.end
+        return
+
+    reach = event.duration * 86400 if event.all_day else event.duration
+    # One day of slack on each side covers zone offsets between the rule's
+    # wall time and the range.
+    after = to_wall(range_start - reach, rule.tzid) - timedelta(days=1)
+    before = to_wall(range_end, rule.tzid) + timedelta(days=1)
+    walls = recurrence(rule.rrule, datetime(*rule.dtstart), rule.tzid, after, before)
+    starts = heapq.merge((to_timestamp(wall, rule.tzid) for wall in walls), rule.rdates)
+
+    excluded = set(rule.exdates)
+    previous = None
+    for start in starts:
+        if start >= range_end:
+            return
+        if start == previous or start in excluded:
+            continue
+        previous = start
+        end = end_of(event, start)
+        if overlaps(start, end, range_start, range_end):
+            yield start, end
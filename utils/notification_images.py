@@ -0,0 +1,168 @@
+"""
+Storage for notification images.
+
+Thumbnails are named after a hash of their pixels, so an avatar that a chat
+app sends with every message is written to disk once and shared by all the
+notifications that use it. Files are written by a background thread and
+reference counted so that a shared file is only removed once no
+notification uses it. Decoded thumbnails are kept in a small LRU so history
+rows do not decode and rescale the same PNG again.
+"""
+
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+from gi.repository import GdkPixbuf
+from loguru import logger
+
+
+class PixbufLRU:
+    """Bounded mapping of `(path, width, height)` to decoded pixbufs."""
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        pixbuf = self._items.get(key)
+        if pixbuf is not None:
+            self._items.move_to_end(key)
+        return pixbuf
+
+    def put(self, key, pixbuf):
+        self._items[key] = pixbuf
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def discard(self, path: str):
+        for key in [key for key in self._items if key[0] == path]:
+            del self._items[key]
+
+
+def pixbuf_digest(pixbuf: GdkPixbuf.Pixbuf) -> str:
+    """Hash of the visible pixels of `pixbuf`, ignoring rowstride padding."""
+    width = pixbuf.get_width()
+    height = pixbuf.get_height()
+    channels = pixbuf.get_n_channels()
+    row = width * channels * pixbuf.get_bits_per_sample() // 8
+    stride = pixbuf.get_rowstride()
+    pixels = pixbuf.read_pixel_bytes().get_data()
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{width}x{height}x{channels}".encode())
+    for y in range(height):
+        offset = y * stride
+        digest.update(pixels[offset : offset + row])
+    return digest.hexdigest()
+
+
+class NotificationImageStore:
+    """
+    Content-addressed thumbnail store backed by a single writer thread.
+
+    `store`, `acquire`, `release` and `thumbnail` must be called from the
+    main loop; only encoding, writing and removing files happens on the
+    writer thread, in the order the requests were made.
+    """
+
+    def __init__(self, directory: str, size: int = 40, lru_capacity: int = 64):
+        self.directory = directory
+        self.size = size
+        self.thumbnails = PixbufLRU(lru_capacity)
+        self._refs = {}
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def _submit(self, job):
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="notification-images", daemon=True
+            )
+            self._writer.start()
+        self._queue.put(job)
+
+    def _write_loop(self):
+        while True:
+            action, path, pixbuf = self._queue.get()
+            try:
+                if action == "write":
+                    # Another notification may have written the same image.
+                    if not os.path.exists(path):
+                        os.makedirs(self.directory, exist_ok=True)
+                        tmp = f"{path}.tmp"
+                        pixbuf.savev(tmp, "png", [], [])
+                        os.replace(tmp, path)
+                        logger.debug(f"Wrote notification image: {path}")
+                elif os.path.exists(path):
+                    os.remove(path)
+                    logger.debug(f"Deleted notification image: {path}")
+            except Exception as e:
+                logger.error(f"Error handling notification image {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued write and removal has been handled."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def store(self, pixbuf: GdkPixbuf.Pixbuf) -> str | None:
+        """Scale `pixbuf` to a thumbnail, queue it for writing and return its path."""
+        try:
+            thumbnail = pixbuf.scale_simple(
+                self.size, self.size, GdkPixbuf.InterpType.BILINEAR
+            )
+            path = os.path.join(self.directory, f"{pixbuf_digest(thumbnail)}.png")
+        except Exception as e:
+            logger.error(f"Error scaling notification image: {e}")
+            return None
+
+        self.thumbnails.put((path, self.size, self.size), thumbnail)
+        if path not in self._refs:
+            self._submit(("write", path, thumbnail))
+        self.acquire(path)
+        return path
+
+    def acquire(self, path: str):
+        self._refs[path] = self._refs.get(path, 0) + 1
+
+    def release(self, path: str):
+        """Drop a reference and remove the file once nothing uses it."""
+        count = self._refs.get(path, 0) - 1
+        if count > 0:
+            self._refs[path] = count
+            return
+        self._refs.pop(path, None)
+        self.thumbnails.discard(path)
+        # Bundled fallback icons are referenced by path but not owned here.
+        if os.path.dirname(path) == self.directory:
+            self._submit(("remove", path, None))
+
+    def thumbnail(self, path: str, width: int, height: int):
+        """Decoded pixbuf for `path` at `width`x`height`, or None."""
+        key = (path, width, height)
+        pixbuf = self.thumbnails.get(key)
+        if pixbuf is not None:
+            return pixbuf
+
+        source = self.thumbnails.get((path, self.size, self.size))
+        try:
+            if source is not None:
+                pixbuf = source.scale_simple(
+                    width, height, GdkPixbuf.InterpType.BILINEAR
+                )
+            elif os.path.exists(path):
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                    path, width, height, False
+                )
+        except Exception as e:
+            logger.error(f"Error loading notification image {path}: {e}")
+            return None
+
+        if pixbuf is not None:
+            self.thumbnails.put(key, pixbuf)
+        return pixbuf
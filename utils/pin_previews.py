@@ -0,0 +1,199 @@
+"""
+Preview images for pinned files and URLs.
+
+File thumbnails are decoded in worker threads and stored as PNGs under
+CACHE_DIR, keyed by the file's path, mtime and the requested size, so a pin
+only pays for decoding once per version of the file. Favicons are fetched
+once per domain and kept on disk; a domain without one is remembered for a
+day before it is tried again. Decoded pixbufs are also kept in a small LRU
+so re-rendering a cell does not touch the disk.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+import config.data as data
+from utils.notification_images import PixbufLRU
+
+THUMBNAIL_DIRECTORY = os.path.join(data.CACHE_DIR, "pin_thumbnails")
+FAVICON_DIRECTORY = os.path.join(data.CACHE_DIR, "favicons")
+MAX_THUMBNAIL_BYTES = 32 * 1024 * 1024
+FAVICON_MAX_AGE = 7 * 24 * 60 * 60
+FAVICON_RETRY_AFTER = 24 * 60 * 60
+REQUEST_TIMEOUT = 10
+
+
+def _atomic_write(path: str, write):
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_bytes(path: str, body: bytes):
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+class PinPreviews:
+    def __init__(
+        self,
+        thumbnail_directory: str = THUMBNAIL_DIRECTORY,
+        favicon_directory: str = FAVICON_DIRECTORY,
+        lru_capacity: int = 64,
+    ):
+        self.thumbnail_directory = thumbnail_directory
+        self.favicon_directory = favicon_directory
+        self.pixbufs = PixbufLRU(lru_capacity)
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="pin-preview"
+        )
+        # Callbacks waiting on a request already in flight, by cache key.
+        self._pending = {}
+
+    def load_thumbnail(self, path: str, size: int, callback):
+        """
+        Call `callback(pixbuf)` on the main loop with `path` scaled to fit
+        `size`, or with None if it cannot be decoded.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            callback(None)
+            return
+        self._load(("file", path, mtime, size), callback)
+
+    def load_favicon(self, url: str, size: int, callback):
+        """Like `load_thumbnail`, for the favicon of the domain of `url`."""
+        parsed = urllib.parse.urlparse(url)
+        if not parsed.netloc:
+            callback(None)
+            return
+        self._load(("favicon", parsed.scheme, parsed.netloc.lower(), size), callback)
+
+    def _load(self, key: tuple, callback):
+        pixbuf = self.pixbufs.get(key)
+        if pixbuf is not None:
+            callback(pixbuf)
+            return
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+        self._pending[key] = [callback]
+        self._executor.submit(self._load_in_thread, key)
+
+    def _load_in_thread(self, key: tuple):
+        pixbuf = None
+        try:
+            if key[0] == "file":
+                pixbuf = self._thumbnail(*key[1:])
+            else:
+                pixbuf = self._favicon(*key[1:])
+        except Exception as e:
+            logger.warning(f"Could not load pin preview for {key[1:3]}: {e}")
+        GLib.idle_add(self._deliver, key, pixbuf)
+
+    def _deliver(self, key: tuple, pixbuf):
+        if pixbuf is not None:
+            self.pixbufs.put(key, pixbuf)
+        for callback in self._pending.pop(key, []):
+            callback(pixbuf)
+        return False
+
+    # --- File thumbnails ---
+
+    def _thumbnail(self, path: str, mtime: int, size: int) -> GdkPixbuf.Pixbuf:
+        digest = hashlib.sha256(f"{path}\0{mtime}\0{size}".encode()).hexdigest()
+        cached = os.path.join(self.thumbnail_directory, f"{digest[:32]}.png")
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(cached)
+            os.utime(cached)
+            return pixbuf
+        except GLib.Error:
+            pass
+
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, size, size, True)
+        try:
+            os.makedirs(self.thumbnail_directory, exist_ok=True)
+            _atomic_write(cached, lambda tmp: pixbuf.savev(tmp, "png", [], []))
+            self._trim()
+        except (OSError, GLib.Error) as e:
+            logger.warning(f"Could not cache thumbnail for {path}: {e}")
+        return pixbuf
+
+    def _trim(self):
+        """Drop the least recently used thumbnails until the store fits."""
+        entries = []
+        total = 0
+        with os.scandir(self.thumbnail_directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".png"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, file_size, path in entries:
+            if total <= MAX_THUMBNAIL_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= file_size
+
+    # --- Favicons ---
+
+    def _favicon(self, scheme: str, domain: str, size: int):
+        path = os.path.join(
+            self.favicon_directory, f"{urllib.parse.quote(domain, safe='')}.ico"
+        )
+        try:
+            stat = os.stat(path)
+            # An empty file records a domain without a usable favicon.
+            max_age = FAVICON_MAX_AGE if stat.st_size else FAVICON_RETRY_AFTER
+            fresh = time.time() - stat.st_mtime < max_age
+        except FileNotFoundError:
+            stat, fresh = None, False
+
+        if not fresh:
+            body = b""
+            try:
+                request = urllib.request.Request(f"{scheme}://{domain}/favicon.ico")
+                with urllib.request.urlopen(
+                    request, timeout=REQUEST_TIMEOUT
+                ) as response:
+                    body = response.read()
+            except urllib.error.HTTPError:
+                pass
+            except (urllib.error.URLError, OSError):
+                # Offline: keep whatever we had and try again next time.
+                if stat is None:
+                    return None
+                body = None
+            if body is not None:
+                os.makedirs(self.favicon_directory, exist_ok=True)
+                _atomic_write(path, lambda tmp: _write_bytes(tmp, body))
+
+        if os.path.getsize(path) == 0:
+            return None
+        try:
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(path, size, size, True)
+        except GLib.Error:
+            # Not an image (e.g. an HTML error page); remember that.
+            _atomic_write(path, lambda tmp: _write_bytes(tmp, b""))
+            return None
+
+
+pin_previews = PinPreviews()
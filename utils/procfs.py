@@ -0,0 +1,253 @@
+"""
+Lightweight readers for the /proc counters behind the bar metrics.
+
+Each reader keeps its file descriptor open and re-reads it with `os.pread`,
+storing counters and deltas in preallocated arrays so a sample does not
+reopen files or build intermediate objects. `ProcessSampler` is the
+exception: it walks /proc/<pid>/stat on demand for the process panel and
+cannot keep thousands of descriptors open.
+"""
+
+import heapq
+import os
+import time
+from array import array
+from operator import itemgetter
+from typing import NamedTuple
+
+
+class ProcFile:
+    """A /proc or /sys file kept open and re-read from offset 0."""
+
+    def __init__(self, path: str, bufsize: int = 8192):
+        self.path = path
+        self._bufsize = bufsize
+        self._fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+
+    def read(self) -> bytes:
+        data = os.pread(self._fd, self._bufsize, 0)
+        # Grow the buffer until the whole file fits in one read.
+        while len(data) >= self._bufsize:
+            self._bufsize *= 2
+            data = os.pread(self._fd, self._bufsize, 0)
+        return data
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
+
+
+class CpuStat:
+    """
+    CPU utilisation from /proc/stat.
+
+    Index 0 of `percent` is the aggregate, followed by one entry per core.
+    """
+
+    def __init__(self, path: str = "/proc/stat"):
+        self._file = ProcFile(path, bufsize=16384)
+        count = sum(1 for line in self._file.read().splitlines() if line[:3] == b"cpu")
+        self._total = array("Q", bytes(8 * count))
+        self._busy = array("Q", bytes(8 * count))
+        self.percent = array("d", bytes(8 * count))
+        self.update()
+
+    @property
+    def cores(self) -> int:
+        return len(self.percent) - 1
+
+    def update(self) -> float:
+        total_prev = self._total
+        busy_prev = self._busy
+        percent = self.percent
+        i = 0
+        for line in self._file.read().splitlines():
+            if line[:3] != b"cpu":
+                break
+            if i >= len(percent):
+                # A core came online after start-up.
+                total_prev.append(0)
+                busy_prev.append(0)
+                percent.append(0.0)
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal; guest time is
+            # already accounted in user/nice.
+            user, nice, system, idle, iowait, irq, softirq, steal = map(
+                int, fields[1:9]
+            )
+            total = user + nice + system + idle + iowait + irq + softirq + steal
+            busy = total - idle - iowait
+            delta = total - total_prev[i]
+            percent[i] = (
+                min(100.0, max(0.0, (busy - busy_prev[i]) * 100.0 / delta))
+                if delta > 0
+                else 0.0
+            )
+            total_prev[i] = total
+            busy_prev[i] = busy
+            i += 1
+        return percent[0]
+
+
+class MemInfo:
+    """Memory usage from /proc/meminfo, computed like `psutil.virtual_memory`."""
+
+    def __init__(self, path: str = "/proc/meminfo"):
+        self._file = ProcFile(path)
+        self.total = 0
+        self.available = 0
+        self.percent = 0.0
+
+    def update(self) -> float:
+        total = available = None
+        for line in self._file.read().splitlines():
+            if line.startswith(b"MemTotal:"):
+                total = int(line.split()[1])
+            elif line.startswith(b"MemAvailable:"):
+                available = int(line.split()[1])
+            if total is not None and available is not None:
+                break
+        if total:
+            self.total = total * 1024
+            self.available = (available or 0) * 1024
+            self.percent = round((total - (available or 0)) * 100.0 / total, 1)
+        return self.percent
+
+
+class NetDev:
+    """Aggregate receive/transmit rates in bytes per second from /proc/net/dev."""
+
+    def __init__(self, path: str = "/proc/net/dev"):
+        self._file = ProcFile(path)
+        # [recv, sent] totals and [download, upload] rates.
+        self._totals = array("Q", [0, 0])
+        self.rates = array("d", [0.0, 0.0])
+        self._last_time = None
+
+    def reset(self):
+        self._last_time = None
+        self.rates[0] = self.rates[1] = 0.0
+
+    def update(self):
+        recv = sent = 0
+        # Skip the two header lines.
+        for line in self._file.read().splitlines()[2:]:
+            fields = line.split(b":", 1)[1].split()
+            recv += int(fields[0])
+            sent += int(fields[8])
+
+        now = time.monotonic()
+        totals = self._totals
+        rates = self.rates
+        if self._last_time is not None and now > self._last_time:
+            elapsed = now - self._last_time
+            rates[0] = max(0, recv - totals[0]) / elapsed
+            rates[1] = max(0, sent - totals[1]) / elapsed
+        else:
+            rates[0] = rates[1] = 0.0
+        totals[0] = recv
+        totals[1] = sent
+        self._last_time = now
+        return rates[0], rates[1]
+
+
+def disk_percent(path: str) -> float:
+    """Disk usage of the filesystem holding `path`, like `psutil.disk_usage`."""
+    st = os.statvfs(path)
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    avail = st.f_bavail * st.f_frsize
+    total_user = used + avail
+    return round(used * 100.0 / total_user, 1) if total_user else 0.0
+
+
+class ProcessInfo(NamedTuple):
+    pid: int
+    name: str
+    cpu: float
+    rss: int
+
+
+class ProcessSampler:
+    """
+    Top processes by CPU and resident memory from /proc/<pid>/stat.
+
+    Each sample does one read per process and keeps only a (starttime,
+    jiffies) pair per pid between samples, so deltas survive while pid reuse
+    and exited processes are detected. Names are decoded only for the
+    processes that make it into a top list. CPU is in percent of one core,
+    like top.
+    """
+
+    def __init__(self, proc: str = "/proc", clock=time.monotonic):
+        self._proc = proc
+        self._clock = clock
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._last = {}
+        self._last_time = None
+
+    @property
+    def primed(self) -> bool:
+        return self._last_time is not None
+
+    def reset(self):
+        self._last = {}
+        self._last_time = None
+
+    def sample(self, count: int = 8):
+        """Return `(top_by_cpu, top_by_rss)` lists of `ProcessInfo`."""
+        now = self._clock()
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        scale = 100.0 / (elapsed * self._ticks) if elapsed > 0 else 0.0
+        last = self._last
+        current = {}
+        entries = []
+        proc = self._proc
+        page_size = self._page_size
+
+        for name in os.listdir(proc):
+            if not name.isdigit():
+                continue
+            try:
+                fd = os.open(f"{proc}/{name}/stat", os.O_RDONLY)
+                try:
+                    raw = os.read(fd, 1024)
+                finally:
+                    os.close(fd)
+            except OSError:
+                # The process exited between listdir and open.
+                continue
+            rparen = raw.rfind(b")")
+            fields = raw[rparen + 2 :].split()
+            if len(fields) < 22:
+                continue
+            # Fields after the command: state(3) ... utime(14) stime(15)
+            # ... starttime(22) vsize(23) rss(24).
+            jiffies = int(fields[11]) + int(fields[12])
+            start = int(fields[19])
+            pid = int(name)
+            previous = last.get(pid)
+            cpu = (
+                (jiffies - previous[1]) * scale
+                if previous is not None and previous[0] == start
+                else 0.0
+            )
+            current[pid] = (start, jiffies)
+            entries.append((cpu, int(fields[21]) * page_size, pid, raw, rparen))
+
+        self._last = current
+        self._last_time = now
+
+        def info(entry):
+            cpu, rss, pid, raw, rparen = entry
+            comm = raw[raw.find(b"(") + 1 : rparen].decode(errors="replace")
+            return ProcessInfo(pid, comm, cpu, rss)
+
+        return (
+            [info(e) for e in heapq.nlargest(count, entries, key=itemgetter(0))],
+            [info(e) for e in heapq.nlargest(count, entries, key=itemgetter(1))],
+        )
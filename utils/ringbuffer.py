@@ -0,0 +1,83 @@
+"""
+Fixed-size ring buffers for metric history.
+
+Storage is preallocated once per metric, so appending a sample never
+allocates and memory stays constant however long the shell runs.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """Float ring buffer backed by a preallocated NumPy array."""
+
+    __slots__ = ("_data", "_index", "_count")
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(max(1, capacity), dtype=np.float32)
+        self._index = 0
+        self._count = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        self._data[self._index] = value
+        self._index += 1
+        if self._index == len(self._data):
+            self._index = 0
+        if self._count < len(self._data):
+            self._count += 1
+
+    def latest(self) -> float:
+        if not self._count:
+            return 0.0
+        return float(self._data[self._index - 1])
+
+    def max(self) -> float:
+        # Until the buffer wraps, the valid samples are exactly [0, count).
+        if not self._count:
+            return 0.0
+        return float(self._data[: self._count].max())
+
+    def segments(self):
+        """Stored values oldest-first, as at most two views into the buffer."""
+        if self._count < len(self._data):
+            return (self._data[: self._count],)
+        return (self._data[self._index :], self._data[: self._index])
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+
+
+class MetricHistory:
+    """
+    Two-resolution history of one metric.
+
+    `fine` holds every sample. Every `bucket_size` samples the peak of the
+    bucket is pushed to `coarse`, so short spikes stay visible in the long
+    view.
+    """
+
+    __slots__ = ("fine", "coarse", "bucket_size", "_bucket_peak", "_bucket_count")
+
+    def __init__(self, fine_capacity: int, coarse_capacity: int, bucket_size: int):
+        self.fine = RingBuffer(fine_capacity)
+        self.coarse = RingBuffer(coarse_capacity)
+        self.bucket_size = max(1, bucket_size)
+        self._bucket_peak = 0.0
+        self._bucket_count = 0
+
+    def append(self, value: float):
+        self.fine.append(value)
+        if self._bucket_count == 0 or value > self._bucket_peak:
+            self._bucket_peak = value
+        self._bucket_count += 1
+        if self._bucket_count >= self.bucket_size:
+            self.coarse.append(self._bucket_peak)
+            self._bucket_count = 0
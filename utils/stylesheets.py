@@ -0,0 +1,100 @@
+"""
+The shell's stylesheets, split between two CSS providers.
+
+main.css and the styles it imports only describe structure and refer to
+colors by name (`@primary`), which GTK resolves across all providers of the
+screen. They are parsed once and again only when one of them changes. The
+colors are `@define-color` rules in a provider of their own, built from the
+`:vars` block matugen writes to styles/colors.css, so a new wallpaper swaps a
+few dozen rules instead of re-parsing every stylesheet.
+"""
+
+import os
+import re
+import time
+
+from gi.repository import Gdk, GLib, Gtk
+from loguru import logger
+
+COLOR_VARIABLE = re.compile(r"--([\w-]+)\s*:\s*([^;]+);")
+
+
+def colors_to_css(text: str) -> str:
+    """`@define-color` rules for the variables of a `:vars { ... }` block."""
+    return "".join(
+        f"@define-color {name.replace('-', '_')} {value.strip()};\n"
+        for name, value in COLOR_VARIABLE.findall(text)
+    )
+
+
+class Stylesheets:
+    def __init__(self, main_path: str, colors_path: str, default_colors_path: str):
+        self.main_path = main_path
+        self.colors_path = colors_path
+        # Used until matugen has written colors_path.
+        self.default_colors_path = default_colors_path
+        self.styles_directory = os.path.dirname(colors_path)
+        self._providers = {}
+        self._structure_mtimes = None
+
+    def reload(self):
+        """
+        Swap in the current colors, and the structural stylesheets too if any
+        of them changed since they were last loaded.
+        """
+        started = time.perf_counter()
+        mtimes = self._mtimes()
+        structure_changed = mtimes != self._structure_mtimes
+        if structure_changed:
+            provider = Gtk.CssProvider()
+            try:
+                provider.load_from_path(self.main_path)
+            except GLib.Error as e:
+                logger.error(f"Could not load {self.main_path}: {e.message}")
+            else:
+                self._swap("structure", provider)
+                self._structure_mtimes = mtimes
+        self._swap("colors", self._load_colors())
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Reloaded {'stylesheets and colors' if structure_changed else 'colors'}"
+            f" in {elapsed:.1f} ms"
+        )
+
+    def _mtimes(self) -> dict[str, int]:
+        mtimes = {self.main_path: os.stat(self.main_path).st_mtime_ns}
+        with os.scandir(self.styles_directory) as it:
+            for entry in it:
+                if entry.name.endswith(".css") and entry.path != self.colors_path:
+                    mtimes[entry.path] = entry.stat().st_mtime_ns
+        return mtimes
+
+    def _load_colors(self) -> Gtk.CssProvider:
+        provider = Gtk.CssProvider()
+        for path in (self.colors_path, self.default_colors_path):
+            try:
+                with open(path) as f:
+                    css = colors_to_css(f.read())
+            except OSError:
+                continue
+            if not css:
+                continue
+            try:
+                provider.load_from_data(css.encode())
+            except GLib.Error as e:
+                logger.error(f"Could not load colors from {path}: {e.message}")
+                continue
+            break
+        return provider
+
+    def _swap(self, name: str, provider: Gtk.CssProvider):
+        screen = Gdk.Screen.get_default()
+        # Add the new provider first so no frame is styled without it.
+        Gtk.StyleContext.add_provider_for_screen(
+            screen, provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+        previous = self._providers.get(name)
+        if previous is not None:
+            Gtk.StyleContext.remove_provider_for_screen(screen, previous)
+        self._providers[name] = provider
@@ -0,0 +1,120 @@
+from typing import Literal
+
+import cairo
+import gi
+from fabric.widgets.widget import Widget
+
+from utils.ringbuffer import MetricHistory
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk  # noqa: E402
+
+
+class Sparkline(Gtk.DrawingArea, Widget):
+    """
+    Draws a `MetricHistory` as a small line graph.
+
+    The whole series is built as one cairo path that is stroked and then
+    filled, reading the ring buffer in place. The line uses the CSS `color`
+    of the widget; the area below it is filled at `fill_alpha`.
+    """
+
+    def __init__(
+        self,
+        history: MetricHistory | None = None,
+        resolution: Literal["fine", "coarse"] = "fine",
+        max_value: float | None = 100.0,
+        line_width: float = 1.5,
+        fill_alpha: float = 0.25,
+        name: str | None = None,
+        visible: bool = True,
+        all_visible: bool = False,
+        style: str | None = None,
+        tooltip_text: str | None = None,
+        tooltip_markup: str | None = None,
+        h_align: (
+            Literal["fill", "start", "end", "center", "baseline"] | Gtk.Align | None
+        ) = None,
+        v_align: (
+            Literal["fill", "start", "end", "center", "baseline"] | Gtk.Align | None
+        ) = None,
+        h_expand: bool = False,
+        v_expand: bool = False,
+        size: tuple[int, int] | int | None = None,
+        **kwargs,
+    ):
+        Gtk.DrawingArea.__init__(self)
+        Widget.__init__(
+            self,
+            name=name,
+            visible=visible,
+            all_visible=all_visible,
+            style=style,
+            tooltip_text=tooltip_text,
+            tooltip_markup=tooltip_markup,
+            h_align=h_align,
+            v_align=v_align,
+            h_expand=h_expand,
+            v_expand=v_expand,
+            size=size,
+            **kwargs,
+        )
+        self._history = history
+        self.resolution = resolution
+        # None scales the graph to the largest value currently stored.
+        self.max_value = max_value
+        self.line_width = line_width
+        self.fill_alpha = fill_alpha
+        self.connect("draw", self.on_draw)
+
+    def set_history(self, history: MetricHistory | None):
+        self._history = history
+        self.queue_draw()
+
+    def on_draw(self, widget: "Sparkline", ctx: cairo.Context):
+        if self._history is None:
+            return
+        buffer = (
+            self._history.coarse if self.resolution == "coarse" else self._history.fine
+        )
+        count = len(buffer)
+        if count < 2:
+            return
+
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+        inset = self.line_width / 2
+        top = self.max_value or buffer.max() or 1.0
+        scale = (height - self.line_width) / top
+        step = width / (buffer.capacity - 1)
+
+        # Newest sample at the right edge; older ones scroll off to the left.
+        x = width - (count - 1) * step
+        start_x = x
+        first = True
+        for segment in buffer.segments():
+            for value in segment.tolist():
+                y = height - inset - min(value, top) * scale
+                if first:
+                    ctx.move_to(x, y)
+                    first = False
+                else:
+                    ctx.line_to(x, y)
+                x += step
+
+        color = self.get_style_context().get_color(self.get_state_flags())
+        ctx.set_line_width(self.line_width)
+        ctx.set_line_join(cairo.LINE_JOIN_ROUND)
+        ctx.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        ctx.stroke_preserve()
+
+        if self.fill_alpha > 0:
+            ctx.line_to(x - step, height)
+            ctx.line_to(start_x, height)
+            ctx.close_path()
+            ctx.set_source_rgba(
+                color.red, color.green, color.blue, color.alpha * self.fill_alpha
+            )
+            ctx.fill()
+        else:
+            ctx.new_path()